@@ -2,31 +2,55 @@
 FastAPI Server for AROGYA SATHI - AI Sustainability Storytelling API
 Generates empathetic sustainability awareness videos
 """
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import HTMLResponse, JSONResponse, FileResponse
+from fastapi.responses import HTMLResponse, JSONResponse, StreamingResponse, Response
 from pydantic import BaseModel
-from typing import Optional
+from typing import List, Optional
 import uvicorn
+import asyncio
 import json
 import os
 import hashlib
 import base64
 import re
+import threading
+import time
 from datetime import datetime
 from dotenv import load_dotenv
-import google.generativeai as genai
 
 # Load environment variables
 load_dotenv()
 
-# Configure Gemini
+# Number of server processes (read by uvicorn --workers and gunicorn alike).
+# Several processes must share jobs and API quotas, so they default to the
+# SQLite-backed stores; caches, the catalog and the reel pool are shared already
+API_WORKERS = max(1, int(os.getenv("WEB_CONCURRENCY") or 1))
+if API_WORKERS > 1:
+    os.environ.setdefault("JOB_STORE", "sqlite")
+    os.environ.setdefault("RATE_LIMIT_BACKEND", "sqlite")
+
+# How long a request waits for a job another server process runs
+JOB_WAIT_TIMEOUT = float(os.getenv("JOB_WAIT_TIMEOUT", "1800"))
+
+# Gemini is configured on first use (see gemini_sdk)
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
-if GOOGLE_API_KEY:
-    genai.configure(api_key=GOOGLE_API_KEY)
 
-# Import orchestrator
-from orchestrator_agent.orchestrator_tool import OrchestratorTool
+# Heavy SDKs (google.adk, google.generativeai, vertexai, moviepy, TTS) are not
+# imported here: the server binds first and loads them lazily or in the
+# startup warm-up thread
+from services.job_queue import JobManager, QueueFullError
+from services.artifact_cache import all_cache_stats
+from services.ttl_cache import all_ttl_cache_stats
+from services.sqlite_cache import all_sqlite_cache_stats
+from services.video_catalog import get_catalog
+from services.reel_pool import ReelPool, ReelPoolWarmer
+from services.rate_limiter import imagen_rate_limiter
+from services.media import etag_matches, media_response
+from services.metrics import external_call, registry as metrics_registry, render_metrics
+from services.tracing import active_trace
+from orchestrator_agent.tool_registry import tool_registry
+from sub_agents.subtitle_agent.vtt import format_vtt_timestamp
 
 app = FastAPI(
     title="AROGYA SATHI API",
@@ -43,85 +67,43 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initialize orchestrator
-orchestrator = OrchestratorTool()
-
 # Data directories
 VIDEOS_DIR = os.path.join(os.path.dirname(__file__), 'data', 'videos')
 AUDIO_DIR = os.path.join(os.path.dirname(__file__), 'data', 'audio')
 SUBTITLES_DIR = os.path.join(os.path.dirname(__file__), 'data', 'subtitles')
+VIDEO_ASSETS_DIR = os.path.join(os.path.dirname(__file__), 'data', 'video_assets')
 os.makedirs(VIDEOS_DIR, exist_ok=True)
 os.makedirs(AUDIO_DIR, exist_ok=True)
 os.makedirs(SUBTITLES_DIR, exist_ok=True)
 
 
-def generate_subtitles(script_text: str, video_path: str) -> str:
-    """
-    Generate WebVTT subtitle file for video.
-    
-    Args:
-        script_text: The script/narration text
-        video_path: Path to the video file
-        
-    Returns:
-        Path to generated subtitle file
-    """
-    try:
-        # Extract video filename
-        video_filename = os.path.basename(video_path)
-        subtitle_filename = video_filename.replace('.mp4', '.vtt')
-        subtitle_path = os.path.join(SUBTITLES_DIR, subtitle_filename)
-        
-        # Split script into chunks (approx 10-12 words per caption for readability)
-        words = script_text.split()
-        chunks = []
-        chunk_size = 10
-        
-        for i in range(0, len(words), chunk_size):
-            chunk = ' '.join(words[i:i + chunk_size])
-            chunks.append(chunk)
-        
-        # Calculate timing (assuming ~3 words per second speech rate)
-        words_per_second = 3
-        
-        # Generate WebVTT content
-        vtt_content = "WEBVTT\\n\\n"
-        
-        current_time = 0.0
-        for idx, chunk in enumerate(chunks):
-            chunk_words = len(chunk.split())
-            duration = chunk_words / words_per_second
-            
-            start_time = current_time
-            end_time = current_time + duration
-            
-            # Format timestamps (HH:MM:SS.mmm)
-            start_str = format_vtt_timestamp(start_time)
-            end_str = format_vtt_timestamp(end_time)
-            
-            vtt_content += f"{idx + 1}\\n"
-            vtt_content += f"{start_str} --> {end_str}\\n"
-            vtt_content += f"{chunk}\\n\\n"
-            
-            current_time = end_time
-        
-        # Write subtitle file
-        with open(subtitle_path, 'w', encoding='utf-8') as f:
-            f.write(vtt_content)
-        
-        return subtitle_path
-        
-    except Exception as e:
-        print(f"❌ Error generating subtitles: {e}")
-        return None
+_orchestrator = None
+_genai = None
+_lazy_lock = threading.Lock()
 
 
-def format_vtt_timestamp(seconds: float) -> str:
-    """Format seconds as WebVTT timestamp (HH:MM:SS.mmm)"""
-    hours = int(seconds // 3600)
-    minutes = int((seconds % 3600) // 60)
-    secs = seconds % 60
-    return f"{hours:02d}:{minutes:02d}:{secs:06.3f}"
+def get_orchestrator():
+    """The shared OrchestratorTool, imported and built on first use."""
+    global _orchestrator
+    if _orchestrator is None:
+        with _lazy_lock:
+            if _orchestrator is None:
+                from orchestrator_agent.orchestrator_tool import OrchestratorTool
+                _orchestrator = OrchestratorTool()
+    return _orchestrator
+
+
+def gemini_sdk():
+    """google.generativeai, imported and configured with GOOGLE_API_KEY on first use."""
+    global _genai
+    if _genai is None:
+        with _lazy_lock:
+            if _genai is None:
+                import google.generativeai as genai
+                if GOOGLE_API_KEY:
+                    genai.configure(api_key=GOOGLE_API_KEY)
+                _genai = genai
+    return _genai
 
 
 class StoryRequest(BaseModel):
@@ -142,6 +124,20 @@ class StoryResponse(BaseModel):
     error: Optional[str] = None
 
 
+class JobResponse(BaseModel):
+    """Queued job response"""
+    job_id: str
+    status: str
+    location: str
+    theme: Optional[str] = None
+    status_url: str
+
+
+class BatchStoryRequest(BaseModel):
+    """Many story generation requests queued together"""
+    items: List[StoryRequest]
+
+
 class ChallengeValidationRequest(BaseModel):
     """Challenge validation request"""
     image: str  # Base64 encoded image
@@ -205,6 +201,13 @@ async def root():
                 <code>POST /api/generate-story</code> - Generate empathetic story reel
                 <br><small>Body: {"location": "Mumbai", "theme": "Education & Learning"}</small>
             </div>
+            <div class="endpoint">
+                <code>POST /api/jobs</code> - Queue a story reel and get a job ID immediately
+                <br><small>Poll <code>GET /api/jobs/{job_id}</code> for per-stage status and the result</small>
+            </div>
+            <div class="endpoint">
+                <code>GET /api/jobs/{job_id}/events</code> - Live progress stream (Server-Sent Events)
+            </div>
             <div class="endpoint">
                 <code>GET /api/video/{video_id}</code> - Retrieve generated video
             </div>
@@ -279,98 +282,408 @@ def generate_generic_subtitle(video_filename: str) -> str:
     return subtitle_path
 
 
+def video_view(row: dict) -> dict:
+    """Client-facing representation of a catalog entry"""
+    return {
+        "id": row["id"],
+        "filename": row["filename"],
+        "url": f"/api/video/{row['filename']}",
+        "subtitle_url": f"/api/subtitles/{row['subtitle_filename']}" if row.get("subtitle_filename") else None,
+        "audio_url": f"/api/audio/{row['audio_filename']}" if row.get("audio_filename") else None,
+        "size": row["size"],
+        "created_at": row["created_at"],
+        "theme": row.get("theme"),
+        "location": row.get("location"),
+        "script": row.get("script"),
+        "duration": row.get("duration"),
+        "title": f"Sustainability Story",
+        "type": "video"
+    }
+
+
+@app.on_event("startup")
+def sync_video_catalog():
+    """Import videos produced outside the pipeline (or before the catalog existed)"""
+    try:
+        get_catalog().sync_directory(VIDEOS_DIR, SUBTITLES_DIR, on_missing_subtitle=generate_generic_subtitle)
+    except Exception as e:
+        print(f"⚠️ Video catalog sync failed: {e}")
+
+
 @app.get("/api/videos")
-async def list_videos():
-    """List all generated videos with metadata"""
+async def list_videos(
+    request: Request,
+    theme: Optional[str] = None,
+    location: Optional[str] = None,
+    since: Optional[str] = None,
+    until: Optional[str] = None,
+    limit: Optional[int] = None,
+    offset: int = 0
+):
+    """List generated videos from the catalog, newest first, with filters and optional pagination"""
     try:
-        videos = []
-        video_files = [f for f in os.listdir(VIDEOS_DIR) if f.endswith('.mp4')]
+        # Without a limit the whole feed is returned, as before pagination existed
+        if limit is not None:
+            limit = max(1, min(limit, 500))
+        offset = max(0, offset)
+        catalog = get_catalog()
         
-        for filename in sorted(video_files, reverse=True):  # Newest first
-            file_path = os.path.join(VIDEOS_DIR, filename)
-            file_stat = os.stat(file_path)
-            
-            # Extract timestamp from filename (format: arogya_sathi_YYYYMMDD_HHMMSS.mp4)
-            try:
-                timestamp_str = filename.replace('arogya_sathi_', '').replace('.mp4', '')
-                created_at = datetime.strptime(timestamp_str, '%Y%m%d_%H%M%S').isoformat()
-            except:
-                created_at = datetime.fromtimestamp(file_stat.st_ctime).isoformat()
-            
-            # Check if subtitle file exists, if not generate it automatically
-            subtitle_filename = filename.replace('.mp4', '.vtt')
-            subtitle_path = os.path.join(SUBTITLES_DIR, subtitle_filename)
-            
-            if not os.path.exists(subtitle_path):
-                # Auto-generate subtitle on-demand
-                try:
-                    generate_generic_subtitle(filename)
-                except Exception as e:
-                    print(f"⚠️ Failed to auto-generate subtitle for {filename}: {e}")
-            
-            # Now subtitle should exist
-            has_subtitles = os.path.exists(subtitle_path)
-            
-            videos.append({
-                "id": filename.replace('.mp4', ''),
-                "filename": filename,
-                "url": f"/api/video/{filename}",
-                "subtitle_url": f"/api/subtitles/{subtitle_filename}" if has_subtitles else None,
-                "size": file_stat.st_size,
-                "created_at": created_at,
-                "title": f"Sustainability Story",
-                "type": "video"
-            })
+        # ETag covers the catalog version and the query, so unchanged pages revalidate as 304
+        query_key = json.dumps([theme, location, since, until, limit, offset])
+        etag = f'W/"videos-{catalog.version()}-{hashlib.md5(query_key.encode()).hexdigest()[:12]}"'
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers={"ETag": etag})
+        
+        rows, total = catalog.query(theme=theme, location=location, since=since, until=until, limit=limit, offset=offset)
+        videos = [video_view(row) for row in rows]
         
-        return {
-            "success": True,
-            "count": len(videos),
-            "videos": videos
-        }
+        return JSONResponse(
+            content={
+                "success": True,
+                "count": len(videos),
+                "total": total,
+                "limit": limit,
+                "offset": offset,
+                "videos": videos
+            },
+            headers={"ETag": etag, "Cache-Control": "no-cache"}
+        )
     except Exception as e:
         print(f"❌ Error listing videos: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def run_story_pipeline(location: str, theme: str = None, on_stage=None, location_data: dict = None) -> dict:
+    """
+    Run the full storytelling pipeline.
+
+    Executed on the job worker pool, never on the event loop.
+    """
+    print(f"📍 Generating story for location: {location}")
+    
+    # Run orchestrator pipeline (subtitles are written by its subtitle stage)
+    return get_orchestrator().run(location=location, theme=theme, on_stage=on_stage, location_data=location_data)
+
+
+def story_payload(result: dict, location: str) -> dict:
+    """Extract the client-facing story fields from an orchestrator result."""
+    return {
+        "success": bool(result.get("success")),
+        "video_path": result.get("final_video_path"),
+        "script_text": result.get("script_text"),
+        "audio_path": result.get("audio_path"),
+        "image_paths": result.get("image_paths") or [],
+        "theme": (result.get("stages", {}).get("sustainability_analysis") or {}).get("theme"),
+        "location": location,
+        "error": result.get("error")
+    }
+
+
+def job_view(job: dict) -> dict:
+    """Public representation of a job, with the raw pipeline result summarised."""
+    view = {key: value for key, value in job.items() if key != "result"}
+    view["result"] = story_payload(job["result"], job["location"]) if job.get("result") else None
+    return view
+
+
+# Background job queue (bounded worker pool, see JOB_WORKERS / JOB_QUEUE_LIMIT)
+job_manager = JobManager(runner=run_story_pipeline)
+
+
+def prepare_story_request(location: str, theme: str = None, location_data: dict = None) -> tuple:
+    """
+    Resolve a request's weather (cached) and its coalescing key.
+
+    Returns:
+        (location_data, coalesce_key); the key is None when it cannot be computed
+    """
+    if not (location_data and location_data.get("success")):
+        location_data = tool_registry.get("weather").run(location=location)
+    
+    try:
+        coalesce_key = get_orchestrator().coalescing_key(location, theme, location_data)
+    except Exception as e:
+        print(f"  ⚠️ Could not compute coalescing key: {e}")
+        coalesce_key = None
+    return location_data, coalesce_key
+
+
+reel_pool = ReelPool()
+reel_pool_warmer = ReelPoolWarmer(reel_pool, job_manager, prepare=prepare_story_request,
+                                  rate_limiter=imagen_rate_limiter())
+
+
+def submit_story_job(location: str, theme: str = None, location_data: dict = None) -> dict:
+    """
+    Queue a reel; serve a matching pre-rendered reel or join an identical
+    in-flight job when there is one.
+
+    Resolves the location's weather (cached) to build the coalescing key,
+    so call it off the event loop.
+    """
+    location_data, coalesce_key = prepare_story_request(location, theme, location_data)
+    
+    # The pool is only consulted when the warmer fills it (REEL_POOL_SIZE > 0)
+    if coalesce_key is not None and reel_pool_warmer.enabled:
+        reel_pool.record_demand(location, theme)
+        pooled = reel_pool.take(coalesce_key)
+        if pooled:
+            return job_manager.add_finished(location, theme, pooled)
+    
+    return job_manager.submit(location=location, theme=theme, location_data=location_data, coalesce_key=coalesce_key)
+
+
+def warm_up():
+    """
+    Load the heavy SDKs after the server is up, so the first reel does not pay for them.
+
+    Imports only, unless TOOL_WARMUP=true also builds the tools (model
+    initialisation, API clients).
+    """
+    start = time.perf_counter()
+    try:
+        get_orchestrator()
+        if GOOGLE_API_KEY:
+            gemini_sdk()
+        tool_registry.preload()
+        print(f"🔥 SDKs loaded in {time.perf_counter() - start:.1f}s")
+    except Exception as e:
+        print(f"  ⚠️ Warm-up import failed: {e}")
+    
+    if os.getenv('TOOL_WARMUP', 'false').lower() == 'true':
+        tool_registry.warm_up()
+
+
+@app.on_event("startup")
+def start_warm_up():
+    """Load SDKs in the background (STARTUP_WARMUP=false leaves them to the first request)"""
+    if os.getenv('STARTUP_WARMUP', 'true').lower() == 'true':
+        threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
+
+
+@app.on_event("startup")
+def start_reel_pool_warmer():
+    """Pre-render popular reels off-peak (REEL_POOL_SIZE > 0)"""
+    reel_pool_warmer.start()
+
+
+@app.on_event("shutdown")
+def shutdown_job_manager():
+    """Release the job worker pool and video assembly processes when the server stops"""
+    reel_pool_warmer.stop()
+    job_manager.shutdown()
+    tool_registry.shutdown()
+
+
+@app.post("/api/jobs", response_model=JobResponse, status_code=202)
+async def create_job(request: StoryRequest):
+    """Queue a story generation job (or join an identical in-flight one) and return its ID immediately"""
+    try:
+        job = await asyncio.to_thread(submit_story_job, request.location, request.theme)
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    
+    return JobResponse(
+        job_id=job["job_id"],
+        status=job["status"],
+        location=job["location"],
+        theme=job["theme"],
+        status_url=f"/api/jobs/{job['job_id']}"
+    )
+
+
+@app.post("/api/jobs/batch", status_code=202)
+async def create_job_batch(request: BatchStoryRequest):
+    """
+    Queue many story generation jobs at once.
+    
+    Environmental data is fetched once per distinct location, concurrently,
+    and handed to every job for that location. Items that do not fit in the
+    job queue are returned under "rejected".
+    """
+    if not request.items:
+        raise HTTPException(status_code=400, detail="No items to generate")
+    
+    weather_tool = tool_registry.get("weather")
+    location_data = await asyncio.to_thread(weather_tool.fetch_many, [item.location for item in request.items])
+    
+    jobs, rejected = [], []
+    for item in request.items:
+        try:
+            job = await asyncio.to_thread(submit_story_job, item.location, item.theme, location_data.get(item.location))
+        except QueueFullError as e:
+            rejected.append({"location": item.location, "theme": item.theme, "error": str(e)})
+            continue
+        jobs.append(JobResponse(
+            job_id=job["job_id"],
+            status=job["status"],
+            location=job["location"],
+            theme=job["theme"],
+            status_url=f"/api/jobs/{job['job_id']}"
+        ))
+    
+    return {
+        "success": bool(jobs),
+        "count": len(jobs),
+        "jobs": jobs,
+        "rejected": rejected
+    }
+
+
+@app.get("/api/jobs")
+async def list_jobs(limit: int = 50):
+    """List recent story generation jobs, newest first"""
+    jobs = job_manager.list(limit=max(1, min(limit, 500)))
+    return {
+        "success": True,
+        "count": len(jobs),
+        "jobs": [job_view(job) for job in jobs]
+    }
+
+
+@app.get("/api/jobs/{job_id}")
+async def get_job(job_id: str):
+    """Get per-stage status and, once finished, the result of a job"""
+    job = job_manager.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job_view(job)
+
+
+@app.get("/api/jobs/{job_id}/events")
+async def job_events(job_id: str, request: Request):
+    """
+    Stream a job's progress events as Server-Sent Events.
+
+    Events: job_started, stage_started/stage_completed/stage_failed,
+    script_ready, image_ready, audio_ready, encode_progress, video_ready
+    and finally job_finished. Reconnecting clients can send Last-Event-ID
+    to resume without replaying earlier events.
+    """
+    reporter = job_manager.reporter(job_id)
+    if not reporter:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    last_event_id = request.headers.get("last-event-id", "")
+    cursor = int(last_event_id) + 1 if last_event_id.isdigit() else 0
+    
+    async def event_stream():
+        nonlocal cursor
+        idle_polls = 0
+        while True:
+            events = reporter.events_since(cursor)
+            for event in events:
+                yield f"id: {event['id']}\nevent: {event['type']}\ndata: {json.dumps(event)}\n\n"
+                cursor = event["id"] + 1
+            
+            if reporter.closed and not reporter.events_since(cursor):
+                break
+            if await request.is_disconnected():
+                break
+            
+            # Comment line every ~15s keeps proxies from closing an idle stream
+            idle_polls = 0 if events else idle_polls + 1
+            if idle_polls >= 30:
+                idle_polls = 0
+                yield ": keep-alive\n\n"
+            await asyncio.sleep(0.5)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.get("/api/jobs/{job_id}/trace")
+async def get_job_trace(job_id: str):
+    """Span timeline of a job as Chrome trace-event JSON (open in chrome://tracing or ui.perfetto.dev)"""
+    trace = active_trace(job_id)
+    if trace is not None:
+        return trace.to_chrome_trace()
+    
+    job = job_manager.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    
+    trace_path = (job.get("result") or {}).get("trace_path")
+    if not trace_path or not os.path.exists(trace_path):
+        raise HTTPException(status_code=404, detail="No trace recorded for this job yet")
+    
+    with open(trace_path, 'rb') as f:
+        body = await asyncio.to_thread(f.read)
+    return Response(content=body, media_type="application/json")
+
+
+def _job_metrics() -> list:
+    return [
+        ("arogya_jobs", "gauge", "Tracked jobs by status",
+         [({"status": status}, count) for status, count in job_manager.status_counts().items()]),
+        ("arogya_reel_pool_ready", "gauge", "Pre-rendered reels ready to serve",
+         [({}, reel_pool.stats()["ready"])] if reel_pool_warmer.enabled else [])
+    ]
+
+
+metrics_registry.register_collector(_job_metrics)
+
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus metrics: stage and external API latency, retries, fallbacks, rate-limit waits, caches and jobs"""
+    body = await asyncio.to_thread(render_metrics)
+    return Response(content=body, media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+@app.get("/api/cache/stats")
+async def cache_stats():
+    """Hit/miss statistics for the artifact caches (images, ...), in-memory caches (weather, ...) and SQLite caches (scripts)"""
+    return {
+        "success": True,
+        "caches": {**all_cache_stats(), **all_ttl_cache_stats(), **all_sqlite_cache_stats()},
+        "reel_pool": {"enabled": True, **reel_pool.stats()} if reel_pool_warmer.enabled else {"enabled": False}
+    }
+
+
+async def wait_for_job_result(job_id: str) -> dict:
+    """Await a job's pipeline result without blocking the event loop."""
+    future = job_manager.future(job_id)
+    if future is not None:
+        return await asyncio.wrap_future(future)
+    
+    # Coalesced into a job another server process runs: poll the shared store
+    # (polling also fails jobs whose worker died)
+    deadline = time.monotonic() + JOB_WAIT_TIMEOUT
+    while time.monotonic() < deadline:
+        job = await asyncio.to_thread(job_manager.get, job_id)
+        if job is None:
+            raise RuntimeError(f"Job {job_id} disappeared")
+        if job["status"] in ("succeeded", "failed"):
+            return job["result"] or {"success": False, "error": job["error"]}
+        await asyncio.sleep(1)
+    return {"success": False, "error": f"Job {job_id} did not finish within {JOB_WAIT_TIMEOUT:.0f}s"}
+
+
 @app.post("/api/generate-story", response_model=StoryResponse)
 async def generate_story(request: StoryRequest):
-    """Generate empathetic sustainability story"""
+    """Generate empathetic sustainability story (waits for the queued job to finish)"""
     try:
-        print(f"📍 Generating story for location: {request.location}")
-        
-        # Run orchestrator pipeline
-        result = orchestrator.run(
-            location=request.location,
-            theme=request.theme
-        )
-        
-        if not result.get("success"):
-            raise HTTPException(
-                status_code=500,
-                detail=result.get("error", "Story generation failed")
-            )
-        
-        # Generate subtitle file from script
-        script_text = result.get("script_text")
-        video_path = result.get("final_video_path")
-        
-        if script_text and video_path:
-            subtitle_path = generate_subtitles(script_text, video_path)
-            print(f"✅ Generated subtitles: {subtitle_path}")
-        
-        return StoryResponse(
-            success=True,
-            video_path=result.get("final_video_path"),
-            script_text=result.get("script_text"),
-            audio_path=result.get("audio_path"),
-            image_paths=result.get("image_paths", []),
-            theme=result.get("stages", {}).get("sustainability_analysis", {}).get("theme"),
-            location=request.location
-        )
-        
+        job = await asyncio.to_thread(submit_story_job, request.location, request.theme)
+    except QueueFullError as e:
+        raise HTTPException(status_code=429, detail=str(e))
+    
+    try:
+        result = await wait_for_job_result(job["job_id"])
     except Exception as e:
         print(f"❌ Error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
+    
+    if not result or not result.get("success"):
+        raise HTTPException(
+            status_code=500,
+            detail=(result or {}).get("error", "Story generation failed")
+        )
+    
+    return StoryResponse(**story_payload(result, request.location))
 
 
 @app.post("/api/validate-challenge", response_model=ChallengeValidationResponse)
@@ -394,7 +707,7 @@ async def validate_challenge(request: ChallengeValidationRequest):
         image_bytes = base64.b64decode(image_data)
         
         # Create Gemini model
-        model = genai.GenerativeModel('gemini-1.5-flash')
+        model = gemini_sdk().GenerativeModel('gemini-1.5-flash')
         
         # Create validation prompt based on challenge type
         if request.challengeType == 'ticket':
@@ -437,10 +750,12 @@ async def validate_challenge(request: ChallengeValidationRequest):
             )
         
         # Generate response with image
-        response = model.generate_content([
-            prompt,
-            {"mime_type": "image/jpeg", "data": image_bytes}
-        ])
+        # The SDK call blocks; run it off the event loop so other requests keep flowing
+        with external_call("gemini_vision"):
+            response = await asyncio.to_thread(model.generate_content, [
+                prompt,
+                {"mime_type": "image/jpeg", "data": image_bytes}
+            ])
         
         result_text = response.text.strip()
         print(f"🤖 Gemini validation result: {result_text}")
@@ -471,48 +786,49 @@ async def validate_challenge(request: ChallengeValidationRequest):
 
 
 @app.get("/api/video/{filename}")
-async def get_video(filename: str):
+async def get_video(request: Request, filename: str):
     """Serve generated video file"""
     video_path = os.path.join(VIDEOS_DIR, filename)
     
     if not os.path.exists(video_path):
         raise HTTPException(status_code=404, detail="Video not found")
     
-    return FileResponse(
-        video_path,
-        media_type="video/mp4",
-        filename=filename
-    )
+    return await asyncio.to_thread(media_response, request, video_path, "video/mp4", filename=filename)
 
 
 @app.get("/api/audio/{filename}")
-async def get_audio(filename: str):
+async def get_audio(request: Request, filename: str):
     """Serve generated audio file"""
     audio_path = os.path.join(AUDIO_DIR, filename)
     
     if not os.path.exists(audio_path):
         raise HTTPException(status_code=404, detail="Audio not found")
     
-    return FileResponse(
-        audio_path,
-        media_type="audio/mpeg",
-        filename=filename
-    )
+    return await asyncio.to_thread(media_response, request, audio_path, "audio/mpeg", filename=filename)
+
+
+@app.get("/api/assets/{asset_path:path}")
+async def get_asset(request: Request, asset_path: str):
+    """Serve a generated image (paths as reported by image_ready progress events)"""
+    assets_root = os.path.realpath(VIDEO_ASSETS_DIR)
+    file_path = os.path.realpath(os.path.join(assets_root, asset_path))
+    
+    if not file_path.startswith(assets_root + os.sep) or not os.path.isfile(file_path):
+        raise HTTPException(status_code=404, detail="Asset not found")
+    
+    return await asyncio.to_thread(media_response, request, file_path, "image/png")
 
 
 @app.get("/api/subtitles/{filename}")
-async def get_subtitles(filename: str):
+async def get_subtitles(request: Request, filename: str):
     """Serve subtitle file (WebVTT format)"""
     subtitle_path = os.path.join(SUBTITLES_DIR, filename)
     
     if not os.path.exists(subtitle_path):
         raise HTTPException(status_code=404, detail="Subtitles not found")
     
-    return FileResponse(
-        subtitle_path,
-        media_type="text/vtt",
-        filename=filename
-    )
+    # Subtitles can be regenerated for backfilled videos, so revalidate instead of caching forever
+    return await asyncio.to_thread(media_response, request, subtitle_path, "text/vtt", immutable=False, filename=filename)
 
 
 if __name__ == "__main__":
@@ -533,5 +849,18 @@ if __name__ == "__main__":
         print(f"⚠️  Port 8000 busy, using port {port} instead")
     
     print(f"🌐 Server will run on: http://localhost:{port}")
-    uvicorn.run(app, host="0.0.0.0", port=port)
+    if API_WORKERS > 1:
+        print(f"👷 {API_WORKERS} worker processes (job store: {os.environ['JOB_STORE']}, "
+              f"rate limits: {os.environ['RATE_LIMIT_BACKEND']})")
+        # Hand over to the uvicorn CLI: spawned workers would otherwise re-run this
+        # script as __mp_main__ and build every service twice. The shared-store
+        # settings above are inherited through the environment
+        import sys
+        os.execv(sys.executable, [
+            sys.executable, "-m", "uvicorn", "api_server:app",
+            "--app-dir", os.path.dirname(os.path.abspath(__file__)),
+            "--host", "0.0.0.0", "--port", str(port), "--workers", str(API_WORKERS)
+        ])
+    else:
+        uvicorn.run(app, host="0.0.0.0", port=port)
 
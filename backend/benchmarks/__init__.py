@@ -0,0 +1 @@
+# Offline benchmarks for the reel pipeline (run from backend/: python -m benchmarks.<name>)
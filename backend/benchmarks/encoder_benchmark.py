@@ -0,0 +1,177 @@
+"""
+Encoder profile benchmark: speed, size and quality per profile.
+
+Renders one fixed fixture reel (seeded synthetic images with gradients,
+shapes and grain, plus silent narration) under each encoder profile with
+the ffmpeg renderer, and measures encode time, output bytes and PSNR/SSIM
+against a lossless (CRF 0) render of the same filter graph. No frame or
+segment caches are involved, so timings are full encodes.
+
+Usage (from backend/):
+    python -m benchmarks.encoder_benchmark
+    python -m benchmarks.encoder_benchmark --profiles draft social --iterations 3 --output encoders.json
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+import numpy as np
+from PIL import Image, ImageDraw
+
+from sub_agents.video_agent.encoder_profiles import ENCODER_PROFILES, get_profile
+from sub_agents.video_agent.ffmpeg_renderer import FFmpegSlideshowRenderer, find_ffmpeg, run_ffmpeg
+
+FIXTURE_SIZE = (768, 1408)  # Imagen 9:16 output
+FIXTURE_IMAGES = 5
+REEL_DURATION = 15.0
+
+
+def build_fixture(work_dir: str, num_images: int = FIXTURE_IMAGES, seed: int = 7) -> tuple:
+    """Write deterministic fixture images and a silent audio track; returns (image_paths, audio_path)."""
+    rng = np.random.default_rng(seed)
+    width, height = FIXTURE_SIZE
+    image_paths = []
+    for i in range(num_images):
+        # Smooth colour gradient as a stand-in for sky and landscape
+        y, x = np.mgrid[0:height, 0:width]
+        base = rng.integers(40, 200, size=3)
+        slope = rng.uniform(-0.08, 0.08, size=(2, 3))
+        pixels = base + x[..., None] * slope[0] + y[..., None] * slope[1]
+
+        # Film-grain texture, the part that is expensive to encode
+        pixels += rng.normal(0, 6, size=(height, width, 3))
+        img = Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8))
+
+        # Hard-edged shapes for detail
+        draw = ImageDraw.Draw(img)
+        for _ in range(12):
+            x0, y0 = rng.integers(0, width - 50), rng.integers(0, height - 50)
+            size = int(rng.integers(30, 250))
+            color = tuple(int(c) for c in rng.integers(0, 256, size=3))
+            if rng.random() < 0.5:
+                draw.ellipse([x0, y0, x0 + size, y0 + size], fill=color)
+            else:
+                draw.rectangle([x0, y0, x0 + size, y0 + size // 2], fill=color)
+
+        path = os.path.join(work_dir, f"fixture_{i}.png")
+        img.save(path)
+        image_paths.append(path)
+
+    audio_path = os.path.join(work_dir, "fixture_audio.wav")
+    run_ffmpeg([
+        find_ffmpeg(), '-y', '-hide_banner', '-loglevel', 'error',
+        '-f', 'lavfi', '-i', 'anullsrc=r=24000:cl=mono', '-t', str(REEL_DURATION), audio_path
+    ])
+    return image_paths, audio_path
+
+
+def measure_quality(distorted_path: str, reference_path: str) -> dict:
+    """PSNR (dB, average over Y/U/V) and SSIM (All) of a render against the reference."""
+    cmd = [
+        find_ffmpeg(), '-hide_banner', '-nostats',
+        '-i', distorted_path, '-i', reference_path,
+        '-lavfi', "[0:v]split[d0][d1];[1:v]split[r0][r1];[d0][r0]psnr;[d1][r1]ssim",
+        '-f', 'null', '-'
+    ]
+    stderr = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True).stderr
+    psnr = re.search(r"PSNR .*average:(inf|[\d.]+)", stderr)
+    ssim = re.search(r"SSIM .*All:([\d.]+)", stderr)
+    return {
+        "psnr_db": float(psnr.group(1)) if psnr else None,
+        "ssim": float(ssim.group(1)) if ssim else None
+    }
+
+
+def benchmark_profile(profile: dict, image_paths: list, audio_path: str, output_path: str,
+                      reference_path: str, iterations: int = 1) -> dict:
+    """Encode the fixture reel ``iterations`` times with a profile and measure the result."""
+    renderer = FFmpegSlideshowRenderer(profile=profile)
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        renderer.render(image_paths, audio_path, output_path, duration=REEL_DURATION)
+        timings.append(time.perf_counter() - start)
+
+    output_bytes = os.path.getsize(output_path)
+    return {
+        "profile": profile["name"],
+        "settings": {key: value for key, value in profile.items() if key != "name"},
+        "encode_seconds": round(statistics.median(timings), 3),
+        "output_bytes": output_bytes,
+        "bitrate_kbps": round(output_bytes * 8 / REEL_DURATION / 1000, 1),
+        **measure_quality(output_path, reference_path)
+    }
+
+
+def print_table(rows: list):
+    print(f"\n{'profile':<10}{'encode s':>10}{'bytes':>12}{'kbps':>9}{'PSNR dB':>10}{'SSIM':>9}")
+    print("-" * 60)
+    for row in rows:
+        psnr = f"{row['psnr_db']:.2f}" if row["psnr_db"] is not None else "n/a"
+        ssim = f"{row['ssim']:.4f}" if row["ssim"] is not None else "n/a"
+        print(f"{row['profile']:<10}{row['encode_seconds']:>10.2f}{row['output_bytes']:>12}"
+              f"{row['bitrate_kbps']:>9.0f}{psnr:>10}{ssim:>9}")
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description="Compare encoder profiles on a fixed fixture reel")
+    parser.add_argument('--profiles', nargs='+', choices=list(ENCODER_PROFILES), default=list(ENCODER_PROFILES))
+    parser.add_argument('--iterations', type=int, default=1, help="Encodes per profile (median time is reported)")
+    parser.add_argument('--output', help="Write results JSON here")
+    parser.add_argument('--keep-artifacts', action='store_true', help="Keep the fixture and rendered reels")
+    args = parser.parse_args(argv)
+
+    work_dir = tempfile.mkdtemp(prefix="encoder_bench_")
+    try:
+        image_paths, audio_path = build_fixture(work_dir)
+
+        # Lossless render of the same filter graph, so scores measure encoder loss only
+        reference_path = os.path.join(work_dir, "reference.mp4")
+        reference = {"name": "reference", **ENCODER_PROFILES["draft"], "crf": 0}
+        FFmpegSlideshowRenderer(profile=reference).render(image_paths, audio_path, reference_path,
+                                                          duration=REEL_DURATION)
+
+        print(f"⏱️  Encoding a {REEL_DURATION:.0f}s fixture reel ({len(image_paths)} images) per profile")
+        rows = []
+        for name in args.profiles:
+            row = benchmark_profile(get_profile(name), image_paths, audio_path,
+                                    os.path.join(work_dir, f"{name}.mp4"), reference_path, args.iterations)
+            rows.append(row)
+            print(f"  ✓ {name}: {row['encode_seconds']:.2f}s")
+
+        print_table(rows)
+
+        if args.output:
+            results = {
+                "meta": {
+                    "timestamp": datetime.now().isoformat(),
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "cpu_count": os.cpu_count(),
+                    "iterations": args.iterations,
+                    "duration": REEL_DURATION
+                },
+                "profiles": rows
+            }
+            with open(args.output, 'w') as f:
+                json.dump(results, f, indent=2)
+            print(f"\n💾 Results written to {args.output}")
+    finally:
+        if args.keep_artifacts:
+            print(f"📁 Artifacts kept in {work_dir}")
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
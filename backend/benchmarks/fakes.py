@@ -0,0 +1,98 @@
+"""
+Deterministic offline stand-ins for the networked sub-agent tools.
+
+They return the same shapes as the real tools, so OrchestratorTool runs
+unchanged; the work they skip is exactly the remote latency the pipeline
+benchmark is not trying to measure.
+"""
+import os
+import random
+import wave
+import zlib
+from datetime import datetime
+
+from PIL import Image
+
+from sub_agents.location_data_agent.mock_weather_tool import MockWeatherAPITool
+
+# Solid colours cycled across generated frames
+PALETTE = [(231, 111, 81), (42, 157, 143), (233, 196, 106), (38, 70, 83), (244, 162, 97)]
+
+SCRIPT_TEMPLATE = (
+    "In {location}, every day brings new challenges for families and neighbours. "
+    "But small choices add up: planting trees, saving water, sharing rides and "
+    "looking out for one another. Together we can build a kinder, greener tomorrow."
+)
+
+
+class FakeWeatherTool(MockWeatherAPITool):
+    """MockWeatherAPITool with a per-location seed, so readings repeat across runs."""
+
+    def run(self, location: str) -> dict:
+        random.seed(zlib.crc32(location.lower().encode()))
+        return super().run(location=location)
+
+
+class FakeScriptTool:
+    """Fixed-length script instead of a Gemini call."""
+
+    def run(self, location: str, location_data: dict, sustainability_analysis: dict) -> dict:
+        script = SCRIPT_TEMPLATE.format(location=location)
+        return {
+            "script": script,
+            "word_count": len(script.split()),
+            "theme": sustainability_analysis.get("theme"),
+            "timestamp": datetime.now().isoformat(),
+            "fallback": False
+        }
+
+
+class FakeImageTool:
+    """Writes solid-colour PNGs at Imagen's 9:16 output size instead of calling Imagen."""
+
+    def __init__(self, output_dir: str, width: int = 768, height: int = 1408):
+        self.output_dir = output_dir
+        self.width = width
+        self.height = height
+        os.makedirs(output_dir, exist_ok=True)
+
+    def run(self, script: str, theme: str, num_images: int = 5) -> dict:
+        image_paths = []
+        for i in range(num_images):
+            path = os.path.join(self.output_dir, f"fake_{theme}_{i}.png")
+            Image.new("RGB", (self.width, self.height), PALETTE[i % len(PALETTE)]).save(path)
+            image_paths.append(path)
+        return {
+            "image_paths": image_paths,
+            "theme": theme,
+            "timestamp": datetime.now().isoformat()
+        }
+
+
+class SilentVoiceTool:
+    """Writes silent 16-bit mono WAV audio as long as the narration would be."""
+
+    WORDS_PER_SECOND = 2.5
+
+    def __init__(self, output_dir: str, sample_rate: int = 24000):
+        self.output_dir = output_dir
+        self.sample_rate = sample_rate
+        os.makedirs(output_dir, exist_ok=True)
+
+    def run(self, script: str) -> dict:
+        duration = len(script.split()) / self.WORDS_PER_SECOND
+        audio_filename = f"silent_{datetime.now().strftime('%Y%m%d_%H%M%S_%f')}.wav"
+        audio_path = os.path.join(self.output_dir, audio_filename)
+
+        with wave.open(audio_path, 'wb') as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(self.sample_rate)
+            wav.writeframes(b'\x00\x00' * int(duration * self.sample_rate))
+
+        return {
+            "audio_path": audio_path,
+            "filename": audio_filename,
+            "duration_estimate": duration,
+            "timestamp": datetime.now().isoformat()
+        }
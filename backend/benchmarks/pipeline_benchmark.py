@@ -0,0 +1,372 @@
+"""
+End-to-end reel pipeline benchmark, fully offline.
+
+Runs OrchestratorTool with deterministic fakes for weather, Gemini, Imagen
+and TTS (see benchmarks/fakes.py); sustainability analysis, subtitles and
+video assembly are the real tools. Records per-stage latency, peak RSS and
+output size, writes the results as JSON and optionally compares them with
+an earlier run.
+
+Usage (from backend/):
+    python -m benchmarks.pipeline_benchmark --iterations 3 --output bench.json
+    python -m benchmarks.pipeline_benchmark --baseline bench.json --threshold 0.2
+    python -m benchmarks.pipeline_benchmark --warm-caches --output bench-warm.json
+    python -m benchmarks.pipeline_benchmark --compare old.json new.json
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:
+    # Windows: peak RSS is reported as None
+    resource = None
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _descendant_pids(root: int) -> list:
+    """All processes below ``root`` (Linux /proc), e.g. assembly pool workers and their ffmpeg."""
+    children = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                # "pid (comm) state ppid ..."; comm may contain spaces
+                ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+
+    pids, pending = [], [root]
+    while pending:
+        for child in children.get(pending.pop(), []):
+            pids.append(child)
+            pending.append(child)
+    return pids
+
+
+def _status_kib(pid: int, field: str) -> int:
+    """A memory field (VmRSS, VmHWM) of /proc/<pid>/status in KiB, 0 if the process is gone."""
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith(field + ':'):
+                    return int(line.split()[1])
+    except (OSError, ValueError):
+        pass
+    return 0
+
+
+class ProcessTreeSampler:
+    """
+    Samples the memory of every process below this one while a run is going.
+
+    getrusage(RUSAGE_CHILDREN) only covers direct children that have
+    exited, so it misses the long-lived assembly pool workers and the ffmpeg
+    processes they start. Each sample walks /proc for all descendants and
+    records the largest peak (VmHWM) of any one of them and the largest
+    combined RSS of the whole tree. Not available off Linux.
+
+    Args:
+        interval: Seconds between samples
+    """
+
+    def __init__(self, interval: float = 0.05):
+        self.interval = interval
+        self.available = os.path.isdir('/proc/self')
+        self.largest_child_kib = 0
+        self.tree_kib = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def __enter__(self):
+        if self.available:
+            self._thread = threading.Thread(target=self._loop, name="rss-sampler", daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self._thread:
+            self._stop.set()
+            self._thread.join()
+            self.sample()
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            self.sample()
+
+    def sample(self):
+        pids = _descendant_pids(os.getpid())
+        self.largest_child_kib = max([self.largest_child_kib] + [_status_kib(pid, 'VmHWM') for pid in pids])
+        tree = _status_kib(os.getpid(), 'VmRSS') + sum(_status_kib(pid, 'VmRSS') for pid in pids)
+        self.tree_kib = max(self.tree_kib, tree)
+
+
+def peak_rss_mb(sampler: ProcessTreeSampler = None) -> dict:
+    """
+    Peak resident set size: this process, its largest child and the whole process tree.
+
+    Without a sampler (or off Linux) children come from getrusage, which
+    only sees exited direct children such as ffmpeg, and the tree is None.
+    Where getrusage does not exist (Windows) every value is None.
+    """
+    if resource is None:
+        return {"self": None, "children": None, "tree": None}
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    scale = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale
+    tree = None
+    if sampler is not None and sampler.available:
+        children = max(children, sampler.largest_child_kib / 1024)
+        tree = round(sampler.tree_kib / 1024, 1)
+    return {
+        "self": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale, 1),
+        "children": round(children, 1),
+        "tree": tree
+    }
+
+
+def build_registry(work_dir: str):
+    """Tool registry with offline fakes in place of the networked tools."""
+    from orchestrator_agent.tool_registry import create_default_registry
+    from benchmarks.fakes import FakeWeatherTool, FakeScriptTool, FakeImageTool, SilentVoiceTool
+
+    registry = create_default_registry()
+    registry.override("weather", FakeWeatherTool())
+    registry.override("script", FakeScriptTool())
+    registry.override("images", FakeImageTool(os.path.join(work_dir, "images")))
+    registry.override("voice", SilentVoiceTool(os.path.join(work_dir, "audio")))
+    return registry
+
+
+def run_once(orchestrator, location: str, theme: str, keep_artifacts: bool = False) -> dict:
+    """Run the pipeline once and collect timings and output size."""
+    started = {}
+    stages = {}
+
+    def on_stage(stage: str, status: str):
+        now = time.perf_counter()
+        if status == "running":
+            started[stage] = now
+        elif stage in started:
+            stages[stage] = round(now - started[stage], 4)
+
+    start = time.perf_counter()
+    with ProcessTreeSampler() as sampler:
+        result = orchestrator.run(location=location, theme=theme, on_stage=on_stage)
+    total = round(time.perf_counter() - start, 4)
+
+    video_path = result.get("final_video_path")
+    video_bytes = os.path.getsize(video_path) if video_path and os.path.exists(video_path) else None
+
+    if not keep_artifacts:
+        # Benchmark reels (and their traces) must not show up in the app's data
+        for path in (video_path, result.get("subtitle_path"), result.get("trace_path")):
+            if path and os.path.exists(path):
+                os.remove(path)
+
+    return {
+        "success": result.get("success", False),
+        "error": result.get("error"),
+        "total_seconds": total,
+        "stages": stages,
+        "video_bytes": video_bytes,
+        "peak_rss_mb": peak_rss_mb(sampler)
+    }
+
+
+def summarize(runs: list) -> dict:
+    """Median / min / max per stage and for the whole pipeline."""
+    series = {"total": [run["total_seconds"] for run in runs]}
+    for run in runs:
+        for stage, seconds in run["stages"].items():
+            series.setdefault(stage, []).append(seconds)
+
+    summary = {
+        name: {
+            "median": round(statistics.median(values), 4),
+            "min": round(min(values), 4),
+            "max": round(max(values), 4)
+        }
+        for name, values in series.items()
+    }
+    sizes = [run["video_bytes"] for run in runs if run["video_bytes"]]
+    summary["video_bytes"] = {"median": int(statistics.median(sizes))} if sizes else None
+    summary["peak_rss_mb"] = runs[-1]["peak_rss_mb"] if runs else None
+    return summary
+
+
+def compare_results(baseline: dict, current: dict, threshold: float = 0.2, min_seconds: float = 0.05) -> list:
+    """
+    Compare two benchmark result files.
+
+    Args:
+        baseline: Earlier results (as written by this script)
+        current: New results
+        threshold: Relative slowdown (0.2 = 20%) reported as a regression
+        min_seconds: Absolute slowdown a timing must also exceed, so
+            sub-millisecond stages are not flagged on noise
+
+    Returns:
+        List of row dictionaries (metric, baseline, current, change, regression)
+    """
+    rows = []
+    base_summary, cur_summary = baseline["summary"], current["summary"]
+    base_caches = baseline.get("meta", {}).get("video_caches")
+    cur_caches = current.get("meta", {}).get("video_caches")
+    if base_caches != cur_caches:
+        print(f"⚠️  Comparing runs with different video caches ({base_caches} vs {cur_caches})")
+
+    for name, cur in cur_summary.items():
+        base = base_summary.get(name)
+        if not isinstance(cur, dict) or not isinstance(base, dict) or "median" not in cur or "median" not in base:
+            continue
+        change = (cur["median"] - base["median"]) / base["median"] if base["median"] else 0.0
+        significant = name == "video_bytes" or cur["median"] - base["median"] > min_seconds
+        rows.append({
+            "metric": name,
+            "baseline": base["median"],
+            "current": cur["median"],
+            "change": round(change, 4),
+            "regression": change > threshold and significant
+        })
+
+    # The whole tree includes the assembly pool workers; older results only have "self"
+    for scope in ("tree", "self"):
+        base_rss = (base_summary.get("peak_rss_mb") or {}).get(scope)
+        cur_rss = (cur_summary.get("peak_rss_mb") or {}).get(scope)
+        if base_rss and cur_rss:
+            change = (cur_rss - base_rss) / base_rss
+            rows.append({
+                "metric": "peak_rss_mb" if scope == "self" else f"peak_rss_mb_{scope}",
+                "baseline": base_rss,
+                "current": cur_rss,
+                "change": round(change, 4),
+                "regression": change > threshold
+            })
+    return rows
+
+
+def print_comparison(rows: list):
+    print(f"\n{'metric':<26}{'baseline':>12}{'current':>12}{'change':>10}")
+    print("-" * 60)
+    for row in rows:
+        flag = "  ⚠️ regression" if row["regression"] else ""
+        print(f"{row['metric']:<26}{row['baseline']:>12}{row['current']:>12}{row['change'] * 100:>9.1f}%{flag}")
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=BACKEND_DIR,
+            stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True
+        ).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description="Offline benchmark for the reel pipeline")
+    parser.add_argument('--location', default='Mumbai')
+    parser.add_argument('--theme', default='Heat & Summer')
+    parser.add_argument('--iterations', type=int, default=3)
+    parser.add_argument('--warmup', type=int, default=1, help="Untimed runs first (imports, tool construction)")
+    parser.add_argument('--output', help="Write results JSON here")
+    parser.add_argument('--baseline', help="Compare against an earlier results JSON")
+    parser.add_argument('--compare', nargs=2, metavar=('BASELINE', 'CURRENT'),
+                        help="Only compare two results files")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="Relative slowdown treated as a regression (default 0.2)")
+    parser.add_argument('--keep-artifacts', action='store_true', help="Keep the rendered reels")
+    parser.add_argument('--warm-caches', action='store_true',
+                        help="Enable the frame and segment caches, so timed runs measure cache hits")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        with open(args.compare[0]) as f:
+            baseline = json.load(f)
+        with open(args.compare[1]) as f:
+            current = json.load(f)
+        rows = compare_results(baseline, current, args.threshold)
+        print_comparison(rows)
+        return 1 if any(row["regression"] for row in rows) else 0
+
+    work_dir = tempfile.mkdtemp(prefix="reel_bench_")
+    # Keep benchmark reels out of the app's catalog
+    os.environ.setdefault('VIDEO_CATALOG_DB', os.path.join(work_dir, 'catalog.db'))
+    # Caches would turn video assembly into a remux after the warm-up run, so they are
+    # off unless asked for, and never touch the app's cache directories
+    # (set before the assembly pool spawns its workers, which read them)
+    cache_state = "warm" if args.warm_caches else "disabled"
+    for cache in ("FRAME", "SEGMENT"):
+        os.environ[f'{cache}_CACHE_ENABLED'] = 'true' if args.warm_caches else 'false'
+        os.environ[f'{cache}_CACHE_DIR'] = os.path.join(work_dir, f"{cache.lower()}_cache")
+
+    from orchestrator_agent.orchestrator_tool import OrchestratorTool
+    orchestrator = OrchestratorTool(tools=build_registry(work_dir))
+
+    print(f"⏱️  Benchmarking {args.location} / {args.theme}: {args.warmup} warm-up + {args.iterations} timed runs "
+          f"(frame/segment caches {cache_state})")
+    for _ in range(args.warmup):
+        run_once(orchestrator, args.location, args.theme, args.keep_artifacts)
+
+    runs = []
+    for i in range(args.iterations):
+        run = run_once(orchestrator, args.location, args.theme, args.keep_artifacts)
+        runs.append(run)
+        status = "✓" if run["success"] else f"✗ {run['error']}"
+        print(f"  Run {i + 1}/{args.iterations}: {run['total_seconds']:.2f}s {status}")
+
+    results = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "location": args.location,
+            "theme": args.theme,
+            "iterations": args.iterations,
+            "video_renderer": os.getenv('VIDEO_RENDERER', 'ffmpeg'),
+            "video_caches": cache_state
+        },
+        "runs": runs,
+        "summary": summarize(runs)
+    }
+
+    print("\n📊 Median seconds per stage:")
+    for name, stats in results["summary"].items():
+        if isinstance(stats, dict) and "min" in stats:
+            print(f"  {name:<26}{stats['median']:>8.3f}  (min {stats['min']:.3f}, max {stats['max']:.3f})")
+    print(f"  Peak RSS: {results['summary']['peak_rss_mb']} MB")
+    print(f"  Video size: {results['summary']['video_bytes']}")
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Results written to {args.output}")
+
+    exit_code = 0 if all(run["success"] for run in runs) else 1
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        rows = compare_results(baseline, results, args.threshold)
+        print_comparison(rows)
+        if any(row["regression"] for row in rows):
+            exit_code = 1
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
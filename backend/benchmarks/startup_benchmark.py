@@ -0,0 +1,221 @@
+"""
+Cold-start benchmark for the API server.
+
+Each iteration starts a fresh interpreter twice: once to time
+``import api_server`` (with ``-X importtime`` for the slowest imports), and
+once to launch uvicorn and time how long until ``/health`` and
+``/api/videos`` answer. It also checks that none of the heavy SDKs are
+imported at module load. Results are written as JSON and can be compared
+with an earlier run, like the pipeline benchmark.
+
+Usage (from backend/):
+    python -m benchmarks.startup_benchmark --iterations 5 --output startup.json
+    python -m benchmarks.startup_benchmark --baseline startup.json --budget 3
+"""
+import argparse
+import json
+import os
+import platform
+import re
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from datetime import datetime
+
+from benchmarks.pipeline_benchmark import BACKEND_DIR, compare_results, git_revision, print_comparison
+
+# Must only be loaded lazily or by the warm-up thread, never by ``import api_server``
+HEAVY_MODULES = (
+    "google.adk",
+    "google.generativeai",
+    "google.genai",
+    "vertexai",
+    "google.cloud.texttospeech",
+    "moviepy.editor"
+)
+
+IMPORT_PROBE = (
+    "import json, sys, time\n"
+    "start = time.perf_counter()\n"
+    "import api_server\n"
+    "seconds = time.perf_counter() - start\n"
+    "print(json.dumps({'seconds': seconds, 'heavy': [m for m in %r if m in sys.modules]}))\n"
+) % (HEAVY_MODULES,)
+
+_IMPORTTIME_LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \|(\s+)(\S+)")
+
+
+def benchmark_env(work_dir: str) -> dict:
+    """Environment for the server under test: its own databases, no pre-rendering."""
+    env = dict(os.environ)
+    env.update({
+        "VIDEO_CATALOG_DB": os.path.join(work_dir, "catalog.db"),
+        "REEL_POOL_DB": os.path.join(work_dir, "reel_pool.db"),
+        "REEL_POOL_SIZE": "0",
+        "PYTHONWARNINGS": "ignore"
+    })
+    return env
+
+
+def slowest_imports(importtime_output: str, top: int = 10) -> list:
+    """Top-level imports by cumulative time, from ``-X importtime`` output."""
+    imports = []
+    for line in importtime_output.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        # Indented one level below api_server: its direct imports
+        if match and len(match.group(3)) == 3:
+            imports.append({"module": match.group(4), "seconds": round(int(match.group(2)) / 1e6, 4)})
+    imports.sort(key=lambda item: item["seconds"], reverse=True)
+    return imports[:top]
+
+
+def measure_import(env: dict) -> dict:
+    """Time ``import api_server`` in a fresh interpreter."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", IMPORT_PROBE], cwd=BACKEND_DIR, env=env,
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True, timeout=120
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import api_server failed:\n{proc.stderr[-2000:]}")
+    probe = json.loads(proc.stdout.strip().splitlines()[-1])
+    return {
+        "seconds": round(probe["seconds"], 4),
+        "heavy_modules": probe["heavy"],
+        "slowest_imports": slowest_imports(proc.stderr)
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def wait_for(url: str, deadline: float) -> bool:
+    while time.perf_counter() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1) as response:
+                if response.status == 200:
+                    return True
+        except OSError:
+            time.sleep(0.02)
+    return False
+
+
+def measure_first_response(env: dict, timeout: float = 60.0) -> dict:
+    """Launch uvicorn and time until /health, then /api/videos, answer."""
+    port = free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "api_server:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    try:
+        deadline = start + timeout
+        if not wait_for(f"{base_url}/health", deadline):
+            raise RuntimeError(f"/health did not answer within {timeout}s")
+        health = time.perf_counter() - start
+        if not wait_for(f"{base_url}/api/videos?limit=1", deadline):
+            raise RuntimeError(f"/api/videos did not answer within {timeout}s")
+        videos = time.perf_counter() - start
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            server.kill()
+    return {"health_seconds": round(health, 4), "videos_seconds": round(videos, 4)}
+
+
+def summarize(runs: list) -> dict:
+    series = {
+        "import_api_server": [run["import"]["seconds"] for run in runs],
+        "first_health": [run["serve"]["health_seconds"] for run in runs],
+        "first_videos": [run["serve"]["videos_seconds"] for run in runs]
+    }
+    return {
+        name: {
+            "median": round(statistics.median(values), 4),
+            "min": round(min(values), 4),
+            "max": round(max(values), 4)
+        }
+        for name, values in series.items()
+    }
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description="Cold-start benchmark for the API server")
+    parser.add_argument('--iterations', type=int, default=5)
+    parser.add_argument('--budget', type=float, default=3.0,
+                        help="Seconds within which /api/videos must answer (median)")
+    parser.add_argument('--output', help="Write results JSON here")
+    parser.add_argument('--baseline', help="Compare against an earlier results JSON")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="Relative slowdown treated as a regression (default 0.2)")
+    args = parser.parse_args(argv)
+
+    work_dir = tempfile.mkdtemp(prefix="startup_bench_")
+    env = benchmark_env(work_dir)
+
+    print(f"⏱️  Cold-starting the API server {args.iterations} times")
+    runs = []
+    for i in range(args.iterations):
+        run = {"import": measure_import(env), "serve": measure_first_response(env)}
+        runs.append(run)
+        print(f"  Run {i + 1}/{args.iterations}: import {run['import']['seconds']:.2f}s, "
+              f"/health {run['serve']['health_seconds']:.2f}s, /api/videos {run['serve']['videos_seconds']:.2f}s")
+
+    results = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(),
+            "git_revision": git_revision(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "iterations": args.iterations,
+            "budget_seconds": args.budget
+        },
+        "runs": runs,
+        "summary": summarize(runs)
+    }
+
+    print("\n📊 Median seconds:")
+    for name, stats in results["summary"].items():
+        print(f"  {name:<26}{stats['median']:>8.3f}  (min {stats['min']:.3f}, max {stats['max']:.3f})")
+    print("\n🐢 Slowest imports (last run):")
+    for item in runs[-1]["import"]["slowest_imports"]:
+        print(f"  {item['module']:<40}{item['seconds']:>8.3f}")
+
+    exit_code = 0
+    heavy = sorted({module for run in runs for module in run["import"]["heavy_modules"]})
+    if heavy:
+        print(f"\n⚠️  Imported at module load: {', '.join(heavy)}")
+        exit_code = 1
+    if results["summary"]["first_videos"]["median"] > args.budget:
+        print(f"\n⚠️  /api/videos answered after {results['summary']['first_videos']['median']:.2f}s "
+              f"(budget {args.budget:.2f}s)")
+        exit_code = 1
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\n💾 Results written to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        rows = compare_results(baseline, results, args.threshold)
+        print_comparison(rows)
+        if any(row["regression"] for row in rows):
+            exit_code = 1
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
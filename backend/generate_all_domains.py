@@ -10,8 +10,10 @@ from datetime import datetime
 import os
 
 # API Configuration
-API_URL = "http://localhost:8000/api/generate-story"
+API_BASE = "http://localhost:8000"
+BATCH_URL = f"{API_BASE}/api/jobs/batch"
 TIMEOUT = 360  # 6 minutes per reel (to handle rate limiting)
+POLL_INTERVAL = 5  # seconds between job status checks
 
 # All Available Domains
 DOMAINS = [
@@ -61,34 +63,59 @@ def print_progress(current, total, domain_name):
     print(f"\n📊 Progress: [{bar}] {percent:.1f}% ({current}/{total})")
     print(f"🎯 Current: {domain_name}")
 
-def generate_reel(theme_name, location, emoji):
-    """Generate a single reel"""
-    print(f"\n{emoji} Generating: {theme_name}")
+def submit_batch(themes):
+    """Queue every reel in one request, so each city's weather is fetched only once"""
+    response = requests.post(
+        BATCH_URL,
+        json={"items": [{"location": t["location"], "theme": t["name"]} for t in themes]},
+        timeout=60
+    )
+    response.raise_for_status()
+    batch = response.json()
+    print(f"📥 Queued {batch['count']} reels ({len(batch['rejected'])} rejected by the job queue)")
+    return batch["jobs"], batch["rejected"]
+
+def wait_for_reel(job, theme_name, location, emoji):
+    """Wait for a queued reel to finish"""
+    print(f"\n{emoji} Waiting for: {theme_name}")
     print(f"   Location: {location}")
-    print(f"   ⏱️  Estimated time: 3-4 minutes...")
+    print(f"   Job: {job['job_id']}")
     
     reel_data = {
         "theme": theme_name,
         "location": location,
+        "job_id": job["job_id"],
         "status": "pending",
         "start_time": datetime.now().isoformat()
     }
     
     try:
-        response = requests.post(
-            API_URL,
-            json={"location": location, "theme": theme_name},
-            timeout=TIMEOUT
-        )
+        deadline = None
+        while True:
+            response = requests.get(f"{API_BASE}{job['status_url']}", timeout=10)
+            response.raise_for_status()
+            status = response.json()
+            
+            if status["status"] in ("succeeded", "failed"):
+                break
+            
+            # The timeout only starts once a worker picks the job up
+            if status["status"] == "running" and deadline is None:
+                deadline = time.time() + TIMEOUT
+            if deadline and time.time() > deadline:
+                reel_data["status"] = "timeout"
+                reel_data["error"] = f"Still running after {TIMEOUT} seconds"
+                print(f"   ⏱️  TIMEOUT: Took more than {TIMEOUT} seconds")
+                return False, reel_data
+            time.sleep(POLL_INTERVAL)
         
         reel_data["end_time"] = datetime.now().isoformat()
-        reel_data["status_code"] = response.status_code
+        result = status.get("result") or {}
         
-        if response.status_code == 200:
-            result = response.json()
+        if status["status"] == "succeeded":
             reel_data["status"] = "success"
             reel_data["video_path"] = result.get("video_path")
-            reel_data["script_text"] = result.get("script_text", "")[:100] + "..."
+            reel_data["script_text"] = (result.get("script_text") or "")[:100] + "..."
             reel_data["image_count"] = len(result.get("image_paths", []))
             
             print(f"   ✅ SUCCESS!")
@@ -106,16 +133,9 @@ def generate_reel(theme_name, location, emoji):
             return True, reel_data
         else:
             reel_data["status"] = "failed"
-            reel_data["error"] = f"HTTP {response.status_code}"
-            print(f"   ❌ FAILED: {response.status_code}")
-            print(f"   Error: {response.text[:200]}")
+            reel_data["error"] = status.get("error")
+            print(f"   ❌ FAILED: {status.get('error')}")
             return False, reel_data
-            
-    except requests.exceptions.Timeout:
-        reel_data["status"] = "timeout"
-        reel_data["error"] = "Request timed out after 5 minutes"
-        print(f"   ⏱️  TIMEOUT: Took more than {TIMEOUT} seconds")
-        return False, reel_data
     
     except requests.exceptions.ConnectionError:
         reel_data["status"] = "connection_error"
@@ -183,7 +203,7 @@ def main():
     
     # Check if API server is running
     try:
-        health_response = requests.get("http://localhost:8000/health", timeout=5)
+        health_response = requests.get(f"{API_BASE}/health", timeout=5)
         if health_response.status_code != 200:
             print("❌ API server is not responding properly!")
             print("Please start the server: python api_server.py")
@@ -208,40 +228,51 @@ def main():
         print("❌ Cancelled by user")
         return
     
-    # Generate reels for each domain
-    for category_data in DOMAINS:
-        print(f"\n{'='*80}")
-        print(f"{category_data['category']} Category")
-        print(f"{'='*80}")
+    # Queue every reel up front; the server fetches each city's weather once
+    themes = [
+        {**theme_data, "category": category_data['category']}
+        for category_data in DOMAINS
+        for theme_data in category_data['themes']
+    ]
+    jobs, rejected = submit_batch(themes)
+    
+    for item in rejected:
+        theme_data = next(t for t in themes if t['name'] == item['theme'] and t['location'] == item['location'])
+        results['failed'] += 1
+        results['reels'].append({
+            "theme": item['theme'],
+            "location": item['location'],
+            "status": "rejected",
+            "error": item['error'],
+            "emoji": theme_data['emoji'],
+            "category": theme_data['category']
+        })
+    
+    for job in jobs:
+        theme_data = next(t for t in themes if t['name'] == job['theme'] and t['location'] == job['location'])
+        current_count += 1
         
-        for theme_data in category_data['themes']:
-            current_count += 1
-            
-            print_progress(current_count, total_themes, theme_data['name'])
-            
-            # Generate reel
-            success, reel_result = generate_reel(
-                theme_data['name'],
-                theme_data['location'],
-                theme_data['emoji']
-            )
-            
-            # Add emoji to result
-            reel_result['emoji'] = theme_data['emoji']
-            reel_result['category'] = category_data['category']
-            
-            # Update counts
-            if success:
-                results['successful'] += 1
-            else:
-                results['failed'] += 1
-            
-            results['reels'].append(reel_result)
-            
-            # Small delay before next reel (to avoid overwhelming the system)
-            if current_count < total_themes:
-                print(f"\n⏸️  Waiting 10 seconds before next reel...")
-                time.sleep(10)
+        print_progress(current_count, len(jobs), theme_data['name'])
+        
+        # Wait for the reel
+        success, reel_result = wait_for_reel(
+            job,
+            theme_data['name'],
+            theme_data['location'],
+            theme_data['emoji']
+        )
+        
+        # Add emoji to result
+        reel_result['emoji'] = theme_data['emoji']
+        reel_result['category'] = theme_data['category']
+        
+        # Update counts
+        if success:
+            results['successful'] += 1
+        else:
+            results['failed'] += 1
+        
+        results['reels'].append(reel_result)
     
     # Save and display results
     save_results()
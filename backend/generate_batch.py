@@ -9,7 +9,9 @@ import time
 from datetime import datetime
 
 # Configuration
-API_URL = "http://localhost:8000/api/generate-story"
+API_BASE = "http://localhost:8000"
+BATCH_URL = f"{API_BASE}/api/jobs/batch"
+POLL_INTERVAL = 5  # seconds between job status checks
 
 # All available domains with suggested locations
 ALL_DOMAINS = {
@@ -36,31 +38,46 @@ def display_menu():
     print("  0. ❌ Exit")
     print("\n" + "=" * 70)
 
-def generate_reel(theme_name, location, emoji):
-    """Generate a single reel with progress tracking"""
-    print(f"\n{emoji} Generating '{theme_name}' reel...")
-    print(f"   📍 Location: {location}")
+def submit_batch(selections):
+    """Queue the selected reels in one request (weather is fetched once per city)"""
+    response = requests.post(
+        BATCH_URL,
+        json={"items": [{"location": ALL_DOMAINS[k]["location"], "theme": ALL_DOMAINS[k]["name"]} for k in selections]},
+        timeout=60
+    )
+    response.raise_for_status()
+    batch = response.json()
+    for item in batch["rejected"]:
+        print(f"   ⚠️  Not queued: {item['theme']} ({item['error']})")
+    return batch["jobs"]
+
+def wait_for_reel(job, emoji):
+    """Wait for a queued reel with progress tracking"""
+    print(f"\n{emoji} Generating '{job['theme']}' reel...")
+    print(f"   📍 Location: {job['location']}")
     print(f"   ⏱️  Time: ~3-4 minutes")
     
     start_time = time.time()
     
     try:
-        response = requests.post(
-            API_URL,
-            json={"location": location, "theme": theme_name},
-            timeout=360
-        )
+        while True:
+            response = requests.get(f"{API_BASE}{job['status_url']}", timeout=10)
+            response.raise_for_status()
+            status = response.json()
+            if status["status"] in ("succeeded", "failed"):
+                break
+            time.sleep(POLL_INTERVAL)
         
         elapsed = time.time() - start_time
         
-        if response.status_code == 200:
-            result = response.json()
+        if status["status"] == "succeeded":
+            result = status["result"]
             print(f"   ✅ SUCCESS in {elapsed/60:.1f} minutes!")
             print(f"   📹 Video: {result.get('video_path', 'N/A')}")
             print(f"   🎨 Images: {len(result.get('image_paths', []))}")
             return True, result
         else:
-            print(f"   ❌ FAILED: {response.status_code}")
+            print(f"   ❌ FAILED: {status.get('error')}")
             return False, None
             
     except Exception as e:
@@ -73,7 +90,7 @@ def main():
     
     # Check API health
     try:
-        requests.get("http://localhost:8000/health", timeout=5)
+        requests.get(f"{API_BASE}/health", timeout=5)
         print("✅ API server is running")
     except:
         print("❌ Cannot connect to API server!")
@@ -112,29 +129,26 @@ def main():
             print("❌ Cancelled")
             continue
         
-        # Generate selected reels
-        for i, key in enumerate(selections, 1):
-            domain = ALL_DOMAINS[key]
-            
+        # Queue selected reels together, then wait for each
+        try:
+            jobs = submit_batch(selections)
+        except Exception as e:
+            print(f"❌ Could not queue reels: {e}")
+            continue
+        failed += len(selections) - len(jobs)
+        
+        emojis = {(d['name'], d['location']): d['emoji'] for d in ALL_DOMAINS.values()}
+        for i, job in enumerate(jobs, 1):
             print(f"\n{'='*70}")
-            print(f"Reel {i}/{len(selections)}")
+            print(f"Reel {i}/{len(jobs)}")
             print(f"{'='*70}")
             
-            success, result = generate_reel(
-                domain['name'],
-                domain['location'],
-                domain['emoji']
-            )
+            success, result = wait_for_reel(job, emojis.get((job['theme'], job['location']), "🎬"))
             
             if success:
                 successful += 1
             else:
                 failed += 1
-            
-            # Small break between reels (except last one)
-            if i < len(selections):
-                print(f"\n⏸️  Waiting 10 seconds before next reel...")
-                time.sleep(10)
         
         # Summary
         print("\n" + "=" * 70)
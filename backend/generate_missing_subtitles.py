@@ -7,17 +7,11 @@ import sys
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
+from sub_agents.subtitle_agent.vtt import format_vtt_timestamp
+
 VIDEOS_DIR = 'data/videos'
 SUBTITLES_DIR = 'data/subtitles'
 
-def format_vtt_timestamp(seconds: float) -> str:
-    """Format seconds as WebVTT timestamp (HH:MM:SS.mmm)"""
-    hours = int(seconds // 3600)
-    minutes = int((seconds % 3600) // 60)
-    secs = seconds % 60
-    return f"{hours:02d}:{minutes:02d}:{secs:06.3f}"
-
-
 def generate_generic_subtitle(video_filename: str) -> str:
     """
     Generate a generic subtitle file for a video
@@ -0,0 +1,23 @@
+"""
+Gunicorn settings for running the API with several worker processes.
+
+    pip install gunicorn
+    gunicorn -c gunicorn.conf.py api_server:app
+
+Workers default to WEB_CONCURRENCY (else 2). The count is exported back to
+WEB_CONCURRENCY so api_server switches jobs and rate limits to the shared
+SQLite stores and each worker's video assembly pool gets its share of the
+cores.
+"""
+import os
+
+workers = int(os.getenv("WEB_CONCURRENCY") or 2)
+os.environ["WEB_CONCURRENCY"] = str(workers)
+
+worker_class = "uvicorn.workers.UvicornWorker"
+bind = os.getenv("BIND", f"0.0.0.0:{os.getenv('PORT', '8000')}")
+
+# Heartbeat timeout of a worker; async requests (SSE streams) may run longer
+timeout = 120
+graceful_timeout = 30
+keepalive = 5
@@ -0,0 +1,80 @@
+"""
+Import scripts from the old one-JSON-file-per-key cache into the SQLite script cache.
+
+Earlier versions cached each Gemini script as a JSON file in
+sub_agents/script_agent/.cache/. Run this once after upgrading to keep the
+scripts that are still fresh; the files are only deleted with --remove.
+
+Usage (from backend/):
+    python migrate_script_cache.py
+    python migrate_script_cache.py --remove
+"""
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from services.sqlite_cache import get_sqlite_cache
+from sub_agents.script_agent.gemini_script_generator_tool import SCRIPT_CACHE_TTL
+
+LEGACY_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'sub_agents', 'script_agent', '.cache')
+
+
+def import_legacy_cache(cache_dir: str, remove: bool = False) -> int:
+    """
+    Copy unexpired scripts into the SQLite cache, keeping their remaining TTL.
+
+    Args:
+        cache_dir: Directory of legacy ``<cache key>.json`` files
+        remove: Delete the legacy files (and the directory) afterwards
+
+    Returns:
+        Number of scripts imported
+    """
+    script_cache = get_sqlite_cache("script", ttl=SCRIPT_CACHE_TTL)
+    imported = 0
+    for filename in sorted(os.listdir(cache_dir)):
+        cache_file = os.path.join(cache_dir, filename)
+        try:
+            if filename.endswith('.json'):
+                with open(cache_file, 'r') as f:
+                    cached_data = json.load(f)
+                age = (datetime.now() - datetime.fromisoformat(cached_data.get('timestamp', ''))).total_seconds()
+                if age < script_cache.ttl:
+                    script_cache.put(filename[:-len('.json')], cached_data, ttl=script_cache.ttl - age)
+                    imported += 1
+            if remove:
+                os.remove(cache_file)
+        except Exception as e:
+            print(f"⚠️  Skipping {filename}: {e}")
+
+    if remove:
+        try:
+            os.rmdir(cache_dir)
+        except OSError:
+            pass
+    return imported
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import the legacy JSON script cache into SQLite")
+    parser.add_argument('--cache-dir', default=LEGACY_CACHE_DIR)
+    parser.add_argument('--remove', action='store_true', help="Delete the legacy files after importing")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.cache_dir):
+        print(f"✅ No legacy script cache at {args.cache_dir}")
+        return
+
+    imported = import_legacy_cache(args.cache_dir, remove=args.remove)
+    print(f"🎉 Imported {imported} cached scripts into the SQLite cache")
+    if args.remove:
+        print(f"🧹 Removed {args.cache_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,10 @@
-from .orchestrator_tool import OrchestratorTool
-
 __all__ = ['OrchestratorTool']
+
+
+def __getattr__(name):
+    # Imported on first access: the orchestrator pulls in google.adk, and
+    # importing the package (e.g. for tool_registry) should not
+    if name == 'OrchestratorTool':
+        from .orchestrator_tool import OrchestratorTool
+        return OrchestratorTool
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
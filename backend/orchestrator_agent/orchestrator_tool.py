@@ -1,21 +1,56 @@
 from google.adk.tools.base_tool import BaseTool
 import json
+import os
+import time
 from datetime import datetime
+from .stage_graph import StageGraph, StageError
+from .tool_registry import tool_registry
+from services.progress import current_reporter, emit_progress
+from services.metrics import stage_seconds
+from services.tracing import Trace, tracing
+from services.workspace import job_workspace
+from services.video_catalog import get_catalog
+from sub_agents.location_data_agent.weather_api_tool import normalize_location
+from sub_agents.script_agent.gemini_script_generator_tool import weather_bucket
+
+
+# Progress event emitted for each stage status reported by the stage graph
+STAGE_EVENTS = {
+    "running": "stage_started",
+    "succeeded": "stage_completed",
+    "failed": "stage_failed"
+}
+
+
+class PipelineError(Exception):
+    """A stage failed in an expected way; the message is reported as-is."""
+
 
 class OrchestratorTool(BaseTool):
-    def __init__(self):
+    def __init__(self, tools=None):
         super().__init__(
             name="coordinate_storytelling",
             description="Coordinates the complete AI-powered sustainability storytelling pipeline through all sub-agents."
         )
+        
+        # Long-lived sub-agent tools, built lazily and shared across requests
+        self.tools = tools or tool_registry
 
-    def run(self, location: str, theme: str = None) -> dict:
+    def run(self, location: str, theme: str = None, on_stage=None, location_data: dict = None) -> dict:
         """
         Orchestrates the complete sustainability storytelling pipeline.
         
+        Stages run as a dependency graph: once the script exists, image
+        generation, voiceover and subtitles run concurrently, and video
+        assembly waits for images and voiceover.
+        
         Args:
             location: User's city or region (required)
             theme: Optional theme selection (Heat & Summer, Water & Rain, Air & Health, Sustainability & Future, or Auto-Detect)
+            on_stage: Optional callback ``on_stage(stage, status)`` invoked as each
+                stage starts ("running") and ends ("succeeded" / "failed")
+            location_data: Optional environmental data prefetched for this location
+                (e.g. by the weather tool's fetch_many() for a batch); skips the lookup
             
         Returns:
             Complete storytelling package with video, script, and metadata
@@ -30,119 +65,223 @@ class OrchestratorTool(BaseTool):
                 "script_generation": None,
                 "image_generation": None,
                 "voice_generation": None,
+                "subtitle_generation": None,
                 "video_assembly": None
             },
             "final_video_path": None,
             "script_text": None,
             "audio_path": None,
             "image_paths": None,
+            "subtitle_path": None,
             "success": False
         }
         
+        graph = self._build_stage_graph(location, theme, location_data)
+        
+        stage_started = {}
+        
+        def report_stage(stage: str, status: str):
+            if status == "running":
+                stage_started[stage] = time.perf_counter()
+            elif stage in stage_started:
+                stage_seconds.observe(time.perf_counter() - stage_started.pop(stage), stage=stage, outcome=status)
+            emit_progress(STAGE_EVENTS[status], stage=stage)
+            if on_stage:
+                on_stage(stage, status)
+        
+        # Scratch files of this run live in its own workspace, removed when the run ends;
+        # its span tree is saved with the artifacts
+        reporter = current_reporter()
+        trace = Trace(reporter.job_id if reporter else None)
+        try:
+            with tracing(trace), job_workspace(trace.trace_id):
+                results = graph.run(on_stage=report_stage)
+        except StageError as e:
+            results = e.results
+            pipeline_result["error"] = str(e.error)
+            print(f"❌ Error in pipeline ({e.stage}): {pipeline_result['error']}")
+        except Exception as e:
+            results = {}
+            pipeline_result["error"] = str(e)
+            print(f"❌ Error in pipeline: {e}")
+        
+        pipeline_result["stages"].update(results)
+        pipeline_result["script_text"] = (results.get("script_generation") or {}).get("script")
+        pipeline_result["image_paths"] = (results.get("image_generation") or {}).get("image_paths")
+        pipeline_result["audio_path"] = (results.get("voice_generation") or {}).get("audio_path")
+        
+        video_result = results.get("video_assembly")
+        if video_result:
+            pipeline_result["final_video_path"] = video_result.get("video_path")
+            pipeline_result["subtitle_path"] = video_result.get("subtitle_path")
+            pipeline_result["success"] = True
+            self._record_in_catalog(pipeline_result)
+            print("✅ Sustainability story generation complete!")
+        
+        pipeline_result["trace_path"] = self._save_trace(trace, pipeline_result["final_video_path"])
+        return pipeline_result
+    
+    def coalescing_key(self, location: str, theme: str = None, location_data: dict = None) -> tuple:
+        """
+        Key under which identical story requests can share one pipeline run.
+        
+        Requests for the same location, resolved theme and weather bucket
+        (the inputs of the script cache key) would produce the same reel.
+        
+        Args:
+            location: User's city or region
+            theme: Optional theme selection
+            location_data: Environmental data for the location (fetched if missing)
+            
+        Returns:
+            Hashable key, or None when the location data is unavailable
+        """
+        if not (location_data and location_data.get("success")):
+            location_data = self.tools.get("weather").run(location=location)
+            if not location_data.get("success"):
+                return None
+        
+        resolved_theme = self.tools.get("sustainability").run(location_data=location_data, user_theme=theme)["theme"]
+        bucket = weather_bucket(
+            location_data.get('temperature', {}).get('current', 0),
+            location_data.get('weather', {}).get('description', 'normal'),
+            location_data.get('air_quality_index')
+        )
+        return (normalize_location(location), resolved_theme) + bucket
+    
+    def _save_trace(self, trace: Trace, video_path: str = None) -> str:
+        """Save the run's trace as data/traces/<video name>.json (or <trace id>.json without a video)."""
+        filename = os.path.splitext(os.path.basename(video_path))[0] + ".json" if video_path else None
+        try:
+            return trace.save(filename)
+        except Exception as e:
+            print(f"  ⚠️ Could not save trace: {e}")
+            return None
+    
+    def _record_in_catalog(self, pipeline_result: dict):
+        """Add the finished reel to the video catalog served by /api/videos."""
+        video_path = pipeline_result["final_video_path"]
+        audio_path = pipeline_result.get("audio_path")
+        subtitle_path = pipeline_result.get("subtitle_path")
+        stages = pipeline_result["stages"]
+        
         try:
+            get_catalog().add({
+                "filename": os.path.basename(video_path),
+                "theme": (stages.get("sustainability_analysis") or {}).get("theme"),
+                "location": pipeline_result["location"],
+                "script": pipeline_result.get("script_text"),
+                "duration": (stages.get("video_assembly") or {}).get("duration"),
+                "size": os.path.getsize(video_path),
+                "audio_filename": os.path.basename(audio_path) if audio_path else None,
+                "subtitle_filename": os.path.basename(subtitle_path) if subtitle_path else None,
+                "image_count": len(pipeline_result.get("image_paths") or [])
+            })
+        except Exception as e:
+            print(f"  ⚠️ Could not record video in catalog: {e}")
+    
+    def _build_stage_graph(self, location: str, theme: str = None, prefetched_location_data: dict = None) -> StageGraph:
+        """Wire the pipeline stages and their dependencies."""
+        
+        def location_stage(results):
             # Stage 1: Location & Environmental Data Collection
+            if prefetched_location_data and prefetched_location_data.get("success"):
+                print(f"🌍 Stage 1: Using prefetched environmental data for {location}")
+                return prefetched_location_data
             print(f"🌍 Stage 1: Fetching environmental data for {location}...")
             location_data = self._fetch_location_data(location)
-            pipeline_result["stages"]["location_data"] = location_data
-            
             if not location_data.get("success"):
-                pipeline_result["error"] = "Failed to fetch location data"
-                return pipeline_result
-            
+                raise PipelineError("Failed to fetch location data")
+            return location_data
+        
+        def analysis_stage(results):
             # Stage 2: Sustainability Issue Identification
             print("🌱 Stage 2: Analyzing sustainability patterns...")
-            sustainability_analysis = self._analyze_sustainability(location_data, theme)
-            pipeline_result["stages"]["sustainability_analysis"] = sustainability_analysis
-            
+            return self._analyze_sustainability(results["location_data"], theme)
+        
+        def script_stage(results):
             # Stage 3: AI Script Generation (Empathetic Storytelling)
             print("✍️ Stage 3: Generating empathetic sustainability story...")
-            script_result = self._generate_script(location, location_data, sustainability_analysis)
-            pipeline_result["stages"]["script_generation"] = script_result
-            pipeline_result["script_text"] = script_result.get("script")
-            
+            script_result = self._generate_script(location, results["location_data"], results["sustainability_analysis"])
+            emit_progress("script_ready", script=script_result.get("script"),
+                          theme=results["sustainability_analysis"].get("theme"))
+            return script_result
+        
+        def image_stage(results):
             # Stage 3.5: AI Image Generation
             print("🎨 Stage 3.5: Generating AI images for video...")
             try:
                 image_result = self._generate_images(
-                    script_result.get("script"),
-                    sustainability_analysis.get("theme"),
+                    results["script_generation"].get("script"),
+                    results["sustainability_analysis"].get("theme"),
                     num_images=5  # 5 images for 15 second reel (3s each)
                 )
-                pipeline_result["stages"]["image_generation"] = image_result
-                pipeline_result["image_paths"] = image_result.get("image_paths", [])
                 
                 # Validate images were generated
-                if not pipeline_result["image_paths"] or len(pipeline_result["image_paths"]) == 0:
+                if not image_result.get("image_paths"):
                     raise Exception("No images were generated")
-                    
-                print(f"  ✓ Generated {len(pipeline_result['image_paths'])} premium AI images")
-                
             except Exception as e:
                 print(f"  ❌ Image generation failed: {e}")
-                pipeline_result["error"] = f"Image generation failed: {e}"
-                pipeline_result["success"] = False
-                return pipeline_result
+                raise PipelineError(f"Image generation failed: {e}")
             
+            print(f"  ✓ Generated {len(image_result['image_paths'])} premium AI images")
+            return image_result
+        
+        def voice_stage(results):
             # Stage 4: AI Voice Generation
             print("🎙️ Stage 4: Converting script to AI voiceover...")
-            voice_result = self._generate_voice(script_result.get("script"))
-            pipeline_result["stages"]["voice_generation"] = voice_result
-            pipeline_result["audio_path"] = voice_result.get("audio_path")
-            
+            voice_result = self._generate_voice(results["script_generation"].get("script"))
+            if not voice_result.get("audio_path"):
+                print("  ⚠️ No audio generated, skipping video assembly")
+                raise PipelineError("Audio generation failed")
+            emit_progress("audio_ready", filename=os.path.basename(voice_result["audio_path"]))
+            return voice_result
+        
+        def subtitle_stage(results):
+            # Stage 4.5: Subtitle Generation
+            print("💬 Stage 4.5: Building subtitles from script...")
+            return self._generate_subtitles(results["script_generation"].get("script"))
+        
+        def assembly_stage(results):
             # Stage 5: Video Assembly
             print("🎬 Stage 5: Assembling final sustainability story video...")
-            
-            # Check prerequisites
-            audio_path = voice_result.get("audio_path")
-            image_paths = pipeline_result.get("image_paths", [])
-            
-            if not audio_path:
-                print("  ⚠️ No audio generated, skipping video assembly")
-                pipeline_result["error"] = "Audio generation failed"
-                pipeline_result["success"] = False
-                return pipeline_result
-                
-            if not image_paths or len(image_paths) == 0:
-                print("  ⚠️ No images available, skipping video assembly")
-                pipeline_result["error"] = "No images for video"
-                pipeline_result["success"] = False
-                return pipeline_result
-            
             video_result = self._assemble_video(
-                script_result.get("script"),
-                audio_path,
-                sustainability_analysis.get("theme"),
-                image_paths
+                results["script_generation"].get("script"),
+                results["voice_generation"].get("audio_path"),
+                results["sustainability_analysis"].get("theme"),
+                results["image_generation"].get("image_paths")
             )
+            if not video_result.get("video_path"):
+                raise PipelineError(f"Video assembly failed: {video_result.get('error', 'unknown error')}")
             
-            pipeline_result["stages"]["video_assembly"] = video_result
-            pipeline_result["final_video_path"] = video_result.get("video_path")
-            
-            pipeline_result["success"] = True
-            print("✅ Sustainability story generation complete!")
-            
-        except Exception as e:
-            pipeline_result["error"] = str(e)
-            print(f"❌ Error in pipeline: {e}")
+            video_result["subtitle_path"] = self._save_subtitles(
+                results["subtitle_generation"], video_result["video_path"]
+            )
+            emit_progress("video_ready", filename=os.path.basename(video_result["video_path"]))
+            return video_result
         
-        return pipeline_result
+        graph = StageGraph(max_workers=3)
+        graph.add("location_data", location_stage)
+        graph.add("sustainability_analysis", analysis_stage, depends_on=("location_data",))
+        graph.add("script_generation", script_stage, depends_on=("sustainability_analysis",))
+        graph.add("image_generation", image_stage, depends_on=("script_generation",))
+        graph.add("voice_generation", voice_stage, depends_on=("script_generation",))
+        graph.add("subtitle_generation", subtitle_stage, depends_on=("script_generation",))
+        graph.add("video_assembly", assembly_stage,
+                  depends_on=("image_generation", "voice_generation", "subtitle_generation"))
+        return graph
     
     def _fetch_location_data(self, location: str) -> dict:
         """Stage 1: Fetch environmental data for the location."""
-        import os
-        
         # Check if we should use mock data (for testing without API key)
         use_mock = os.getenv('USE_MOCK_WEATHER', 'false').lower() == 'true'
         
         if use_mock:
-            from sub_agents.location_data_agent.mock_weather_tool import MockWeatherAPITool
             print(f"  🧪 [MOCK MODE] Generating fake weather data for {location}...")
             print(f"  ⚠️  WARNING: Using mock data - set USE_MOCK_WEATHER=false in .env for real data")
-            weather_tool = MockWeatherAPITool()
         else:
-            from sub_agents.location_data_agent.weather_api_tool import WeatherAPITool
             print(f"  🌤️  [REAL API] Fetching LIVE weather data for {location}...")
-            weather_tool = WeatherAPITool()
+        weather_tool = self.tools.get("weather")
         
         location_data = weather_tool.run(location=location)
         
@@ -157,20 +296,16 @@ class OrchestratorTool(BaseTool):
     
     def _analyze_sustainability(self, location_data: dict, user_theme: str = None) -> dict:
         """Stage 2: Identify sustainability issues based on environmental data."""
-        from sub_agents.sustainability_agent.issue_analyzer_tool import IssueAnalyzerTool
-        
         print("  → Analyzing sustainability patterns...")
-        analyzer = IssueAnalyzerTool()
+        analyzer = self.tools.get("sustainability")
         analysis = analyzer.run(location_data=location_data, user_theme=user_theme)
         
         return analysis
     
     def _generate_script(self, location: str, location_data: dict, sustainability_analysis: dict) -> dict:
         """Stage 3: Generate empathetic AI script using Gemini."""
-        from sub_agents.script_agent.gemini_script_generator_tool import GeminiScriptGeneratorTool
-        
         print("  → Crafting empathetic sustainability story...")
-        generator = GeminiScriptGeneratorTool()
+        generator = self.tools.get("script")
         script_result = generator.run(
             location=location,
             location_data=location_data,
@@ -181,20 +316,16 @@ class OrchestratorTool(BaseTool):
     
     def _generate_voice(self, script: str) -> dict:
         """Stage 4: Convert script to AI voiceover using Google Text-to-Speech."""
-        from sub_agents.voice_agent.tts_tool import TextToSpeechTool
-        
         print("  → Generating natural AI voiceover...")
-        tts_tool = TextToSpeechTool()
+        tts_tool = self.tools.get("voice")
         voice_result = tts_tool.run(script=script)
         
         return voice_result
     
     def _generate_images(self, script: str, theme: str, num_images: int = 5) -> dict:
         """Stage 3.5: Generate AI images for the video."""
-        from sub_agents.image_agent.imagen_generator_tool import ImagenGeneratorTool
-        
         print("  → Generating AI images...")
-        generator = ImagenGeneratorTool()
+        generator = self.tools.get("images")
         image_result = generator.run(
             script=script,
             theme=theme,
@@ -205,10 +336,8 @@ class OrchestratorTool(BaseTool):
     
     def _assemble_video(self, script: str, audio_path: str, theme: str, image_paths: list = None) -> dict:
         """Stage 5: Assemble final video with AI images and voiceover."""
-        from sub_agents.video_agent.video_assembler_tool import VideoAssemblerTool
-        
         print("  → Assembling final sustainability story video...")
-        assembler = VideoAssemblerTool()
+        assembler = self.tools.get("video")
         video_result = assembler.run(
             script=script,
             audio_path=audio_path,
@@ -217,4 +346,18 @@ class OrchestratorTool(BaseTool):
         )
         
         return video_result
-
+    
+    def _generate_subtitles(self, script: str) -> dict:
+        """Stage 4.5: Build WebVTT captions from the script."""
+        subtitle_tool = self.tools.get("subtitles")
+        return subtitle_tool.run(script=script)
+    
+    def _save_subtitles(self, subtitle_result: dict, video_path: str) -> str:
+        """Write the captions built in Stage 4.5 next to the assembled video."""
+        try:
+            subtitle_path = self.tools.get("subtitles").save(subtitle_result["vtt_content"], video_path)
+            print(f"  ✓ Subtitles saved: {subtitle_path}")
+            return subtitle_path
+        except Exception as e:
+            print(f"  ⚠️ Could not save subtitles: {e}")
+            return None
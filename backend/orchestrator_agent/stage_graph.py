@@ -0,0 +1,111 @@
+"""
+Minimal dependency-graph executor for pipeline stages.
+
+Stages declare the stages they depend on; every stage whose dependencies
+have succeeded is started on a thread pool, so independent branches run
+concurrently and total wall-clock time is the longest branch.
+"""
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from services.tracing import span
+
+
+class StageError(Exception):
+    """
+    Raised when a stage fails.
+
+    ``stage`` names the failed stage, ``error`` holds the cause and
+    ``results`` the outputs of the stages that did complete.
+    """
+
+    def __init__(self, stage: str, error: Exception):
+        super().__init__(str(error))
+        self.stage = stage
+        self.error = error
+        self.results = {}
+
+
+class StageGraph:
+    def __init__(self, max_workers: int = 4):
+        self.max_workers = max_workers
+        self._stages = {}
+
+    def add(self, name: str, fn, depends_on: tuple = ()):
+        """
+        Register a stage.
+
+        Args:
+            name: Unique stage name
+            fn: Callable receiving the dict of finished stage results
+            depends_on: Names of stages that must succeed first
+        """
+        for dep in depends_on:
+            if dep not in self._stages:
+                raise ValueError(f"Stage '{name}' depends on unknown stage '{dep}'")
+        self._stages[name] = (fn, tuple(depends_on))
+        return self
+
+    def run(self, on_stage=None) -> dict:
+        """
+        Execute all stages respecting dependencies.
+
+        Once a stage fails no new stages are started; stages already running
+        are allowed to finish and the failure is raised as StageError.
+
+        Args:
+            on_stage: Optional callback ``on_stage(stage, status)``
+
+        Returns:
+            Dictionary mapping stage name to its result
+        """
+        results = {}
+        pending = dict(self._stages)
+        running = {}
+        failure = None
+
+        def notify(stage: str, status: str):
+            if on_stage:
+                try:
+                    on_stage(stage, status)
+                except Exception as e:
+                    print(f"  ⚠️ Stage callback error: {e}")
+
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="stage") as executor:
+            while pending or running:
+                if failure is None:
+                    ready = [name for name, (_, deps) in pending.items() if all(dep in results for dep in deps)]
+                    for name in ready:
+                        fn, _ = pending.pop(name)
+                        notify(name, "running")
+                        # Run in a copy of the caller's context so context variables
+                        # (e.g. the job's progress reporter) reach the stage thread
+                        context = contextvars.copy_context()
+                        running[executor.submit(context.run, _run_stage, name, fn, dict(results))] = name
+
+                if not running:
+                    if pending and failure is None:
+                        raise ValueError(f"Unresolvable stage dependencies: {sorted(pending)}")
+                    break
+
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        results[name] = future.result()
+                        notify(name, "succeeded")
+                    except Exception as e:
+                        notify(name, "failed")
+                        if failure is None:
+                            failure = StageError(name, e)
+
+        if failure is not None:
+            failure.results = results
+            raise failure
+        return results
+
+
+def _run_stage(name: str, fn, results: dict):
+    # Each stage is a span in the current trace (if any)
+    with span(name, category="stage"):
+        return fn(results)
@@ -0,0 +1,192 @@
+"""
+Registry of long-lived sub-agent tool instances.
+
+Tool construction is expensive (vertexai.init, model loading, gRPC client
+creation), so each tool is built once on first use and shared by every
+request. Construction is guarded per tool, so concurrent first requests
+never build the same tool twice.
+
+Factories import their tool modules lazily, so importing the registry (and
+the API server) stays cheap; ``preload()`` imports those modules ahead of
+time without building anything.
+"""
+import importlib
+import os
+import threading
+import time
+
+
+class ToolRegistry:
+    def __init__(self):
+        self._factories = {}
+        self._modules = {}
+        self._instances = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+
+    def register(self, name: str, factory, modules: tuple = ()):
+        """
+        Register a zero-argument factory that builds the tool called ``name``.
+
+        Args:
+            name: Tool name
+            factory: Builds the tool
+            modules: Modules the factory imports, loaded early by ``preload()``
+        """
+        with self._lock:
+            self._factories[name] = factory
+            self._modules[name] = tuple(modules)
+            self._locks.setdefault(name, threading.Lock())
+            self._instances.pop(name, None)
+
+    def override(self, name: str, instance):
+        """Use a ready-made instance for ``name`` (benchmarks, fakes, tests)."""
+        with self._lock:
+            self._locks.setdefault(name, threading.Lock())
+            self._instances[name] = instance
+
+    def get(self, name: str):
+        """Return the shared instance for ``name``, building it on first use."""
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+
+        with self._lock:
+            if name not in self._factories and name not in self._instances:
+                raise KeyError(f"Unknown tool: {name}")
+            tool_lock = self._locks[name]
+
+        with tool_lock:
+            instance = self._instances.get(name)
+            if instance is None:
+                instance = self._factories[name]()
+                self._instances[name] = instance
+            return instance
+
+    def reset(self, name: str = None):
+        """Drop cached instances so they are rebuilt on next use."""
+        with self._lock:
+            if name is None:
+                self._instances.clear()
+            else:
+                self._instances.pop(name, None)
+
+    def shutdown(self):
+        """Release resources held by built tools (e.g. worker processes)."""
+        with self._lock:
+            instances = list(self._instances.values())
+        for instance in instances:
+            if hasattr(instance, "shutdown"):
+                instance.shutdown()
+
+    def names(self) -> list:
+        with self._lock:
+            return sorted(set(self._factories) | set(self._instances))
+
+    def preload(self, names: list = None) -> dict:
+        """
+        Import the tools' modules (heavy SDKs) without building the tools.
+
+        Unlike ``warm_up()`` this needs no credentials or network access.
+
+        Args:
+            names: Tools whose modules to import (defaults to all registered tools)
+
+        Returns:
+            Dictionary mapping module name to import time in seconds, or an error string
+        """
+        with self._lock:
+            modules = [module for name in names or list(self._modules) for module in self._modules.get(name, ())]
+        timings = {}
+        for module in dict.fromkeys(modules):
+            start = time.perf_counter()
+            try:
+                importlib.import_module(module)
+                timings[module] = round(time.perf_counter() - start, 3)
+            except Exception as e:
+                print(f"  ⚠️ Preload failed for {module}: {e}")
+                timings[module] = f"error: {e}"
+        return timings
+
+    def warm_up(self, names: list = None) -> dict:
+        """
+        Build tools ahead of the first request.
+
+        Args:
+            names: Tools to build (defaults to all registered tools)
+
+        Returns:
+            Dictionary mapping tool name to build time in seconds, or an error string
+        """
+        timings = {}
+        for name in names or self.names():
+            start = time.perf_counter()
+            try:
+                self.get(name)
+                timings[name] = round(time.perf_counter() - start, 3)
+            except Exception as e:
+                print(f"  ⚠️ Warm-up failed for {name}: {e}")
+                timings[name] = f"error: {e}"
+        print(f"🔥 Tool warm-up complete: {timings}")
+        return timings
+
+
+def _weather_tool():
+    # Check if we should use mock data (for testing without API key)
+    if os.getenv('USE_MOCK_WEATHER', 'false').lower() == 'true':
+        from sub_agents.location_data_agent.mock_weather_tool import MockWeatherAPITool
+        return MockWeatherAPITool()
+    from sub_agents.location_data_agent.weather_api_tool import WeatherAPITool
+    return WeatherAPITool()
+
+
+def _sustainability_tool():
+    from sub_agents.sustainability_agent.issue_analyzer_tool import IssueAnalyzerTool
+    return IssueAnalyzerTool()
+
+
+def _script_tool():
+    from sub_agents.script_agent.gemini_script_generator_tool import GeminiScriptGeneratorTool
+    return GeminiScriptGeneratorTool()
+
+
+def _image_tool():
+    from sub_agents.image_agent.imagen_generator_tool import ImagenGeneratorTool
+    return ImagenGeneratorTool()
+
+
+def _voice_tool():
+    from sub_agents.voice_agent.tts_tool import TextToSpeechTool
+    return TextToSpeechTool()
+
+
+def _subtitle_tool():
+    from sub_agents.subtitle_agent.subtitle_tool import SubtitleGeneratorTool
+    return SubtitleGeneratorTool()
+
+
+def _video_tool():
+    # Assemble in worker processes unless VIDEO_ASSEMBLY_WORKERS=0
+    from sub_agents.video_agent.assembly_pool import AssemblyPool, worker_count
+    if worker_count() > 0:
+        return AssemblyPool()
+    from sub_agents.video_agent.video_assembler_tool import VideoAssemblerTool
+    return VideoAssemblerTool()
+
+
+def create_default_registry() -> ToolRegistry:
+    """Registry wired with the standard sub-agent tools."""
+    registry = ToolRegistry()
+    registry.register("weather", _weather_tool, ["sub_agents.location_data_agent.weather_api_tool"])
+    registry.register("sustainability", _sustainability_tool, ["sub_agents.sustainability_agent.issue_analyzer_tool"])
+    registry.register("script", _script_tool, ["sub_agents.script_agent.gemini_script_generator_tool"])
+    registry.register("images", _image_tool, ["sub_agents.image_agent.imagen_generator_tool"])
+    registry.register("voice", _voice_tool, ["sub_agents.voice_agent.tts_tool"])
+    registry.register("subtitles", _subtitle_tool, ["sub_agents.subtitle_agent.subtitle_tool"])
+    # The assembler itself (moviepy, PIL) is imported by the worker processes
+    registry.register("video", _video_tool, ["sub_agents.video_agent.assembly_pool"])
+    return registry
+
+
+# Process-wide registry shared by all orchestrator instances
+tool_registry = create_default_registry()
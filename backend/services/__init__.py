@@ -0,0 +1,3 @@
+# Shared backend services (job queue, caches, rate limiting, ...)
+# Each service lives in its own module and is imported explicitly, e.g.
+#   from services.job_queue import JobManager
@@ -0,0 +1,282 @@
+"""
+Content-addressed on-disk cache for generated artifacts.
+
+Entries are files named ``<key>_<variant><suffix>`` (sharded by the first two
+key characters) where the key is a SHA-256 of the generation parameters.
+Reads refresh the file's mtime, so eviction by oldest mtime is LRU. Every
+cache registers itself so hit/miss stats can be reported together.
+
+Writes are atomic renames, so several processes (API workers, assembly
+workers) can share one cache directory; each re-reads the directory's
+totals now and then so size limits hold for their combined writes.
+"""
+import hashlib
+import json
+import os
+import random
+import shutil
+import threading
+import time
+import uuid
+
+
+class ArtifactCache:
+    """
+    Args:
+        name: Cache name used in stats and env configuration
+        directory: Root directory for cached files
+        suffix: File extension including the dot, e.g. ".png"
+        max_bytes: Evict least-recently-used entries beyond this total size
+        max_entries: Evict least-recently-used entries beyond this count
+    """
+
+    # Seconds between rescans of the directory totals (picks up other processes' writes)
+    RESYNC_INTERVAL = 60
+
+    def __init__(self, name: str, directory: str, suffix: str = "", max_bytes: int = None, max_entries: int = None):
+        self.name = name
+        self.directory = directory
+        self.suffix = suffix
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        os.makedirs(self.directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+        self._entries, self._bytes = self._scan_totals()
+        self._synced_at = time.monotonic()
+
+    @staticmethod
+    def make_key(**params) -> str:
+        """Hash generation parameters into a stable cache key."""
+        payload = json.dumps(params, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def path_for(self, key: str, variant: int = 0) -> str:
+        return os.path.join(self.directory, key[:2], f"{key}_{variant}{self.suffix}")
+
+    def variants(self, key: str) -> list:
+        """Existing cached files for a key, ordered by variant number."""
+        return [path for _, path in self._numbered_variants(key)]
+
+    def _numbered_variants(self, key: str) -> list:
+        """(variant, path) for a key's cached files, sorted numerically (so _10 follows _9)."""
+        shard = os.path.join(self.directory, key[:2])
+        prefix = f"{key}_"
+        try:
+            names = os.listdir(shard)
+        except FileNotFoundError:
+            return []
+        numbered = []
+        for name in names:
+            if not (name.startswith(prefix) and name.endswith(self.suffix)):
+                continue
+            number = name[len(prefix):len(name) - len(self.suffix)]
+            if number.isdigit():
+                numbered.append((int(number), os.path.join(shard, name)))
+        return sorted(numbered)
+
+    def get(self, key: str, variant: int = 0) -> str:
+        """Return the cached file for a key/variant, or None on a miss."""
+        path = self.path_for(key, variant)
+        if os.path.exists(path):
+            self._record_hit(path)
+            return path
+        self._count("misses")
+        return None
+
+    def choose(self, key: str, pool_size: int = 1) -> str:
+        """
+        Pick a random cached variant once the pool for ``key`` is full.
+
+        Returns None (a miss) while fewer than ``pool_size`` variants exist,
+        so callers keep generating new variants until the pool is filled.
+        """
+        paths = self.variants(key)
+        if len(paths) >= max(1, pool_size):
+            path = random.choice(paths)
+            self._record_hit(path)
+            return path
+        self._count("misses")
+        return None
+
+    def put(self, key: str, source_path: str = None, data: bytes = None, variant: int = None, move: bool = False) -> str:
+        """
+        Store a file (or raw bytes) in the cache atomically.
+
+        Args:
+            key: Cache key from make_key()
+            source_path: File to copy (or move) into the cache
+            data: Raw bytes to store instead of a file
+            variant: Variant slot (replaced if present); defaults to a new slot after
+                the highest existing variant
+            move: Move source_path instead of copying it
+
+        Returns:
+            Path of the cached file
+        """
+        new_variant = variant is None
+        path = self.path_for(key, 0 if new_variant else variant)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+
+        tmp_path = f"{path}.{uuid.uuid4().hex}.tmp"
+        existed, old_size = False, 0
+        try:
+            if data is not None:
+                with open(tmp_path, 'wb') as f:
+                    f.write(data)
+            elif move:
+                shutil.move(source_path, tmp_path)
+            else:
+                shutil.copyfile(source_path, tmp_path)
+
+            if new_variant:
+                path = self._claim_variant(key, tmp_path)
+            else:
+                existed = os.path.exists(path)
+                old_size = os.path.getsize(path) if existed else 0
+                os.replace(tmp_path, path)
+        finally:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
+        with self._lock:
+            self._counters["stores"] += 1
+            self._bytes += os.path.getsize(path) - old_size
+            if not existed:
+                self._entries += 1
+        self._resync_if_due()
+        self.evict()
+        return path
+
+    def _claim_variant(self, key: str, tmp_path: str) -> str:
+        """
+        Publish ``tmp_path`` as the next free variant of ``key``.
+
+        os.link fails if the name exists, so concurrent writers (threads or
+        processes) can never end up with the same variant.
+        """
+        while True:
+            with self._lock:
+                numbered = self._numbered_variants(key)
+                # Never reuses a gap left by eviction
+                path = self.path_for(key, numbered[-1][0] + 1 if numbered else 0)
+            try:
+                os.link(tmp_path, path)
+                return path
+            except FileExistsError:
+                continue
+
+    def evict(self) -> int:
+        """Remove least-recently-used entries until the cache is within its limits."""
+        with self._lock:
+            over_bytes = self.max_bytes is not None and self._bytes > self.max_bytes
+            over_entries = self.max_entries is not None and self._entries > self.max_entries
+            if not (over_bytes or over_entries):
+                return 0
+
+            files = sorted(self._list_files(), key=lambda item: item[1])
+            removed = 0
+            for path, _, size in files:
+                if (self.max_bytes is None or self._bytes <= self.max_bytes) and \
+                   (self.max_entries is None or self._entries <= self.max_entries):
+                    break
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+                self._bytes -= size
+                self._entries -= 1
+                removed += 1
+
+            self._counters["evictions"] += removed
+        if removed:
+            print(f"  🧹 Evicted {removed} entries from '{self.name}' cache")
+        return removed
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["misses"]
+            return {
+                "name": self.name,
+                **self._counters,
+                "hit_rate": round(self._counters["hits"] / lookups, 4) if lookups else None,
+                "entries": self._entries,
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "max_entries": self.max_entries
+            }
+
+    def _record_hit(self, path: str):
+        try:
+            os.utime(path)  # Refresh mtime so LRU eviction keeps hot entries
+        except OSError:
+            pass
+        self._count("hits")
+
+    def _count(self, counter: str):
+        with self._lock:
+            self._counters[counter] += 1
+
+    def _list_files(self) -> list:
+        """(path, mtime, size) for every cached file."""
+        files = []
+        for root, _, names in os.walk(self.directory):
+            for name in names:
+                if not name.endswith(self.suffix) or name.endswith('.tmp'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                files.append((path, stat.st_mtime, stat.st_size))
+        return files
+
+    def _resync_if_due(self):
+        now = time.monotonic()
+        with self._lock:
+            if now - self._synced_at < self.RESYNC_INTERVAL:
+                return
+            self._synced_at = now
+        entries, size = self._scan_totals()
+        with self._lock:
+            self._entries, self._bytes = entries, size
+
+    def _scan_totals(self) -> tuple:
+        files = self._list_files()
+        return len(files), sum(size for _, _, size in files)
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache(name: str, directory: str, suffix: str = "", max_bytes: int = None, max_entries: int = None) -> ArtifactCache:
+    """
+    Return the process-wide cache called ``name``, creating it on first use.
+
+    Limits can be overridden with ``<NAME>_CACHE_MAX_MB`` and
+    ``<NAME>_CACHE_MAX_ENTRIES`` environment variables.
+    """
+    env_prefix = name.upper()
+    max_mb = os.getenv(f'{env_prefix}_CACHE_MAX_MB')
+    if max_mb:
+        max_bytes = int(float(max_mb) * 1024 * 1024)
+    max_count = os.getenv(f'{env_prefix}_CACHE_MAX_ENTRIES')
+    if max_count:
+        max_entries = int(max_count)
+
+    with _caches_lock:
+        cache = _caches.get(name)
+        if cache is None:
+            cache = ArtifactCache(name, directory, suffix, max_bytes=max_bytes, max_entries=max_entries)
+            _caches[name] = cache
+        return cache
+
+
+def all_cache_stats() -> dict:
+    """Stats for every artifact cache created in this process."""
+    with _caches_lock:
+        caches = list(_caches.values())
+    return {cache.name: cache.stats() for cache in caches}
@@ -0,0 +1,38 @@
+"""
+Memoised content hashing for files on disk.
+
+Digests are cached by (path, size, mtime), so a file is only re-read when
+it actually changes.
+"""
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+
+_MAX_ENTRIES = 4096
+_digests = OrderedDict()
+_lock = threading.Lock()
+
+
+def file_digest(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """SHA-256 hex digest of a file's contents."""
+    stat = os.stat(path)
+    memo_key = (os.path.realpath(path), stat.st_size, stat.st_mtime_ns)
+
+    with _lock:
+        digest = _digests.get(memo_key)
+        if digest is not None:
+            _digests.move_to_end(memo_key)
+            return digest
+
+    sha = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            sha.update(chunk)
+    digest = sha.hexdigest()
+
+    with _lock:
+        _digests[memo_key] = digest
+        while len(_digests) > _MAX_ENTRIES:
+            _digests.popitem(last=False)
+    return digest
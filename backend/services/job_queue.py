@@ -0,0 +1,378 @@
+"""
+Background job queue for reel generation.
+
+Story generation takes minutes, so the API hands each request to a bounded
+worker pool and returns a job ID straight away. Clients poll the job for
+per-stage status and pick up the result once it has finished. Requests
+submitted with the same coalescing key while a matching job is queued or
+running attach to that job instead of starting another one.
+
+With JOB_STORE=sqlite (multi-worker deployments) job records and events
+are also written to a shared SQLiteJobStore: every worker then sees every
+job, and coalescing and the pending limit apply across workers.
+"""
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime
+
+from services.job_store import SQLiteJobStore, StoredEventStream
+from services.progress import ProgressReporter, reporting
+
+# Job lifecycle states
+QUEUED = "queued"
+RUNNING = "running"
+SUCCEEDED = "succeeded"
+FAILED = "failed"
+
+FINISHED_STATES = (SUCCEEDED, FAILED)
+
+
+class QueueFullError(Exception):
+    """Raised when the pending job limit has been reached."""
+
+
+class JobManager:
+    """
+    Runs pipeline jobs on a bounded thread pool and tracks their status.
+
+    The runner is called as ``runner(location=..., theme=..., on_stage=...,
+    location_data=...)`` and must return the orchestrator result dictionary.
+
+    Jobs always run in the process that accepted them; with a ``store``
+    (default: JOB_STORE=sqlite) their records and events are shared.
+    """
+
+    def __init__(self, runner, max_workers: int = None, max_pending: int = None, history_limit: int = None,
+                 store: SQLiteJobStore = None):
+        self.runner = runner
+        self.max_workers = max_workers or int(os.getenv('JOB_WORKERS', '2'))
+        self.max_pending = max_pending or int(os.getenv('JOB_QUEUE_LIMIT', '50'))
+        self.history_limit = history_limit or int(os.getenv('JOB_HISTORY_LIMIT', '200'))
+        self.coalescing = os.getenv('JOB_COALESCING', 'true').lower() == 'true'
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=self.max_workers,
+            thread_name_prefix="reel-job"
+        )
+        self._jobs = OrderedDict()
+        self._futures = {}
+        self._reporters = {}
+        self._location_data = {}
+        self._in_flight = {}  # coalescing key -> job_id
+        self._lock = threading.Lock()
+
+        if store is None and os.getenv('JOB_STORE', 'memory').lower() == 'sqlite':
+            store = SQLiteJobStore()
+        self.store = store
+        self._store_lock = threading.Lock()
+        self.orphan_check_interval = float(os.getenv('JOB_ORPHAN_CHECK_INTERVAL', '30'))
+        self._orphans_checked_at = 0.0
+        if store is not None:
+            self._fail_orphans(restarted=True)
+
+    def submit(self, location: str, theme: str = None, location_data: dict = None, coalesce_key=None) -> dict:
+        """
+        Queue a new reel generation job.
+
+        Args:
+            location: User's city or region
+            theme: Optional theme selection
+            location_data: Optional prefetched environmental data for the location
+            coalesce_key: Optional hashable key; while a job with the same key is
+                queued or running, that job is returned instead of a new one
+
+        Returns:
+            Snapshot of the queued (or joined) job
+        """
+        if self.store is not None:
+            return self._submit_shared(location, theme, location_data, coalesce_key)
+
+        with self._lock:
+            existing_id = self._in_flight.get(coalesce_key) if self.coalescing and coalesce_key is not None else None
+            if existing_id:
+                job = self._jobs[existing_id]
+                job["coalesced_requests"] += 1
+                print(f"🔗 Request for {location} joined in-flight job {existing_id}")
+                return self._snapshot(job)
+
+            pending = sum(1 for job in self._jobs.values() if job["status"] not in FINISHED_STATES)
+            if pending >= self.max_pending:
+                raise QueueFullError(f"Job queue is full ({pending} pending jobs)")
+
+            job = self._new_job(location, theme)
+            job_id = job["job_id"]
+            self._jobs[job_id] = job
+            self._reporters[job_id] = self._new_reporter(job_id)
+            if location_data:
+                self._location_data[job_id] = location_data
+            if self.coalescing and coalesce_key is not None:
+                self._in_flight[coalesce_key] = job_id
+            self._prune_history()
+
+            self._futures[job_id] = self._executor.submit(self._run, job_id)
+            snapshot = self._snapshot(job)
+
+        print(f"📥 Queued job {job_id} for {location}")
+        return snapshot
+
+    def _submit_shared(self, location: str, theme: str, location_data: dict, coalesce_key) -> dict:
+        """submit() against the shared store: coalesce and enforce the limit across workers."""
+        key = json.dumps(coalesce_key, default=str) if self.coalescing and coalesce_key is not None else None
+        # Frees the queue slots of jobs whose worker died
+        self.reap_orphans()
+        job = self._new_job(location, theme)
+        job_id = job["job_id"]
+
+        with self.store.transaction():
+            existing = self.store.find_in_flight(key) if key is not None else None
+            if existing:
+                self.store.add_coalesced(existing["job_id"])
+            else:
+                pending = self.store.pending()
+                if pending >= self.max_pending:
+                    raise QueueFullError(f"Job queue is full ({pending} pending jobs)")
+                self.store.insert(job, key)
+                self.store.prune(self.history_limit)
+
+        if existing:
+            existing["coalesced_requests"] += 1
+            print(f"🔗 Request for {location} joined in-flight job {existing['job_id']}")
+            return existing
+
+        with self._lock:
+            self._jobs[job_id] = job
+            self._reporters[job_id] = self._new_reporter(job_id)
+            if location_data:
+                self._location_data[job_id] = location_data
+            self._prune_history()
+            self._futures[job_id] = self._executor.submit(self._run, job_id)
+            snapshot = self._snapshot(job)
+
+        print(f"📥 Queued job {job_id} for {location}")
+        return snapshot
+
+    def add_finished(self, location: str, theme: str, result: dict) -> dict:
+        """
+        Record a job that is already complete (e.g. a pre-rendered reel).
+
+        The job gets the usual ID, event stream and future, so clients
+        handle it exactly like one that ran through the worker pool.
+
+        Returns:
+            Snapshot of the finished job
+        """
+        job = self._new_job(location, theme, result=result)
+        job_id = job["job_id"]
+        if self.store is not None:
+            self.store.insert(job)
+        reporter = self._new_reporter(job_id)
+        reporter.emit("job_started", job_id=job_id, location=location, theme=job["theme"])
+        reporter.emit("video_ready", filename=os.path.basename(result.get("final_video_path") or ""))
+        reporter.emit("job_finished", job_id=job_id, status=SUCCEEDED, error=None)
+        reporter.close()
+        future = Future()
+        future.set_result(result)
+
+        with self._lock:
+            self._jobs[job_id] = job
+            self._reporters[job_id] = reporter
+            self._futures[job_id] = future
+            self._prune_history()
+            snapshot = self._snapshot(job)
+
+        print(f"⚡ Served pre-rendered reel for {location} as job {job_id}")
+        return snapshot
+
+    def pending(self) -> int:
+        """Jobs queued or running."""
+        if self.store is not None:
+            return self.store.pending()
+        with self._lock:
+            return sum(1 for job in self._jobs.values() if job["status"] not in FINISHED_STATES)
+
+    def status_counts(self) -> dict:
+        """Number of tracked jobs in each status."""
+        counts = {status: 0 for status in (QUEUED, RUNNING, SUCCEEDED, FAILED)}
+        if self.store is not None:
+            counts.update(self.store.status_counts())
+            return counts
+        with self._lock:
+            for job in self._jobs.values():
+                counts[job["status"]] += 1
+        return counts
+
+    def get(self, job_id: str) -> dict:
+        """Return a snapshot of a job, or None if it is unknown."""
+        if self.store is not None:
+            self.reap_orphans()
+            return self.store.get(job_id)
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return self._snapshot(job) if job else None
+
+    def list(self, limit: int = 50) -> list:
+        """Return the most recent jobs, newest first."""
+        if self.store is not None:
+            return self.store.list(limit)
+        with self._lock:
+            jobs = list(self._jobs.values())[-limit:]
+            return [self._snapshot(job) for job in reversed(jobs)]
+
+    def reporter(self, job_id: str) -> ProgressReporter:
+        """Return the progress event stream of a job (read from the store if another worker runs it)."""
+        with self._lock:
+            reporter = self._reporters.get(job_id)
+        if reporter is None and self.store is not None and self.store.get(job_id):
+            return StoredEventStream(self.store, job_id, check_orphans=self.reap_orphans)
+        return reporter
+
+    def future(self, job_id: str):
+        """Return the concurrent.futures.Future backing a job (None if another worker runs it)."""
+        with self._lock:
+            return self._futures.get(job_id)
+
+    def reap_orphans(self):
+        """
+        Fail queued or running jobs of stopped workers (shared store only).
+
+        Called while submitting and polling, at most once per
+        JOB_ORPHAN_CHECK_INTERVAL seconds (default 30), so waiters on a job
+        whose worker died see it fail instead of waiting forever.
+        """
+        if self.store is None:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if now - self._orphans_checked_at < self.orphan_check_interval:
+                return
+            self._orphans_checked_at = now
+        self._fail_orphans()
+
+    def shutdown(self, wait: bool = False):
+        """Stop accepting jobs and release the worker pool."""
+        self._executor.shutdown(wait=wait, cancel_futures=not wait)
+
+    def _run(self, job_id: str) -> dict:
+        """Worker entry point: run the pipeline and record the outcome."""
+        with self._lock:
+            job = self._jobs[job_id]
+            job["status"] = RUNNING
+            job["started_at"] = datetime.now().isoformat()
+            location, theme = job["location"], job["theme"]
+            reporter = self._reporters[job_id]
+            location_data = self._location_data.pop(job_id, None)
+        self._persist(job_id)
+
+        def on_stage(stage: str, status: str):
+            self._update_stage(job_id, stage, status)
+
+        reporter.emit("job_started", job_id=job_id, location=location, theme=theme)
+        try:
+            with reporting(reporter):
+                result = self.runner(location=location, theme=theme, on_stage=on_stage, location_data=location_data)
+            error = None if result.get("success") else result.get("error", "Story generation failed")
+        except Exception as e:
+            print(f"❌ Job {job_id} crashed: {e}")
+            result, error = None, str(e)
+
+        with self._lock:
+            # Later identical requests start a fresh job
+            for key in [key for key, in_flight_id in self._in_flight.items() if in_flight_id == job_id]:
+                del self._in_flight[key]
+            job["result"] = result
+            job["error"] = error
+            job["status"] = FAILED if error else SUCCEEDED
+            job["finished_at"] = datetime.now().isoformat()
+        # Stored before job_finished, so a stream that sees that event finds the final record
+        self._persist(job_id)
+
+        reporter.emit("job_finished", job_id=job_id, status=job["status"], error=error)
+        reporter.close()
+
+        print(f"{'❌' if error else '✅'} Job {job_id} {job['status']}")
+        return result
+
+    def _update_stage(self, job_id: str, stage: str, status: str):
+        """Record a stage transition reported by the orchestrator."""
+        now = datetime.now().isoformat()
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if not job:
+                return
+            entry = job["stages"].setdefault(stage, {"status": None, "started_at": None, "finished_at": None})
+            entry["status"] = status
+            if status == RUNNING:
+                entry["started_at"] = now
+            else:
+                entry["finished_at"] = now
+        self._persist(job_id)
+
+    def _fail_orphans(self, restarted: bool = False):
+        try:
+            orphaned = self.store.fail_orphans(restarted=restarted)
+        except Exception as e:
+            print(f"  ⚠️ Could not check for orphaned jobs: {e}")
+            return
+        if orphaned:
+            print(f"⚠️ Marked {orphaned} jobs of stopped workers as failed")
+
+    def _new_job(self, location: str, theme: str = None, result: dict = None) -> dict:
+        """A queued job record, or with ``result`` an already finished (pre-rendered) one."""
+        finished = result is not None
+        now = datetime.now().isoformat()
+        return {
+            "job_id": uuid.uuid4().hex,
+            "status": SUCCEEDED if finished else QUEUED,
+            "location": location,
+            "theme": theme or "Auto-Detect",
+            "stages": {},
+            "coalesced_requests": 0,
+            "pooled": finished,
+            "result": result,
+            "error": None,
+            "created_at": now,
+            "started_at": now if finished else None,
+            "finished_at": now if finished else None
+        }
+
+    def _new_reporter(self, job_id: str) -> ProgressReporter:
+        reporter = ProgressReporter(job_id)
+        if self.store is not None:
+            reporter.add_listener(lambda event: self.store.append_event(job_id, event))
+        return reporter
+
+    def _persist(self, job_id: str):
+        """Write a job's current record to the shared store, in order of changes."""
+        if self.store is None:
+            return
+        with self._store_lock:
+            with self._lock:
+                job = self._jobs.get(job_id)
+                snapshot = self._snapshot(job) if job else None
+            if snapshot:
+                try:
+                    self.store.update(snapshot)
+                except Exception as e:
+                    print(f"  ⚠️ Could not store job {job_id}: {e}")
+
+    def _prune_history(self):
+        """Drop the oldest finished jobs beyond the history limit (lock held)."""
+        excess = len(self._jobs) - self.history_limit
+        if excess <= 0:
+            return
+        for job_id in [jid for jid, job in self._jobs.items() if job["status"] in FINISHED_STATES][:excess]:
+            del self._jobs[job_id]
+            self._futures.pop(job_id, None)
+            self._reporters.pop(job_id, None)
+
+    @staticmethod
+    def _snapshot(job: dict) -> dict:
+        """Copy a job record so callers never see it change underneath them."""
+        snapshot = dict(job)
+        snapshot["stages"] = {name: dict(entry) for name, entry in job["stages"].items()}
+        return snapshot
@@ -0,0 +1,247 @@
+"""
+SQLite-backed job records and progress events, shared by API worker processes.
+
+With several uvicorn/gunicorn workers a job runs in the process that
+accepted it, but its status, result and progress events are written here
+so any worker can answer ``/api/jobs/{id}`` and stream its events. The
+coalescing lookup and the pending-job limit run inside one ``BEGIN
+IMMEDIATE`` transaction, so identical requests arriving at different
+workers still share a single pipeline run.
+"""
+import json
+import os
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+from services import sqlite_db
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    job_id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    coalesce_key TEXT,
+    coalesced_requests INTEGER NOT NULL DEFAULT 0,
+    record TEXT NOT NULL,
+    owner_pid INTEGER,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs (status);
+CREATE INDEX IF NOT EXISTS idx_jobs_coalesce ON jobs (coalesce_key, status);
+CREATE INDEX IF NOT EXISTS idx_jobs_created ON jobs (created_at);
+CREATE TABLE IF NOT EXISTS job_events (
+    job_id TEXT NOT NULL,
+    event_id INTEGER NOT NULL,
+    type TEXT NOT NULL,
+    event TEXT NOT NULL,
+    PRIMARY KEY (job_id, event_id)
+) WITHOUT ROWID;
+"""
+
+# Statuses of jobs that still occupy the queue (mirrors services.job_queue)
+IN_FLIGHT_STATES = ("queued", "running")
+
+
+def _pid_alive(pid: int) -> bool:
+    if os.name != 'posix':
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class SQLiteJobStore:
+    """
+    Args:
+        db_path: Database file (default JOB_STORE_DB or data/jobs.db)
+    """
+
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or os.getenv('JOB_STORE_DB') or sqlite_db.default_db_path('jobs.db')
+        sqlite_db.connect(self.db_path).executescript(SCHEMA)
+
+    @contextmanager
+    def transaction(self):
+        """Serialize a read-modify-write section across processes."""
+        conn = sqlite_db.connect(self.db_path)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+
+    def insert(self, job: dict, coalesce_key: str = None):
+        now = time.time()
+        sqlite_db.connect(self.db_path).execute(
+            "INSERT INTO jobs (job_id, status, coalesce_key, coalesced_requests, record, owner_pid, created_at, updated_at)"
+            " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (job["job_id"], job["status"], coalesce_key, job["coalesced_requests"], self._dump(job),
+             os.getpid(), now, now)
+        )
+
+    def update(self, job: dict):
+        """Write a job's status, stages and result (its coalesced request count is kept)."""
+        sqlite_db.connect(self.db_path).execute(
+            "UPDATE jobs SET status = ?, record = ?, updated_at = ? WHERE job_id = ?",
+            (job["status"], self._dump(job), time.time(), job["job_id"])
+        )
+
+    def find_in_flight(self, coalesce_key: str) -> dict:
+        """The queued or running job for a coalescing key whose worker is still alive, or None."""
+        rows = sqlite_db.connect(self.db_path).execute(
+            "SELECT * FROM jobs WHERE coalesce_key = ? AND status IN (?, ?) ORDER BY created_at",
+            (coalesce_key, *IN_FLIGHT_STATES)
+        ).fetchall()
+        for row in rows:
+            if not self._orphaned(row):
+                return self._load(row)
+        return None
+
+    def add_coalesced(self, job_id: str):
+        sqlite_db.connect(self.db_path).execute(
+            "UPDATE jobs SET coalesced_requests = coalesced_requests + 1 WHERE job_id = ?", (job_id,)
+        )
+
+    def get(self, job_id: str) -> dict:
+        row = sqlite_db.connect(self.db_path).execute("SELECT * FROM jobs WHERE job_id = ?", (job_id,)).fetchone()
+        return self._load(row)
+
+    def list(self, limit: int = 50) -> list:
+        """The most recent jobs, newest first."""
+        rows = sqlite_db.connect(self.db_path).execute(
+            "SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?", (limit,)
+        ).fetchall()
+        return [self._load(row) for row in rows]
+
+    def pending(self) -> int:
+        return sqlite_db.connect(self.db_path).execute(
+            "SELECT COUNT(*) FROM jobs WHERE status IN (?, ?)", IN_FLIGHT_STATES
+        ).fetchone()[0]
+
+    def status_counts(self) -> dict:
+        rows = sqlite_db.connect(self.db_path).execute("SELECT status, COUNT(*) FROM jobs GROUP BY status").fetchall()
+        return {row[0]: row[1] for row in rows}
+
+    def append_event(self, job_id: str, event: dict):
+        sqlite_db.connect(self.db_path).execute(
+            "INSERT OR IGNORE INTO job_events (job_id, event_id, type, event) VALUES (?, ?, ?, ?)",
+            (job_id, event["id"], event["type"], json.dumps(event, default=str))
+        )
+
+    def events_since(self, job_id: str, cursor: int = 0) -> list:
+        rows = sqlite_db.connect(self.db_path).execute(
+            "SELECT event FROM job_events WHERE job_id = ? AND event_id >= ? ORDER BY event_id", (job_id, cursor)
+        ).fetchall()
+        return [json.loads(row["event"]) for row in rows]
+
+    def has_finished_event(self, job_id: str) -> bool:
+        return sqlite_db.connect(self.db_path).execute(
+            "SELECT 1 FROM job_events WHERE job_id = ? AND type = 'job_finished' LIMIT 1", (job_id,)
+        ).fetchone() is not None
+
+    def prune(self, history_limit: int):
+        """Drop the oldest finished jobs (and their events) beyond the history limit."""
+        conn = sqlite_db.connect(self.db_path)
+        excess = conn.execute("SELECT COUNT(*) FROM jobs").fetchone()[0] - history_limit
+        if excess <= 0:
+            return
+        job_ids = [row[0] for row in conn.execute(
+            "SELECT job_id FROM jobs WHERE status NOT IN (?, ?) ORDER BY created_at LIMIT ?",
+            (*IN_FLIGHT_STATES, excess)
+        ).fetchall()]
+        conn.executemany("DELETE FROM job_events WHERE job_id = ?", [(job_id,) for job_id in job_ids])
+        conn.executemany("DELETE FROM jobs WHERE job_id = ?", [(job_id,) for job_id in job_ids])
+
+    def fail_orphans(self, restarted: bool = False) -> int:
+        """
+        Mark queued or running jobs whose worker process is gone as failed.
+
+        Args:
+            restarted: This process has just started, so jobs recorded under
+                its own pid belong to an earlier process that had the same pid
+
+        Returns:
+            Number of jobs marked failed
+        """
+        failed = 0
+        with self.transaction():
+            rows = sqlite_db.connect(self.db_path).execute(
+                "SELECT * FROM jobs WHERE status IN (?, ?)", IN_FLIGHT_STATES
+            ).fetchall()
+            for row in rows:
+                if not self._orphaned(row, restarted):
+                    continue
+                job = self._load(row)
+                job["status"] = "failed"
+                job["error"] = "The worker running this job stopped"
+                job["finished_at"] = datetime.now().isoformat()
+                self.update(job)
+                # Lets clients streaming its events finish
+                last = sqlite_db.connect(self.db_path).execute(
+                    "SELECT MAX(event_id) FROM job_events WHERE job_id = ?", (job["job_id"],)
+                ).fetchone()[0]
+                self.append_event(job["job_id"], {
+                    "id": 0 if last is None else last + 1, "type": "job_finished", "time": time.time(),
+                    "job_id": job["job_id"], "status": "failed", "error": job["error"]
+                })
+                failed += 1
+        return failed
+
+    @staticmethod
+    def _orphaned(row, restarted: bool = False) -> bool:
+        pid = row["owner_pid"]
+        if pid is None:
+            return True
+        if pid == os.getpid():
+            return restarted
+        return not _pid_alive(pid)
+
+    @staticmethod
+    def _dump(job: dict) -> str:
+        record = {key: value for key, value in job.items() if key != "coalesced_requests"}
+        return json.dumps(record, default=str)
+
+    @staticmethod
+    def _load(row) -> dict:
+        if row is None:
+            return None
+        job = json.loads(row["record"])
+        job["status"] = row["status"]
+        job["coalesced_requests"] = row["coalesced_requests"]
+        return job
+
+
+class StoredEventStream:
+    """
+    Read-only view of a job's progress events in the store.
+
+    Has the ``events_since()`` / ``closed`` interface of ProgressReporter, so
+    a worker can stream events of a job running in another worker.
+
+    Args:
+        store: Job store
+        job_id: Job whose events are read
+        check_orphans: Optional callable run before each ``closed`` check, so a
+            stream of a job whose worker died still ends
+    """
+
+    def __init__(self, store: SQLiteJobStore, job_id: str, check_orphans=None):
+        self.store = store
+        self.job_id = job_id
+        self.check_orphans = check_orphans
+
+    @property
+    def closed(self) -> bool:
+        if self.check_orphans:
+            self.check_orphans()
+        return self.store.has_finished_event(self.job_id)
+
+    def events_since(self, cursor: int = 0) -> list:
+        return self.store.events_since(self.job_id, cursor)
@@ -0,0 +1,225 @@
+"""
+In-process metrics with Prometheus text exposition.
+
+Counters and histograms are recorded where the work happens (orchestrator
+stages, external API calls, retries, fallbacks, rate-limit waits) and
+rendered by ``/metrics``. Values that are already tracked elsewhere, such
+as cache hit/miss counters, are read at scrape time through collectors
+instead of being counted twice.
+
+Metrics are per process; assembly worker processes are covered by the
+``video_assembly`` stage timing recorded in the API process.
+"""
+import threading
+import time
+from contextlib import contextmanager
+
+from services.tracing import span
+
+# Seconds; reels span sub-millisecond cache hits to multi-minute Imagen waits
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300, 600)
+
+
+def _label_key(labelnames: tuple, labels: dict) -> tuple:
+    if set(labels) != set(labelnames):
+        raise ValueError(f"Expected labels {labelnames}, got {tuple(labels)}")
+    return tuple(str(labels[name]) for name in labelnames)
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labelnames: tuple, values: tuple, extra: dict = None) -> str:
+    pairs = list(zip(labelnames, values)) + list((extra or {}).items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> list:
+        with self._lock:
+            values = sorted(self._values.items())
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        lines += [f"{self.name}{_format_labels(self.labelnames, key)} {_format_value(value)}" for key, value in values]
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float('inf'),)
+        self._series = {}  # label values -> [bucket counts, sum, count]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the duration of the ``with`` block."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self) -> list:
+        with self._lock:
+            series = sorted((key, ([*counts], total, count)) for key, (counts, total, count) in self._series.items())
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        for key, (counts, total, count) in series:
+            for bound, bucket_count in zip(self.buckets, counts):
+                labels = _format_labels(self.labelnames, key, {"le": _format_value(bound)})
+                lines.append(f"{self.name}_bucket{labels} {bucket_count}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {_format_value(round(total, 6))}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {count}")
+        return lines
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, documentation: str, labelnames: tuple = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: tuple = (), buckets: tuple = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def register_collector(self, collector):
+        """
+        Add a scrape-time source of samples.
+
+        ``collector()`` returns ``(name, type, help, samples)`` tuples where
+        samples is a list of ``(labels dict, value)``.
+        """
+        with self._lock:
+            self._collectors.append(collector)
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+
+        lines = []
+        for metric in metrics:
+            lines += metric.render()
+        for collector in collectors:
+            try:
+                families = collector()
+            except Exception as e:
+                print(f"  ⚠️ Metrics collector error: {e}")
+                continue
+            for name, metric_type, documentation, samples in families:
+                lines += [f"# HELP {name} {documentation}", f"# TYPE {name} {metric_type}"]
+                for labels, value in samples:
+                    if value is None:
+                        continue
+                    lines.append(f"{name}{_format_labels(tuple(labels), tuple(labels.values()))} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+stage_seconds = registry.histogram(
+    "arogya_stage_duration_seconds", "Orchestrator stage latency", ("stage", "outcome")
+)
+external_call_seconds = registry.histogram(
+    "arogya_external_call_duration_seconds", "Latency of calls to external APIs", ("service", "outcome")
+)
+retries_total = registry.counter(
+    "arogya_retries_total", "External calls retried after a transient failure", ("service",)
+)
+fallbacks_total = registry.counter(
+    "arogya_fallbacks_total", "Fallback content used instead of a failed generator", ("component",)
+)
+rate_limit_wait_seconds = registry.histogram(
+    "arogya_rate_limit_wait_seconds", "Time spent waiting for rate-limit tokens", ("limiter",)
+)
+
+
+@contextmanager
+def external_call(service: str):
+    """Time a call to an external API, labelled with its outcome (ok / error), and trace it as a span."""
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        with span(service, category="external"):
+            yield
+        outcome = "ok"
+    finally:
+        external_call_seconds.observe(time.perf_counter() - start, service=service, outcome=outcome)
+
+
+def _cache_families() -> list:
+    """Hit/miss counters and sizes of every cache in this process."""
+    from services.artifact_cache import all_cache_stats
+    from services.sqlite_cache import all_sqlite_cache_stats
+    from services.ttl_cache import all_ttl_cache_stats
+
+    lookups, entries, size = [], [], []
+    for kind, caches in (("artifact", all_cache_stats()), ("ttl", all_ttl_cache_stats()),
+                         ("sqlite", all_sqlite_cache_stats())):
+        for name, stats in caches.items():
+            labels = {"cache": name, "kind": kind}
+            hits = stats.get("hits", 0) + stats.get("stale_hits", 0) + stats.get("memory_hits", 0)
+            lookups.append(({**labels, "result": "hit"}, hits))
+            lookups.append(({**labels, "result": "miss"}, stats.get("misses", 0)))
+            entries.append((labels, stats.get("entries")))
+            if "bytes" in stats:
+                size.append((labels, stats["bytes"]))
+
+    return [
+        ("arogya_cache_lookups_total", "counter", "Cache lookups by result", lookups),
+        ("arogya_cache_entries", "gauge", "Entries currently cached", entries),
+        ("arogya_cache_bytes", "gauge", "Bytes currently cached on disk", size)
+    ]
+
+
+registry.register_collector(_cache_families)
+
+
+def render_metrics() -> str:
+    return registry.render()
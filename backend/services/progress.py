@@ -0,0 +1,80 @@
+"""
+Structured progress events for reel generation.
+
+The orchestrator and sub-agent tools call ``emit_progress(...)``; events go
+to the ProgressReporter bound to the current job through a context
+variable, so shared tool instances never need per-job state. Events are
+buffered so late subscribers (e.g. an SSE client reconnecting with
+Last-Event-ID) can replay them.
+"""
+import contextvars
+import threading
+import time
+from contextlib import contextmanager
+
+_current_reporter = contextvars.ContextVar("progress_reporter", default=None)
+
+
+class ProgressReporter:
+    def __init__(self, job_id: str = None, max_events: int = 1000):
+        self.job_id = job_id
+        self.max_events = max_events
+        self.closed = False
+        self._events = []
+        self._next_id = 0
+        self._listeners = []
+        self._lock = threading.Lock()
+
+    def emit(self, event_type: str, **data) -> dict:
+        """Record an event and pass it to listeners."""
+        with self._lock:
+            if self.closed:
+                return None
+            event = {"id": self._next_id, "type": event_type, "time": time.time(), **data}
+            self._next_id += 1
+            if len(self._events) < self.max_events or event_type == "job_finished":
+                self._events.append(event)
+            listeners = list(self._listeners)
+
+        for listener in listeners:
+            try:
+                listener(event)
+            except Exception as e:
+                print(f"  ⚠️ Progress listener error: {e}")
+        return event
+
+    def add_listener(self, listener):
+        """Call ``listener(event)`` for every future event."""
+        with self._lock:
+            self._listeners.append(listener)
+
+    def events_since(self, cursor: int = 0) -> list:
+        """Events with id >= cursor."""
+        with self._lock:
+            return [event for event in self._events if event["id"] >= cursor]
+
+    def close(self):
+        """Mark the stream finished; no further events are accepted."""
+        with self._lock:
+            self.closed = True
+
+
+def current_reporter() -> ProgressReporter:
+    return _current_reporter.get()
+
+
+def emit_progress(event_type: str, **data):
+    """Emit an event to the current job's reporter (no-op outside a job)."""
+    reporter = _current_reporter.get()
+    if reporter is not None:
+        reporter.emit(event_type, **data)
+
+
+@contextmanager
+def reporting(reporter: ProgressReporter):
+    """Bind ``reporter`` as the destination for emit_progress() in this context."""
+    token = _current_reporter.set(reporter)
+    try:
+        yield reporter
+    finally:
+        _current_reporter.reset(token)
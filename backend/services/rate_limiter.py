@@ -0,0 +1,179 @@
+"""
+Token-bucket rate limiting for quota-bound external APIs.
+
+Buckets are shared process-wide (one per name), and can optionally be
+backed by SQLite so several worker processes draw from the same quota.
+Callers reserve tokens up front and sleep exactly until their reservation
+matures, so concurrent reels queue fairly and the quota is used fully.
+"""
+import os
+import threading
+import time
+
+from services import sqlite_db
+from services.metrics import rate_limit_wait_seconds
+from services.tracing import span
+
+
+class RateLimitTimeout(Exception):
+    """Raised when a token could not be obtained within the requested timeout."""
+
+
+class TokenBucket:
+    """
+    In-process token bucket.
+
+    Args:
+        name: Bucket name (used for logging and shared lookups)
+        rate: Tokens added per period
+        period: Refill period in seconds
+        capacity: Maximum burst size (defaults to rate)
+    """
+
+    def __init__(self, name: str, rate: float, period: float = 60.0, capacity: float = None):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.name = name
+        self.rate = float(rate)
+        self.period = float(period)
+        self.capacity = float(capacity or rate)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, tokens: float = 1, timeout: float = None) -> float:
+        """
+        Take tokens, sleeping only as long as the bucket needs to refill.
+
+        Args:
+            tokens: Number of tokens to take
+            timeout: Maximum seconds to wait (None waits as long as needed)
+
+        Returns:
+            Seconds spent waiting
+        """
+        wait_time = self._reserve(tokens, timeout)
+        if wait_time is None:
+            raise RateLimitTimeout(f"Rate limit '{self.name}' would need more than {timeout}s")
+        rate_limit_wait_seconds.observe(wait_time, limiter=self.name)
+        if wait_time > 0:
+            print(f"    ⏱️  Waiting {wait_time:.1f}s for '{self.name}' quota...")
+            with span(f"rate_limit:{self.name}", category="rate_limit", wait_seconds=round(wait_time, 3)):
+                time.sleep(wait_time)
+        return wait_time
+
+    def try_acquire(self, tokens: float = 1) -> bool:
+        """Take tokens only if they are available right now."""
+        return self._reserve(tokens, 0) == 0
+
+    def available(self) -> float:
+        """Tokens currently available (negative when reservations are queued)."""
+        with self._lock:
+            self._refill(time.monotonic())
+            return self._tokens
+
+    def _refill(self, now: float):
+        elapsed = max(0.0, now - self._updated_at)
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate / self.period)
+        self._updated_at = now
+
+    def _reserve(self, tokens: float, max_wait: float = None):
+        """Reserve tokens and return the wait until they mature, or None if it exceeds max_wait."""
+        with self._lock:
+            self._refill(time.monotonic())
+            wait_time = self._wait_for(self._tokens, tokens)
+            if max_wait is not None and wait_time > max_wait:
+                return None
+            self._tokens -= tokens
+            return wait_time
+
+    def _wait_for(self, current: float, tokens: float) -> float:
+        deficit = tokens - current
+        return 0.0 if deficit <= 0 else deficit * self.period / self.rate
+
+
+class SQLiteTokenBucket(TokenBucket):
+    """
+    Token bucket whose state lives in a SQLite row, shared across processes.
+
+    Uses wall-clock time since monotonic clocks are not comparable between
+    processes.
+    """
+
+    def __init__(self, name: str, rate: float, period: float = 60.0, capacity: float = None, db_path: str = None):
+        super().__init__(name, rate, period, capacity)
+        self.db_path = db_path or os.getenv('RATE_LIMIT_DB') or sqlite_db.default_db_path('rate_limits.db')
+        conn = sqlite_db.connect(self.db_path)
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_limits ("
+            " name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)"
+        )
+        conn.execute(
+            "INSERT OR IGNORE INTO rate_limits (name, tokens, updated_at) VALUES (?, ?, ?)",
+            (self.name, self.capacity, time.time())
+        )
+
+    def available(self) -> float:
+        conn = sqlite_db.connect(self.db_path)
+        row = conn.execute("SELECT tokens, updated_at FROM rate_limits WHERE name = ?", (self.name,)).fetchone()
+        elapsed = max(0.0, time.time() - row["updated_at"])
+        return min(self.capacity, row["tokens"] + elapsed * self.rate / self.period)
+
+    def _reserve(self, tokens: float, max_wait: float = None):
+        conn = sqlite_db.connect(self.db_path)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute("SELECT tokens, updated_at FROM rate_limits WHERE name = ?", (self.name,)).fetchone()
+            now = time.time()
+            elapsed = max(0.0, now - row["updated_at"])
+            current = min(self.capacity, row["tokens"] + elapsed * self.rate / self.period)
+
+            wait_time = self._wait_for(current, tokens)
+            if max_wait is not None and wait_time > max_wait:
+                conn.execute("ROLLBACK")
+                return None
+
+            conn.execute(
+                "UPDATE rate_limits SET tokens = ?, updated_at = ? WHERE name = ?",
+                (current - tokens, now, self.name)
+            )
+            conn.execute("COMMIT")
+            return wait_time
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+
+_buckets = {}
+_buckets_lock = threading.Lock()
+
+
+def get_rate_limiter(name: str, rate: float, period: float = 60.0, capacity: float = None, backend: str = None) -> TokenBucket:
+    """
+    Return the shared bucket for ``name``, creating it on first use.
+
+    Args:
+        name: Bucket name
+        rate: Tokens per period
+        period: Refill period in seconds
+        capacity: Burst size (defaults to rate)
+        backend: "memory" (per process) or "sqlite" (shared across processes);
+            defaults to the RATE_LIMIT_BACKEND env var, then "memory"
+    """
+    backend = (backend or os.getenv('RATE_LIMIT_BACKEND', 'memory')).lower()
+    with _buckets_lock:
+        bucket = _buckets.get(name)
+        if bucket is None:
+            if backend == 'sqlite':
+                bucket = SQLiteTokenBucket(name, rate, period, capacity)
+            else:
+                bucket = TokenBucket(name, rate, period, capacity)
+            _buckets[name] = bucket
+        return bucket
+
+
+def imagen_rate_limiter() -> TokenBucket:
+    """Shared bucket for Imagen calls (IMAGEN_RATE_LIMIT images per minute, default 2)."""
+    rate = float(os.getenv('IMAGEN_RATE_LIMIT', '2'))
+    burst = float(os.getenv('IMAGEN_RATE_BURST', str(rate)))
+    return get_rate_limiter("imagen", rate=rate, period=60.0, capacity=burst)
@@ -0,0 +1,301 @@
+"""
+Pool of pre-rendered reels for popular requests.
+
+Story inputs are coarse (a location, one of seven themes and a weather
+bucket), so the most-requested combinations can be rendered ahead of time.
+The pool records demand per (location, theme); a background warmer renders
+reels for the top entries during off-peak hours while Imagen is idle and a
+daily budget remains. A request whose coalescing key matches a ready reel
+is served that reel immediately; each pooled reel is handed out once.
+"""
+import json
+import os
+import socket
+import threading
+import time
+from datetime import datetime
+
+from services import sqlite_db
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pool_reels (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    pool_key TEXT NOT NULL,
+    location TEXT NOT NULL,
+    theme TEXT,
+    result TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    served_at REAL
+);
+CREATE INDEX IF NOT EXISTS idx_pool_reels_key ON pool_reels (pool_key, served_at, created_at);
+CREATE INDEX IF NOT EXISTS idx_pool_reels_created ON pool_reels (created_at);
+CREATE TABLE IF NOT EXISTS pool_demand (
+    demand_key TEXT PRIMARY KEY,
+    location TEXT NOT NULL,
+    theme TEXT,
+    requests INTEGER NOT NULL,
+    last_requested REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_pool_demand_requests ON pool_demand (requests DESC);
+CREATE TABLE IF NOT EXISTS pool_renders (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    location TEXT NOT NULL,
+    theme TEXT,
+    started_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_pool_renders_started ON pool_renders (started_at);
+CREATE TABLE IF NOT EXISTS pool_leases (
+    name TEXT PRIMARY KEY,
+    owner TEXT NOT NULL,
+    expires_at REAL NOT NULL
+);
+"""
+
+
+def pool_key(coalesce_key: tuple) -> str:
+    """Stable text form of an orchestrator coalescing key."""
+    return json.dumps(list(coalesce_key))
+
+
+class ReelPool:
+    """
+    Args:
+        db_path: Database file (default REEL_POOL_DB or data/reel_pool.db)
+        max_age: Seconds a pooled reel stays servable (weather moves on)
+    """
+
+    def __init__(self, db_path: str = None, max_age: float = None):
+        self.db_path = db_path or os.getenv('REEL_POOL_DB') or sqlite_db.default_db_path('reel_pool.db')
+        self.max_age = max_age or float(os.getenv('REEL_POOL_MAX_AGE', str(6 * 3600)))
+        self._schema_ready = False
+
+    def _connect(self):
+        # The database is created on first use, so a server without a pool never touches it
+        conn = sqlite_db.connect(self.db_path)
+        if not self._schema_ready:
+            conn.executescript(SCHEMA)
+            self._schema_ready = True
+        return conn
+
+    def record_demand(self, location: str, theme: str = None):
+        """Count a request for (location, theme)."""
+        theme = theme or "Auto-Detect"
+        self._connect().execute(
+            "INSERT INTO pool_demand (demand_key, location, theme, requests, last_requested) VALUES (?, ?, ?, 1, ?) "
+            "ON CONFLICT (demand_key) DO UPDATE SET requests = requests + 1, last_requested = excluded.last_requested",
+            (f"{' '.join(location.lower().split())}|{theme}", location, theme, time.time())
+        )
+
+    def top_demand(self, limit: int = 10) -> list:
+        """Most-requested (location, theme) pairs."""
+        rows = self._connect().execute(
+            "SELECT location, theme, requests FROM pool_demand ORDER BY requests DESC, last_requested DESC LIMIT ?",
+            (limit,)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def add(self, coalesce_key: tuple, location: str, theme: str, result: dict):
+        """Put a finished pipeline result into the pool."""
+        self._connect().execute(
+            "INSERT INTO pool_reels (pool_key, location, theme, result, created_at) VALUES (?, ?, ?, ?, ?)",
+            (pool_key(coalesce_key), location, theme, json.dumps(result, default=str), time.time())
+        )
+
+    def ready_count(self, coalesce_key: tuple) -> int:
+        return self._connect().execute(
+            "SELECT COUNT(*) FROM pool_reels WHERE pool_key = ? AND served_at IS NULL AND created_at > ?",
+            (pool_key(coalesce_key), time.time() - self.max_age)
+        ).fetchone()[0]
+
+    def take(self, coalesce_key: tuple) -> dict:
+        """
+        Claim the oldest ready reel for a key.
+
+        Returns:
+            The pooled pipeline result, or None when no reel is ready
+        """
+        conn = self._connect()
+        while True:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT id, result FROM pool_reels WHERE pool_key = ? AND served_at IS NULL AND created_at > ? "
+                    "ORDER BY created_at LIMIT 1",
+                    (pool_key(coalesce_key), time.time() - self.max_age)
+                ).fetchone()
+                if row is not None:
+                    conn.execute("UPDATE pool_reels SET served_at = ? WHERE id = ?", (time.time(), row["id"]))
+                conn.execute("COMMIT")
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+
+            if row is None:
+                return None
+            result = json.loads(row["result"])
+            # Skip reels whose file has been removed since they were pooled
+            if os.path.exists(result.get("final_video_path") or ""):
+                return result
+
+    def rendered_since(self, since: float) -> int:
+        """Reels added to the pool after ``since``."""
+        return self._connect().execute(
+            "SELECT COUNT(*) FROM pool_reels WHERE created_at > ?", (since,)
+        ).fetchone()[0]
+
+    def record_render(self, location: str, theme: str = None):
+        """Count a pre-render the warmer started, whether or not its reel ends up pooled."""
+        self._connect().execute(
+            "INSERT INTO pool_renders (location, theme, started_at) VALUES (?, ?, ?)",
+            (location, theme, time.time())
+        )
+
+    def renders_since(self, since: float) -> int:
+        """Pre-renders started after ``since`` (for the daily budget)."""
+        return self._connect().execute(
+            "SELECT COUNT(*) FROM pool_renders WHERE started_at > ?", (since,)
+        ).fetchone()[0]
+
+    def acquire_lease(self, name: str, owner: str, ttl: float) -> bool:
+        """
+        Take or renew the lease ``name`` for ``ttl`` seconds.
+
+        With several API workers only the lease holder runs the warmer; a
+        stopped holder's lease simply expires.
+
+        Returns:
+            True if ``owner`` holds the lease
+        """
+        now = time.time()
+        conn = self._connect()
+        conn.execute(
+            "INSERT INTO pool_leases (name, owner, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT (name) DO UPDATE SET owner = excluded.owner, expires_at = excluded.expires_at "
+            "WHERE pool_leases.owner = excluded.owner OR pool_leases.expires_at <= ?",
+            (name, owner, now + ttl, now)
+        )
+        row = conn.execute("SELECT owner FROM pool_leases WHERE name = ?", (name,)).fetchone()
+        return row is not None and row["owner"] == owner
+
+    def purge(self):
+        """Forget served and expired reels (the videos stay in the catalog) and old render records."""
+        conn = self._connect()
+        conn.execute(
+            "DELETE FROM pool_reels WHERE served_at IS NOT NULL OR created_at <= ?",
+            (time.time() - max(self.max_age, 24 * 3600),)
+        )
+        conn.execute("DELETE FROM pool_renders WHERE started_at <= ?", (time.time() - 24 * 3600,))
+
+    def stats(self) -> dict:
+        conn = self._connect()
+        now = time.time()
+        return {
+            "ready": conn.execute(
+                "SELECT COUNT(*) FROM pool_reels WHERE served_at IS NULL AND created_at > ?", (now - self.max_age,)
+            ).fetchone()[0],
+            "served_24h": conn.execute(
+                "SELECT COUNT(*) FROM pool_reels WHERE served_at > ?", (now - 24 * 3600,)
+            ).fetchone()[0],
+            "rendered_24h": self.rendered_since(now - 24 * 3600),
+            "render_attempts_24h": self.renders_since(now - 24 * 3600),
+            "top_demand": self.top_demand(5)
+        }
+
+
+def parse_hours(spec: str) -> tuple:
+    """Parse an "start-end" local hour window such as "1-6" or "22-5"."""
+    start, _, end = spec.partition('-')
+    return int(start), int(end)
+
+
+class ReelPoolWarmer:
+    """
+    Background thread that tops up the pool.
+
+    Each tick renders at most one reel, and only when it is off-peak, no
+    user jobs are pending, the Imagen bucket is full and the daily budget
+    is not spent.
+
+    Args:
+        pool: ReelPool to fill
+        job_manager: JobManager that renders the reels
+        prepare: ``prepare(location, theme) -> (location_data, coalesce_key)``
+        rate_limiter: Imagen token bucket (renders wait until it is full)
+    """
+
+    def __init__(self, pool: ReelPool, job_manager, prepare, rate_limiter=None):
+        self.pool = pool
+        self.job_manager = job_manager
+        self.prepare = prepare
+        self.rate_limiter = rate_limiter
+        self.size = int(os.getenv('REEL_POOL_SIZE', '0'))
+        self.top_entries = int(os.getenv('REEL_POOL_TOP_ENTRIES', '10'))
+        self.daily_limit = int(os.getenv('REEL_POOL_DAILY_LIMIT', '20'))
+        self.interval = float(os.getenv('REEL_POOL_INTERVAL', '300'))
+        self.off_peak = parse_hours(os.getenv('REEL_POOL_OFF_PEAK_HOURS', '1-6'))
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.size > 0
+
+    def start(self):
+        if not self.enabled or self._thread:
+            return
+        self._thread = threading.Thread(target=self._loop, name="reel-pool-warmer", daemon=True)
+        self._thread.start()
+        print(f"🔥 Reel pool warmer started ({self.size} per entry, off-peak {self.off_peak[0]}:00-{self.off_peak[1]}:00)")
+
+    def stop(self):
+        self._stop.set()
+
+    def is_off_peak(self, hour: int = None) -> bool:
+        hour = datetime.now().hour if hour is None else hour
+        start, end = self.off_peak
+        return start <= hour < end if start <= end else hour >= start or hour < end
+
+    def _loop(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.tick()
+            except Exception as e:
+                print(f"  ⚠️ Reel pool refill failed: {e}")
+
+    def tick(self) -> bool:
+        """Render one reel for the most-demanded entry that is short. Returns True if one was added."""
+        # One warmer across all API workers
+        if not self.pool.acquire_lease("warmer", self.owner, ttl=self.interval * 3):
+            return False
+        self.pool.purge()
+        if not self.is_off_peak() or self.job_manager.pending() > 0:
+            return False
+        # Every render counts, including ones handed to a user who coalesced onto them
+        if self.pool.renders_since(time.time() - 24 * 3600) >= self.daily_limit:
+            return False
+        if self.rate_limiter is not None and self.rate_limiter.available() < self.rate_limiter.capacity:
+            return False
+
+        for demand in self.pool.top_demand(self.top_entries):
+            location, theme = demand["location"], demand["theme"]
+            location_data, coalesce_key = self.prepare(location, theme)
+            if coalesce_key is None or self.pool.ready_count(coalesce_key) >= self.size:
+                continue
+
+            print(f"🔥 Pre-rendering reel for {location} ({theme})")
+            self.pool.record_render(location, theme)
+            job = self.job_manager.submit(location=location, theme=theme, location_data=location_data,
+                                          coalesce_key=coalesce_key)
+            future = self.job_manager.future(job["job_id"])
+            if future is None:
+                # Joined a job running in another worker; that reel is a user's
+                return False
+            result = future.result()
+            finished = self.job_manager.get(job["job_id"])
+            # A reel someone already asked for is theirs, not the pool's
+            if result and result.get("success") and finished and not finished["coalesced_requests"]:
+                self.pool.add(coalesce_key, location, theme, result)
+                return True
+            return False
+        return False
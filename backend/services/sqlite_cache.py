@@ -0,0 +1,187 @@
+"""
+SQLite-backed key/value cache with expiry and an in-memory LRU in front.
+
+Values are JSON documents in one table keyed by (namespace, key) with an
+indexed ``expires_at`` column, so lookups are a single index probe and
+expired rows can be purged in bulk. The database runs in WAL mode (see
+services.sqlite_db) and can be shared by worker threads and processes.
+Every cache registers itself so hit/miss stats can be reported together.
+"""
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from services import sqlite_db
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS cache_entries (
+    namespace TEXT NOT NULL,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (namespace, key)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_cache_entries_expires ON cache_entries (expires_at);
+"""
+
+
+class SQLiteCache:
+    """
+    Args:
+        name: Cache name; also the namespace of its rows
+        ttl: Default seconds an entry stays valid
+        memory_entries: Size of the per-process LRU in front of SQLite
+        purge_interval: Seconds between purges of expired rows
+        db_path: Database file (default CACHE_DB or data/cache.db)
+    """
+
+    def __init__(self, name: str, ttl: float, memory_entries: int = 256, purge_interval: float = 3600,
+                 db_path: str = None):
+        self.name = name
+        self.ttl = ttl
+        self.memory_entries = memory_entries
+        self.purge_interval = purge_interval
+        self.db_path = db_path or os.getenv('CACHE_DB') or sqlite_db.default_db_path('cache.db')
+
+        conn = sqlite_db.connect(self.db_path)
+        # Incremental auto-vacuum lets purges hand freed pages back to the OS.
+        # A new database is switched over here (VACUUM of an empty file is
+        # instant); an existing one by its next purge (see purge_expired)
+        if conn.execute("SELECT COUNT(*) FROM sqlite_master").fetchone()[0] == 0:
+            self._enable_incremental_vacuum(conn)
+        conn.executescript(SCHEMA)
+
+        self._memory = OrderedDict()  # key -> (value, expires_at)
+        self._lock = threading.Lock()
+        self._last_purge = 0.0
+        self._counters = {"memory_hits": 0, "hits": 0, "misses": 0, "stores": 0, "purged": 0}
+
+    def get(self, key: str):
+        """Return the cached value for a key, or None on a miss or after expiry."""
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[1] > now:
+                    self._memory.move_to_end(key)
+                    self._counters["memory_hits"] += 1
+                    return entry[0]
+                del self._memory[key]
+
+        row = sqlite_db.connect(self.db_path).execute(
+            "SELECT value, expires_at FROM cache_entries WHERE namespace = ? AND key = ? AND expires_at > ?",
+            (self.name, key, now)
+        ).fetchone()
+
+        if row is None:
+            with self._lock:
+                self._counters["misses"] += 1
+            return None
+
+        value = json.loads(row["value"])
+        with self._lock:
+            self._counters["hits"] += 1
+            self._remember(key, value, row["expires_at"])
+        return value
+
+    def put(self, key: str, value, ttl: float = None):
+        """Store a JSON-serialisable value for ``ttl`` seconds (default: the cache TTL)."""
+        now = time.time()
+        expires_at = now + (self.ttl if ttl is None else ttl)
+        sqlite_db.connect(self.db_path).execute(
+            "INSERT OR REPLACE INTO cache_entries (namespace, key, value, created_at, expires_at) VALUES (?, ?, ?, ?, ?)",
+            (self.name, key, json.dumps(value), now, expires_at)
+        )
+        with self._lock:
+            self._counters["stores"] += 1
+            self._remember(key, value, expires_at)
+            purge_due = now - self._last_purge >= self.purge_interval
+            if purge_due:
+                self._last_purge = now
+
+        if purge_due:
+            self.purge_expired()
+
+    def delete(self, key: str):
+        sqlite_db.connect(self.db_path).execute(
+            "DELETE FROM cache_entries WHERE namespace = ? AND key = ?", (self.name, key)
+        )
+        with self._lock:
+            self._memory.pop(key, None)
+
+    def purge_expired(self) -> int:
+        """Delete expired rows (all namespaces) and release the freed pages."""
+        conn = sqlite_db.connect(self.db_path)
+        removed = conn.execute("DELETE FROM cache_entries WHERE expires_at <= ?", (time.time(),)).rowcount
+        if removed:
+            if conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+                # Database created before incremental auto-vacuum: one full VACUUM switches it over
+                self._enable_incremental_vacuum(conn)
+            else:
+                conn.execute("PRAGMA incremental_vacuum")
+            print(f"🧹 Purged {removed} expired cache entries")
+        with self._lock:
+            self._counters["purged"] += removed
+        return removed
+
+    @staticmethod
+    def _enable_incremental_vacuum(conn):
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.execute("VACUUM")
+
+    def _remember(self, key: str, value, expires_at: float):
+        """Add to the in-memory LRU (lock held)."""
+        self._memory[key] = (value, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def stats(self) -> dict:
+        entries = sqlite_db.connect(self.db_path).execute(
+            "SELECT COUNT(*) FROM cache_entries WHERE namespace = ? AND expires_at > ?", (self.name, time.time())
+        ).fetchone()[0]
+        with self._lock:
+            served = self._counters["memory_hits"] + self._counters["hits"]
+            lookups = served + self._counters["misses"]
+            return {
+                "name": self.name,
+                **self._counters,
+                "hit_rate": round(served / lookups, 4) if lookups else None,
+                "entries": entries,
+                "memory_entries": len(self._memory),
+                "max_memory_entries": self.memory_entries,
+                "ttl": self.ttl
+            }
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_sqlite_cache(name: str, ttl: float, memory_entries: int = 256) -> SQLiteCache:
+    """
+    Return the process-wide SQLite cache called ``name``, creating it on first use.
+
+    Settings can be overridden with ``<NAME>_CACHE_TTL`` (seconds) and
+    ``<NAME>_CACHE_MEMORY_ENTRIES`` environment variables.
+    """
+    env_prefix = name.upper()
+    ttl = float(os.getenv(f'{env_prefix}_CACHE_TTL', ttl))
+    memory_entries = int(os.getenv(f'{env_prefix}_CACHE_MEMORY_ENTRIES', memory_entries))
+
+    with _caches_lock:
+        cache = _caches.get(name)
+        if cache is None:
+            cache = SQLiteCache(name, ttl, memory_entries=memory_entries)
+            _caches[name] = cache
+        return cache
+
+
+def all_sqlite_cache_stats() -> dict:
+    """Stats for every SQLite cache created in this process."""
+    with _caches_lock:
+        caches = list(_caches.values())
+    return {cache.name: cache.stats() for cache in caches}
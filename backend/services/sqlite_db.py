@@ -0,0 +1,43 @@
+"""
+Shared SQLite helpers.
+
+Connections are opened per thread in WAL mode with a busy timeout, so the
+same database file can be shared by worker threads and worker processes.
+"""
+import os
+import sqlite3
+import threading
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), '..', 'data')
+
+_local = threading.local()
+
+
+def default_db_path(filename: str) -> str:
+    """Path of a database file inside backend/data."""
+    os.makedirs(DATA_DIR, exist_ok=True)
+    return os.path.join(DATA_DIR, filename)
+
+
+def connect(path: str) -> sqlite3.Connection:
+    """
+    Return this thread's connection to ``path``, opening it on first use.
+
+    Connections run in autocommit mode; use ``BEGIN IMMEDIATE`` for
+    read-modify-write sections that must be atomic across processes.
+    """
+    path = os.path.abspath(path)
+    connections = getattr(_local, "connections", None)
+    if connections is None:
+        connections = _local.connections = {}
+
+    conn = connections.get(path)
+    if conn is None:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=30000")
+        connections[path] = conn
+    return conn
@@ -0,0 +1,174 @@
+"""
+Per-job span trees, exportable as Chrome trace-event JSON.
+
+The orchestrator opens a Trace for each pipeline run; stages, external API
+calls, rate-limit waits and retry backoffs open spans inside it. The
+current trace and span travel through context variables (copied into
+stage threads like the progress reporter), so ``span()`` is a no-op
+outside a traced run. Spans carry counters such as bytes written and
+retries. Finished traces are saved as JSON next to the run's artifacts and
+open directly in chrome://tracing or Perfetto.
+"""
+import contextvars
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+
+TRACES_DIR = os.path.join(os.path.dirname(__file__), '..', 'data', 'traces')
+
+_current_trace = contextvars.ContextVar("trace", default=None)
+_current_span = contextvars.ContextVar("span", default=None)
+
+# Traces of runs still in progress, by trace id (the job id when run as a job)
+_active = {}
+_active_lock = threading.Lock()
+
+
+class Trace:
+    def __init__(self, trace_id: str = None, name: str = "pipeline"):
+        self.trace_id = trace_id or uuid.uuid4().hex
+        self.name = name
+        self.started_at = time.time()
+        self._origin = time.perf_counter()
+        self._spans = []
+        self._threads = {}
+        self._lock = threading.Lock()
+
+    def start_span(self, name: str, category: str, parent: dict = None, **args) -> dict:
+        thread = threading.current_thread()
+        span = {
+            "id": uuid.uuid4().hex[:16],
+            "parent_id": parent["id"] if parent else None,
+            "name": name,
+            "category": category,
+            "start": time.perf_counter() - self._origin,
+            "end": None,
+            "thread": thread.ident,
+            "args": dict(args)
+        }
+        with self._lock:
+            self._threads.setdefault(thread.ident, thread.name)
+            self._spans.append(span)
+        return span
+
+    def end_span(self, span: dict, error: Exception = None):
+        with self._lock:
+            span["end"] = time.perf_counter() - self._origin
+            if error is not None:
+                span["args"]["error"] = f"{type(error).__name__}: {error}"
+
+    def add(self, span: dict, key: str, amount: float = 1):
+        with self._lock:
+            span["args"][key] = span["args"].get(key, 0) + amount
+
+    def spans(self) -> list:
+        """Copy of the spans recorded so far."""
+        with self._lock:
+            return [{**span, "args": dict(span["args"])} for span in self._spans]
+
+    def to_chrome_trace(self) -> dict:
+        """
+        Export as Chrome trace-event JSON.
+
+        Spans become complete ("X") events with microsecond timestamps; spans
+        still open are drawn up to now.
+        """
+        now = time.perf_counter() - self._origin
+        with self._lock:
+            threads = dict(self._threads)
+        tids = {ident: index + 1 for index, ident in enumerate(threads)}
+
+        events = [
+            {"name": "thread_name", "ph": "M", "pid": 1, "tid": tids[ident], "args": {"name": name}}
+            for ident, name in threads.items()
+        ]
+        for span in self.spans():
+            end = span["end"] if span["end"] is not None else now
+            events.append({
+                "name": span["name"],
+                "cat": span["category"],
+                "ph": "X",
+                "pid": 1,
+                "tid": tids[span["thread"]],
+                "ts": round(span["start"] * 1e6),
+                "dur": round((end - span["start"]) * 1e6),
+                "args": {**span["args"], "span_id": span["id"], "parent_id": span["parent_id"],
+                         "finished": span["end"] is not None}
+            })
+        return {
+            "traceEvents": events,
+            "displayTimeUnit": "ms",
+            "otherData": {"trace_id": self.trace_id, "name": self.name, "started_at": self.started_at}
+        }
+
+    def save(self, filename: str = None) -> str:
+        """Write the Chrome trace JSON to data/traces and return its path."""
+        from services.workspace import atomic_output
+
+        os.makedirs(TRACES_DIR, exist_ok=True)
+        path = os.path.join(TRACES_DIR, filename or f"{self.trace_id}.json")
+        with atomic_output(path) as partial_path:
+            with open(partial_path, 'w') as f:
+                json.dump(self.to_chrome_trace(), f)
+        return path
+
+
+def current_trace() -> Trace:
+    return _current_trace.get()
+
+
+def active_trace(trace_id: str) -> Trace:
+    """Trace of a run still in progress, or None."""
+    with _active_lock:
+        return _active.get(trace_id)
+
+
+@contextmanager
+def tracing(trace: Trace):
+    """Bind ``trace`` for this context with a root span covering the block."""
+    with _active_lock:
+        _active[trace.trace_id] = trace
+    trace_token = _current_trace.set(trace)
+    try:
+        with span(trace.name, category="job"):
+            yield trace
+    finally:
+        _current_trace.reset(trace_token)
+        with _active_lock:
+            _active.pop(trace.trace_id, None)
+
+
+@contextmanager
+def span(name: str, category: str = "function", **args):
+    """
+    Record a span in the current trace (no-op outside one).
+
+    Yields the span dictionary (or None); add details with ``count()``.
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        yield None
+        return
+
+    record = trace.start_span(name, category, _current_span.get(), **args)
+    token = _current_span.set(record)
+    error = None
+    try:
+        yield record
+    except BaseException as e:
+        error = e
+        raise
+    finally:
+        _current_span.reset(token)
+        trace.end_span(record, error)
+
+
+def count(key: str, amount: float = 1):
+    """Add ``amount`` to a counter (bytes, retries, ...) on the current span."""
+    trace = _current_trace.get()
+    record = _current_span.get()
+    if trace is not None and record is not None:
+        trace.add(record, key, amount)
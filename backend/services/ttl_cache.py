@@ -0,0 +1,162 @@
+"""
+In-memory TTL cache with stale-while-revalidate.
+
+Fresh entries are returned as-is. Entries past their TTL but still inside
+the stale window are returned immediately while a single background
+refresh reloads them; only missing or fully expired entries make the
+caller wait for the loader. Concurrent misses for the same key share one
+load. Every cache registers itself so hit/miss stats can be reported
+together.
+"""
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+
+class TTLCache:
+    """
+    Args:
+        name: Cache name used in stats and env configuration
+        ttl: Seconds an entry is fresh
+        stale_ttl: Extra seconds a stale entry may be served while it refreshes
+        max_entries: Evict least-recently-used entries beyond this count
+    """
+
+    def __init__(self, name: str, ttl: float, stale_ttl: float = 0, max_entries: int = 1024):
+        self.name = name
+        self.ttl = ttl
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+
+        self._entries = OrderedDict()  # key -> (value, stored_at)
+        self._refreshing = set()
+        self._loading = {}  # key -> Future of the load other callers wait on
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "stale_hits": 0, "misses": 0, "shared_loads": 0, "refreshes": 0,
+                          "refresh_errors": 0}
+
+    def get(self, key, loader):
+        """
+        Return the cached value for ``key``, calling ``loader()`` when needed.
+
+        Exceptions from a synchronous load propagate (to every caller
+        waiting on it); a failed background refresh keeps serving the stale
+        value until the stale window ends.
+        """
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, stored_at = entry
+                age = now - stored_at
+                if age < self.ttl:
+                    self._entries.move_to_end(key)
+                    self._counters["hits"] += 1
+                    return value
+                if age < self.ttl + self.stale_ttl:
+                    self._entries.move_to_end(key)
+                    self._counters["stale_hits"] += 1
+                    if key not in self._refreshing:
+                        self._refreshing.add(key)
+                        threading.Thread(target=self._refresh, args=(key, loader), daemon=True).start()
+                    return value
+            self._counters["misses"] += 1
+            # Single flight: only the first caller for a missing key runs the loader
+            load = self._loading.get(key)
+            waiting = load is not None
+            if waiting:
+                self._counters["shared_loads"] += 1
+            else:
+                load = self._loading[key] = Future()
+
+        if waiting:
+            return load.result()
+
+        try:
+            value = loader()
+            self.put(key, value)
+            load.set_result(value)
+            return value
+        except BaseException as e:
+            load.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._loading.pop(key, None)
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, key=None):
+        """Drop one key, or everything."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def _refresh(self, key, loader):
+        try:
+            value = loader()
+            self.put(key, value)
+            with self._lock:
+                self._counters["refreshes"] += 1
+        except Exception as e:
+            print(f"  ⚠️ Background refresh failed for {self.name} cache: {e}")
+            with self._lock:
+                self._counters["refresh_errors"] += 1
+        finally:
+            with self._lock:
+                self._refreshing.discard(key)
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["stale_hits"] + self._counters["misses"]
+            served = self._counters["hits"] + self._counters["stale_hits"]
+            return {
+                "name": self.name,
+                **self._counters,
+                "hit_rate": round(served / lookups, 4) if lookups else None,
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl": self.ttl,
+                "stale_ttl": self.stale_ttl
+            }
+
+
+_caches = {}
+_caches_lock = threading.Lock()
+
+
+def get_ttl_cache(name: str, ttl: float, stale_ttl: float = 0, max_entries: int = 1024) -> TTLCache:
+    """
+    Return the process-wide TTL cache called ``name``, creating it on first use.
+
+    Settings can be overridden with ``<NAME>_CACHE_TTL``,
+    ``<NAME>_CACHE_STALE_TTL`` and ``<NAME>_CACHE_MAX_ENTRIES`` environment
+    variables (seconds / count).
+    """
+    env_prefix = name.upper()
+    ttl = float(os.getenv(f'{env_prefix}_CACHE_TTL', ttl))
+    stale_ttl = float(os.getenv(f'{env_prefix}_CACHE_STALE_TTL', stale_ttl))
+    max_entries = int(os.getenv(f'{env_prefix}_CACHE_MAX_ENTRIES', max_entries))
+
+    with _caches_lock:
+        cache = _caches.get(name)
+        if cache is None:
+            cache = TTLCache(name, ttl, stale_ttl=stale_ttl, max_entries=max_entries)
+            _caches[name] = cache
+        return cache
+
+
+def all_ttl_cache_stats() -> dict:
+    """Stats for every TTL cache created in this process."""
+    with _caches_lock:
+        caches = list(_caches.values())
+    return {cache.name: cache.stats() for cache in caches}
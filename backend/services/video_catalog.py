@@ -0,0 +1,204 @@
+"""
+Persistent catalog of generated reels.
+
+The orchestrator records every finished reel here, so listing videos is an
+indexed SQLite query instead of a directory scan with a stat per file.
+A version counter bumps on every write and backs the ETag of /api/videos.
+"""
+import os
+import threading
+from datetime import datetime
+
+from services import sqlite_db
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS videos (
+    id TEXT PRIMARY KEY,
+    filename TEXT NOT NULL UNIQUE,
+    theme TEXT,
+    location TEXT,
+    script TEXT,
+    duration REAL,
+    size INTEGER,
+    audio_filename TEXT,
+    subtitle_filename TEXT,
+    image_count INTEGER,
+    created_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_videos_created_at ON videos (created_at);
+CREATE INDEX IF NOT EXISTS idx_videos_theme ON videos (theme, created_at);
+CREATE INDEX IF NOT EXISTS idx_videos_location ON videos (location COLLATE NOCASE, created_at);
+CREATE TABLE IF NOT EXISTS catalog_meta (
+    key TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO catalog_meta (key, value) VALUES ('version', 0);
+"""
+
+COLUMNS = ("id", "filename", "theme", "location", "script", "duration", "size",
+           "audio_filename", "subtitle_filename", "image_count", "created_at")
+
+
+class VideoCatalog:
+    def __init__(self, db_path: str = None):
+        self.db_path = db_path or os.getenv('VIDEO_CATALOG_DB') or sqlite_db.default_db_path('catalog.db')
+        sqlite_db.connect(self.db_path).executescript(SCHEMA)
+
+    def add(self, record: dict):
+        """
+        Insert or replace a reel.
+
+        Args:
+            record: Dictionary with at least ``filename``; other COLUMNS are optional
+        """
+        row = {column: record.get(column) for column in COLUMNS}
+        row["id"] = row["id"] or os.path.splitext(row["filename"])[0]
+        row["created_at"] = row["created_at"] or datetime.now().isoformat()
+
+        conn = sqlite_db.connect(self.db_path)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.execute(
+                f"INSERT OR REPLACE INTO videos ({', '.join(COLUMNS)}) "
+                f"VALUES ({', '.join('?' for _ in COLUMNS)})",
+                [row[column] for column in COLUMNS]
+            )
+            conn.execute("UPDATE catalog_meta SET value = value + 1 WHERE key = 'version'")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def remove(self, filenames: list):
+        """Drop reels by filename."""
+        if not filenames:
+            return
+        conn = sqlite_db.connect(self.db_path)
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            conn.executemany("DELETE FROM videos WHERE filename = ?", [(name,) for name in filenames])
+            conn.execute("UPDATE catalog_meta SET value = value + 1 WHERE key = 'version'")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+
+    def version(self) -> int:
+        """Counter that changes whenever the catalog does."""
+        row = sqlite_db.connect(self.db_path).execute(
+            "SELECT value FROM catalog_meta WHERE key = 'version'"
+        ).fetchone()
+        return row["value"]
+
+    def query(self, theme: str = None, location: str = None, since: str = None, until: str = None,
+              limit: int = None, offset: int = 0) -> tuple:
+        """
+        List reels newest first.
+
+        Args:
+            theme: Exact theme key (e.g. "heat")
+            location: Location, case-insensitive
+            since: ISO timestamp lower bound (inclusive)
+            until: ISO timestamp upper bound (exclusive)
+            limit: Page size (None for all rows)
+            offset: Rows to skip
+
+        Returns:
+            (list of row dictionaries, total matching rows)
+        """
+        clauses, params = [], []
+        if theme:
+            clauses.append("theme = ?")
+            params.append(theme)
+        if location:
+            clauses.append("location = ? COLLATE NOCASE")
+            params.append(location)
+        if since:
+            clauses.append("created_at >= ?")
+            params.append(since)
+        if until:
+            clauses.append("created_at < ?")
+            params.append(until)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+
+        conn = sqlite_db.connect(self.db_path)
+        total = conn.execute(f"SELECT COUNT(*) FROM videos {where}", params).fetchone()[0]
+        rows = conn.execute(
+            f"SELECT * FROM videos {where} ORDER BY created_at DESC, filename DESC LIMIT ? OFFSET ?",
+            params + [-1 if limit is None else limit, offset]
+        ).fetchall()
+        return [dict(row) for row in rows], total
+
+    def filenames(self) -> set:
+        rows = sqlite_db.connect(self.db_path).execute("SELECT filename FROM videos").fetchall()
+        return {row["filename"] for row in rows}
+
+    def sync_directory(self, videos_dir: str, subtitles_dir: str, on_missing_subtitle=None) -> dict:
+        """
+        Reconcile the catalog with the files on disk.
+
+        Imports reels that were produced before the catalog existed (or by
+        other tools) and drops entries whose video file is gone. Meant to
+        run once at startup, not per request.
+
+        Args:
+            videos_dir: Directory holding the MP4 files
+            subtitles_dir: Directory holding the WebVTT files
+            on_missing_subtitle: Optional ``callback(filename)`` that creates a
+                subtitle file for imported videos that have none
+
+        Returns:
+            Dictionary with added and removed counts
+        """
+        # Hidden files are renders still in progress (see services.workspace.atomic_output)
+        on_disk = {
+            name for name in os.listdir(videos_dir) if name.endswith('.mp4') and not name.startswith('.')
+        } if os.path.isdir(videos_dir) else set()
+        known = self.filenames()
+
+        added = 0
+        for filename in sorted(on_disk - known):
+            file_path = os.path.join(videos_dir, filename)
+            subtitle_filename = filename.replace('.mp4', '.vtt')
+            if not os.path.exists(os.path.join(subtitles_dir, subtitle_filename)) and on_missing_subtitle:
+                try:
+                    on_missing_subtitle(filename)
+                except Exception as e:
+                    print(f"⚠️ Failed to generate subtitle for {filename}: {e}")
+
+            self.add({
+                "filename": filename,
+                "size": os.path.getsize(file_path),
+                "subtitle_filename": subtitle_filename if os.path.exists(os.path.join(subtitles_dir, subtitle_filename)) else None,
+                "created_at": created_at_from_filename(filename) or datetime.fromtimestamp(os.path.getctime(file_path)).isoformat()
+            })
+            added += 1
+
+        removed = sorted(known - on_disk)
+        self.remove(removed)
+
+        if added or removed:
+            print(f"📚 Video catalog synced: {added} added, {len(removed)} removed")
+        return {"added": added, "removed": len(removed)}
+
+
+def created_at_from_filename(filename: str) -> str:
+    """Parse the timestamp from arogya_sathi_YYYYMMDD_HHMMSS[_id].mp4 names."""
+    stem = os.path.splitext(filename)[0].replace('arogya_sathi_', '')
+    try:
+        return datetime.strptime(stem[:15], '%Y%m%d_%H%M%S').isoformat()
+    except ValueError:
+        return None
+
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+def get_catalog() -> VideoCatalog:
+    """Process-wide catalog instance."""
+    global _catalog
+    with _catalog_lock:
+        if _catalog is None:
+            _catalog = VideoCatalog()
+        return _catalog
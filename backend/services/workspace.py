@@ -0,0 +1,100 @@
+"""
+Job-scoped workspaces and collision-free artifact files.
+
+Every pipeline run gets its own scratch directory, bound through a context
+variable like the progress reporter, so intermediate files of concurrent
+reels never share a path. Final artifacts get unique names and are written
+to a hidden sibling first, then renamed into place, so readers (the video
+feed, catalog sync, another job) never see a half-written file.
+"""
+import contextvars
+import os
+import shutil
+import tempfile
+import uuid
+from contextlib import contextmanager
+from datetime import datetime
+
+from services import tracing
+
+_current_workspace = contextvars.ContextVar("workspace", default=None)
+
+
+class Workspace:
+    """
+    Scratch directory for one pipeline run.
+
+    Args:
+        job_id: Identifier used in the directory name (random when omitted)
+        directory: Use an existing directory (e.g. a parent process's
+            workspace) instead of creating one; it is not removed on cleanup
+    """
+
+    def __init__(self, job_id: str = None, directory: str = None):
+        self.job_id = job_id or uuid.uuid4().hex
+        self.owned = directory is None
+        if directory is None:
+            root = os.getenv('WORKSPACE_DIR') or None
+            if root:
+                os.makedirs(root, exist_ok=True)
+            directory = tempfile.mkdtemp(prefix=f"reel_{self.job_id[:12]}_", dir=root)
+        self.directory = directory
+
+    def path(self, filename: str) -> str:
+        return os.path.join(self.directory, filename)
+
+    def cleanup(self):
+        if self.owned:
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def current_workspace() -> Workspace:
+    return _current_workspace.get()
+
+
+@contextmanager
+def job_workspace(job_id: str = None, directory: str = None):
+    """Bind a workspace for this context, removing it on exit if it was created here."""
+    workspace = Workspace(job_id, directory)
+    token = _current_workspace.set(workspace)
+    try:
+        yield workspace
+    finally:
+        _current_workspace.reset(token)
+        workspace.cleanup()
+
+
+def temp_dir(prefix: str = "tmp_") -> tempfile.TemporaryDirectory:
+    """Temporary directory inside the current job's workspace (or the system temp dir outside a job)."""
+    workspace = _current_workspace.get()
+    return tempfile.TemporaryDirectory(prefix=prefix, dir=workspace.directory if workspace else None)
+
+
+def artifact_name(prefix: str, extension: str) -> str:
+    """
+    Unique, time-sortable file name, e.g. ``arogya_sathi_20260207_010612_3f2c9a1b.mp4``.
+
+    The timestamp keeps names readable and ordered; the random suffix keeps
+    artifacts from jobs finishing in the same second apart.
+    """
+    return f"{prefix}_{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:8]}{extension}"
+
+
+@contextmanager
+def atomic_output(path: str):
+    """
+    Yield a temporary path to write ``path`` through, renamed into place on success.
+
+    The temporary file is a hidden sibling that keeps the extension (so tools
+    such as ffmpeg still infer the format); it is removed if writing fails.
+    """
+    directory, filename = os.path.split(path)
+    stem, extension = os.path.splitext(filename)
+    tmp_path = os.path.join(directory, f".{stem}.{uuid.uuid4().hex[:8]}.part{extension}")
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+        tracing.count("bytes_written", os.path.getsize(path))
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
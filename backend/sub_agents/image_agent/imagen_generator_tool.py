@@ -6,23 +6,53 @@ import vertexai
 from vertexai.preview.vision_models import ImageGenerationModel
 from PIL import Image
 import io
-import time
+import shutil
+from services.rate_limiter import imagen_rate_limiter
+from services.artifact_cache import ArtifactCache, get_cache
+from services.progress import emit_progress
+from services.metrics import external_call, fallbacks_total, retries_total
+from services import tracing
+from services.workspace import artifact_name, atomic_output
 
 class ImagenGeneratorTool(BaseTool):
+    # Using Imagen 3.0 - highest quality model
+    MODEL_NAME = "imagen-3.0-generate-001"
+    
+    # Generation settings; also part of the image cache key
+    GENERATION_PARAMS = {
+        "aspect_ratio": "9:16",
+        "safety_filter_level": "block_few",  # More permissive
+        "person_generation": "allow_all"     # Allow all person types
+    }
+    
     def __init__(self):
         super().__init__(
             name="generate_images",
             description="Generates AI images for sustainability stories using Google Imagen"
         )
         
+        # Shared token bucket enforcing the Imagen quota across all concurrent reels
+        self.rate_limiter = imagen_rate_limiter()
+        
+        # Content-addressed image cache: repeat prompts are served from disk
+        self.cache_variants = int(os.getenv('IMAGE_CACHE_VARIANTS', '1'))
+        if os.getenv('IMAGE_CACHE_ENABLED', 'true').lower() == 'true':
+            self.image_cache = get_cache(
+                "image",
+                os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'video_assets', 'cache'),
+                suffix=".png",
+                max_bytes=2 * 1024 ** 3  # 2 GB, override with IMAGE_CACHE_MAX_MB
+            )
+        else:
+            self.image_cache = None
+        
         # Initialize Vertex AI
         project_id = os.getenv('GCP_PROJECT_ID', 'praxis-granite-479510-s0')
         location = os.getenv('GCP_LOCATION', 'us-central1')
         
         try:
             vertexai.init(project=project_id, location=location)
-            # Using Imagen 3.0 - highest quality model
-            self.model_name = "imagen-3.0-generate-001"
+            self.model_name = self.MODEL_NAME
             self.model = ImageGenerationModel.from_pretrained(self.model_name)
             print(f"  ✓ Imagen 3.0 (Premium) model initialized: {self.model_name}")
         except Exception as e:
@@ -54,21 +84,27 @@ class ImagenGeneratorTool(BaseTool):
             os.makedirs(output_dir, exist_ok=True)
             
             for i, prompt in enumerate(prompts):
+                # Serve repeat prompts from the image cache
+                cache_key = self._cache_key(prompt) if self.image_cache else None
+                if cache_key:
+                    image_path = self._from_cache(cache_key, output_dir, i)
+                    if image_path:
+                        image_paths.append(image_path)
+                        print(f"    ✓ Image {i+1}/{num_images} served from cache")
+                        self._report_image(image_path, output_dir, i, num_images, cached=True)
+                        continue
+                
                 if not self.model:
                     raise Exception("Imagen model not initialized. Check GCP credentials and Vertex AI setup.")
                 
-                # Wait after every 2 images (rate limit allows 2 per minute)
-                # Image 0,1 -> quick | Wait 60s | Image 2,3 -> quick | Wait 60s | Image 4 -> quick
-                if i > 0 and i % 2 == 0:
-                    print(f"    ⏱️  Waiting 60s (rate limit: 2 images/minute)...")
-                    time.sleep(60)
-                
+                # Rate limiting (2 images/minute by default) happens per API call in _call_imagen
                 # Generate with Imagen - premium quality with GCP credits
                 print(f"    Generating image {i+1}/{num_images}...")
                 print(f"    Prompt: {prompt[:80]}...")
-                image_path = self._generate_with_imagen(prompt, output_dir, i)
+                image_path = self._generate_with_imagen(prompt, output_dir, i, cache_key=cache_key)
                 image_paths.append(image_path)
                 print(f"    ✓ Image {i+1}/{num_images} generated")
+                self._report_image(image_path, output_dir, i, num_images, cached=False)
             
             print(f"  ✓ Generated {len(image_paths)} images successfully")
             
@@ -143,21 +179,65 @@ class ImagenGeneratorTool(BaseTool):
         
         return prompts[:num_images]
     
-    def _generate_with_imagen(self, prompt: str, output_dir: str, index: int) -> str:
-        """Generate image using Google Imagen 3.0 - Premium Quality."""
+    def _report_image(self, image_path: str, output_dir: str, index: int, total: int, cached: bool):
+        """Emit a per-image progress event (asset path is relative to data/video_assets)."""
+        emit_progress(
+            "image_ready",
+            index=index,
+            total=total,
+            asset=os.path.relpath(image_path, output_dir).replace(os.sep, '/'),
+            cached=cached
+        )
+    
+    def _from_cache(self, cache_key: str, output_dir: str, index: int) -> str:
+        """Give this reel its own copy of a cached image, or return None on a miss."""
+        cached_path = self.image_cache.choose(cache_key, pool_size=self.cache_variants)
+        if not cached_path:
+            return None
+        
+        filepath = os.path.join(output_dir, artifact_name("imagen_hq", f"_{index}.png"))
+        try:
+            with atomic_output(filepath) as partial_path:
+                # A hard link shares the cached bytes; eviction only drops the cache's link
+                try:
+                    os.link(cached_path, partial_path)
+                except OSError:
+                    shutil.copyfile(cached_path, partial_path)
+        except OSError as e:
+            # Evicted between lookup and copy: generate it instead
+            print(f"    ⚠️ Cached image unavailable: {e}")
+            return None
+        return filepath
+    
+    def _cache_key(self, prompt: str) -> str:
+        """Cache key covering everything that determines the generated image."""
+        return ArtifactCache.make_key(model=self.MODEL_NAME, prompt=prompt, **self.GENERATION_PARAMS)
+    
+    def _call_imagen(self, **kwargs):
+        """Call Imagen once the shared rate limiter grants a quota token."""
+        self.rate_limiter.acquire()
+        with external_call("imagen"):
+            return self.model.generate_images(**kwargs)
+    
+    def _generate_with_imagen(self, prompt: str, output_dir: str, index: int, cache_key: str = None) -> str:
+        """
+        Generate image using Google Imagen 3.0 - Premium Quality.
+        
+        When cache_key is given and the original prompt produced the image, a
+        copy is stored in the image cache; the reel keeps its own file.
+        """
         
         print(f"      Calling Imagen API (Premium Quality)...")
         print(f"      DEBUG: Prompt length: {len(prompt)} chars")
         
         try:
             # Generate image with more permissive settings
-            response = self.model.generate_images(
+            response = self._call_imagen(
                 prompt=prompt,
                 number_of_images=1,
-                aspect_ratio="9:16",
-                safety_filter_level="block_few",  # More permissive
-                person_generation="allow_all"      # Allow all person types
+                **self.GENERATION_PARAMS
             )
+            used_prompt = True
             
             print(f"      Imagen response received")
             print(f"      Response type: {type(response)}")
@@ -178,8 +258,10 @@ class ImagenGeneratorTool(BaseTool):
                 
                 # Try with simpler prompt
                 print(f"      🔄 Retrying with simplified prompt...")
+                retries_total.inc(service="imagen")
+                tracing.count("retries")
                 simple_prompt = "A beautiful natural landscape scene in 9:16 vertical format, photorealistic, high quality"
-                response = self.model.generate_images(
+                response = self._call_imagen(
                     prompt=simple_prompt,
                     number_of_images=1,
                     aspect_ratio="9:16",
@@ -188,18 +270,26 @@ class ImagenGeneratorTool(BaseTool):
                 
                 if not hasattr(response, 'images') or not response.images:
                     raise Exception("Imagen returned empty response - no images generated even with simplified prompt")
+                used_prompt = False
             
             print(f"      Number of images: {len(response.images)}")
             
             # Save image - response.images is a list
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            filename = f"imagen_hq_{timestamp}_{index}.png"
+            filename = artifact_name("imagen_hq", f"_{index}.png")
             filepath = os.path.join(output_dir, filename)
             
             print(f"      Saving image to: {filepath}")
-            response.images[0].save(filepath)
+            with atomic_output(filepath) as partial_path:
+                response.images[0].save(partial_path)
             print(f"      ✓ Saved successfully")
             
+            # Only cache images that actually match the requested prompt
+            if cache_key and used_prompt:
+                try:
+                    self.image_cache.put(cache_key, filepath)
+                except OSError as e:
+                    print(f"      ⚠️ Could not cache image: {e}")
+            
             return filepath
             
         except Exception as api_error:
@@ -209,19 +299,20 @@ class ImagenGeneratorTool(BaseTool):
             # If it's a safety filter or prompt issue, try generic fallback
             if "safety" in str(api_error).lower() or "empty response" in str(api_error).lower():
                 print(f"      🔄 Attempting generic nature scene as fallback...")
+                fallbacks_total.inc(component="image")
                 try:
                     fallback_prompt = "Beautiful natural landscape with clear sky, photorealistic image, 9:16 vertical format"
-                    response = self.model.generate_images(
+                    response = self._call_imagen(
                         prompt=fallback_prompt,
                         number_of_images=1,
                         aspect_ratio="9:16"
                     )
                     
                     if response.images:
-                        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                        filename = f"imagen_fallback_{timestamp}_{index}.png"
+                        filename = artifact_name("imagen_fallback", f"_{index}.png")
                         filepath = os.path.join(output_dir, filename)
-                        response.images[0].save(filepath)
+                        with atomic_output(filepath) as partial_path:
+                            response.images[0].save(partial_path)
                         print(f"      ✓ Fallback image saved")
                         return filepath
                 except Exception as fallback_error:
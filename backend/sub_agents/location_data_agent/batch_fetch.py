@@ -0,0 +1,46 @@
+"""
+Bulk environmental data lookups for batch runs.
+
+A batch of city/theme combinations only needs one lookup per distinct
+city; the results map can be handed to each orchestrator run so reels
+never fetch the same weather again.
+"""
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from .weather_api_tool import normalize_location
+
+
+def fetch_many(tool, locations: list, max_concurrency: int = None) -> dict:
+    """
+    Fetch data for many locations, once per distinct location.
+
+    Args:
+        tool: Weather tool exposing ``run(location)``
+        locations: Location names, duplicates allowed ("Delhi", " delhi")
+        max_concurrency: Parallel lookups (default WEATHER_FETCH_CONCURRENCY or 4)
+
+    Returns:
+        Dictionary mapping every given location string to its run() result
+    """
+    max_concurrency = max_concurrency or int(os.getenv('WEATHER_FETCH_CONCURRENCY', '4'))
+
+    # First spelling of each normalised location is the one fetched
+    unique = {}
+    for location in locations:
+        unique.setdefault(normalize_location(location), location)
+    if not unique:
+        return {}
+
+    def lookup(location: str) -> dict:
+        # One bad city must not sink the whole batch
+        try:
+            return tool.run(location=location)
+        except Exception as e:
+            return {"success": False, "error": str(e), "location": location}
+
+    with ThreadPoolExecutor(max_workers=min(max_concurrency, len(unique)), thread_name_prefix="weather-fetch") as pool:
+        fetched = dict(zip(unique, pool.map(lookup, unique.values())))
+
+    print(f"  ✓ Fetched environmental data for {len(unique)} locations ({len(locations)} requested)")
+    return {location: fetched[normalize_location(location)] for location in locations}
@@ -73,6 +73,11 @@ class MockWeatherAPITool(BaseTool):
             }
         }
     
+    def fetch_many(self, locations: list, max_concurrency: int = None) -> dict:
+        """Mock counterpart of WeatherAPITool.fetch_many()."""
+        from .batch_fetch import fetch_many
+        return fetch_many(self, locations, max_concurrency)
+    
     def run(self, location: str) -> dict:
         """
         Generate fake weather data for testing.
@@ -1,6 +1,20 @@
 from google.adk.tools.base_tool import BaseTool
 import requests
+from requests.adapters import HTTPAdapter
 import os
+from services.ttl_cache import get_ttl_cache
+from services.metrics import external_call
+
+# OpenWeatherMap refreshes current conditions about every 10 minutes
+WEATHER_CACHE_TTL = 600
+AIR_QUALITY_CACHE_TTL = 1800
+STALE_TTL = 3600
+
+
+def normalize_location(location: str) -> str:
+    """Cache key for a location name ("  New  Delhi " -> "new delhi")."""
+    return " ".join(location.lower().split())
+
 
 class WeatherAPITool(BaseTool):
     def __init__(self):
@@ -11,6 +25,15 @@ class WeatherAPITool(BaseTool):
         # Using OpenWeatherMap - Free tier allows 1000 calls/day
         self.api_key = os.getenv('OPENWEATHER_API_KEY', '81ffe95e962c3a6e9c0e93d8ec010e41')  # Default demo key
         self.base_url = "https://api.openweathermap.org/data/2.5"
+        
+        # Pooled keep-alive connections shared by every request through this tool
+        pool_size = int(os.getenv('WEATHER_HTTP_POOL_SIZE', '10'))
+        self.session = requests.Session()
+        self.session.mount("https://", HTTPAdapter(pool_connections=2, pool_maxsize=pool_size))
+        
+        # Weather by normalised location, AQI by coordinates (stale entries refresh in the background)
+        self.weather_cache = get_ttl_cache("weather", ttl=WEATHER_CACHE_TTL, stale_ttl=STALE_TTL)
+        self.air_quality_cache = get_ttl_cache("air_quality", ttl=AIR_QUALITY_CACHE_TTL, stale_ttl=STALE_TTL)
     
     def run(self, location: str) -> dict:
         """
@@ -23,34 +46,15 @@ class WeatherAPITool(BaseTool):
             Dictionary with weather, temperature, air quality data
         """
         try:
-            # Get current weather data
-            weather_url = f"{self.base_url}/weather"
-            params = {
-                'q': location,
-                'appid': self.api_key,
-                'units': 'metric'  # Use Celsius
-            }
-            
-            weather_response = requests.get(weather_url, params=params, timeout=10)
-            weather_response.raise_for_status()
-            weather_data = weather_response.json()
+            location_key = normalize_location(location)
+            weather_data = self.weather_cache.get(location_key, lambda: self._fetch_weather(location_key))
             
             #  Get air pollution data (if available)
             lat = weather_data['coord']['lat']
             lon = weather_data['coord']['lon']
             
-            air_url = f"{self.base_url}/air_pollution"
-            air_params = {
-                'lat': lat,
-                'lon': lon,
-                'appid': self.api_key
-            }
-            
             try:
-                air_response = requests.get(air_url, params=air_params, timeout=10)
-                air_response.raise_for_status()
-                air_data = air_response.json()
-                aqi = air_data['list'][0]['main']['aqi'] if 'list' in air_data else None
+                aqi = self.air_quality_cache.get((round(lat, 2), round(lon, 2)), lambda: self._fetch_air_quality(lat, lon))
             except:
                 aqi = None
             
@@ -90,3 +94,38 @@ class WeatherAPITool(BaseTool):
                 "error": str(e),
                 "location": location
             }
+    
+    def fetch_many(self, locations: list, max_concurrency: int = None) -> dict:
+        """
+        Fetch data for many locations concurrently, once per distinct location.
+        
+        Returns:
+            Dictionary mapping each location to its run() result
+        """
+        from .batch_fetch import fetch_many
+        return fetch_many(self, locations, max_concurrency)
+    
+    def _fetch_weather(self, location_key: str) -> dict:
+        """Current weather from OpenWeatherMap."""
+        params = {
+            'q': location_key,
+            'appid': self.api_key,
+            'units': 'metric'  # Use Celsius
+        }
+        with external_call("openweathermap"):
+            weather_response = self.session.get(f"{self.base_url}/weather", params=params, timeout=10)
+            weather_response.raise_for_status()
+        return weather_response.json()
+    
+    def _fetch_air_quality(self, lat: float, lon: float) -> int:
+        """Air quality index (1-5) from OpenWeatherMap's air pollution API."""
+        air_params = {
+            'lat': lat,
+            'lon': lon,
+            'appid': self.api_key
+        }
+        with external_call("openweathermap"):
+            air_response = self.session.get(f"{self.base_url}/air_pollution", params=air_params, timeout=10)
+            air_response.raise_for_status()
+        air_data = air_response.json()
+        return air_data['list'][0]['main']['aqi'] if 'list' in air_data else None
@@ -2,8 +2,25 @@ from google.adk.tools.base_tool import BaseTool
 import os
 import time
 import hashlib
-import json
 from datetime import datetime
+from services.sqlite_cache import get_sqlite_cache
+from services.metrics import external_call, fallbacks_total, retries_total
+from services import tracing
+
+# Scripts depend on bucketed weather, so a day-old script is still a good match
+SCRIPT_CACHE_TTL = 24 * 3600
+
+
+def weather_bucket(temp: float, weather: str, aqi: int = None) -> tuple:
+    """
+    Coarse weather conditions that lead to the same script.
+
+    Temperature is rounded to the nearest 5 degrees and AQI to the nearest 50.
+    """
+    temp_bucket = round(temp / 5) * 5
+    aqi_bucket = round(aqi / 50) * 50 if aqi else "none"
+    return temp_bucket, weather, aqi_bucket
+
 
 class GeminiScriptGeneratorTool(BaseTool):
     def __init__(self):
@@ -12,10 +29,8 @@ class GeminiScriptGeneratorTool(BaseTool):
             description="Uses Gemini AI to generate empathetic, human-centered sustainability stories"
         )
         
-        # Simple in-memory cache to avoid redundant API calls
-        self.script_cache = {}
-        self.cache_dir = os.path.join(os.path.dirname(__file__), '.cache')
-        os.makedirs(self.cache_dir, exist_ok=True)
+        # Shared SQLite cache (with an in-memory LRU) to avoid redundant API calls
+        self.script_cache = get_sqlite_cache("script", ttl=SCRIPT_CACHE_TTL)
         
         # Use Vertex AI for GCP credits
         project_id = os.getenv('GOOGLE_CLOUD_PROJECT')
@@ -249,10 +264,11 @@ Generate the script now:"""
         """Generate content with exponential backoff retry logic."""
         for attempt in range(max_retries):
             try:
-                if self.use_vertex:
-                    response = self.model.generate_content(prompt)
-                else:
-                    response = self.model.generate_content(prompt)
+                with external_call("gemini"):
+                    if self.use_vertex:
+                        response = self.model.generate_content(prompt)
+                    else:
+                        response = self.model.generate_content(prompt)
                 
                 script = response.text.strip()
                 return script
@@ -267,7 +283,10 @@ Generate the script now:"""
                     
                     if attempt < max_retries - 1:
                         print(f"  → Waiting {wait_time}s before retry...")
-                        time.sleep(wait_time)
+                        retries_total.inc(service="gemini")
+                        tracing.count("retries")
+                        with tracing.span("retry_backoff", category="retry", attempt=attempt + 1):
+                            time.sleep(wait_time)
                     else:
                         print(f"  ❌ Max retries reached, API quota exhausted")
                         raise Exception("API quota exhausted after retries")
@@ -279,51 +298,28 @@ Generate the script now:"""
     
     def _get_cache_key(self, location: str, theme: str, temp: float, weather: str, aqi: int = None) -> str:
         """Generate cache key based on location and conditions."""
-        # Round temp to nearest 5 degrees and combine key elements
-        temp_bucket = round(temp / 5) * 5
-        aqi_bucket = round(aqi / 50) * 50 if aqi else "none"
+        temp_bucket, weather, aqi_bucket = weather_bucket(temp, weather, aqi)
         key_string = f"{location}_{theme}_{temp_bucket}_{weather}_{aqi_bucket}"
         return hashlib.md5(key_string.encode()).hexdigest()
     
     def _get_cached_script(self, cache_key: str) -> dict:
         """Retrieve cached script if available and not expired."""
-        # Check memory cache first
-        if cache_key in self.script_cache:
-            return self.script_cache[cache_key]
-        
-        # Check file cache
-        cache_file = os.path.join(self.cache_dir, f"{cache_key}.json")
-        if os.path.exists(cache_file):
-            try:
-                with open(cache_file, 'r') as f:
-                    cached_data = json.load(f)
-                    # Cache for 24 hours
-                    cache_time = datetime.fromisoformat(cached_data.get('timestamp', ''))
-                    age_hours = (datetime.now() - cache_time).total_seconds() / 3600
-                    
-                    if age_hours < 24:
-                        self.script_cache[cache_key] = cached_data
-                        return cached_data
-            except Exception as e:
-                print(f"  → Cache read error: {e}")
-        
-        return None
+        try:
+            return self.script_cache.get(cache_key)
+        except Exception as e:
+            print(f"  → Cache read error: {e}")
+            return None
     
     def _cache_script(self, cache_key: str, result: dict):
         """Cache the generated script."""
-        # Memory cache
-        self.script_cache[cache_key] = result
-        
-        # File cache
         try:
-            cache_file = os.path.join(self.cache_dir, f"{cache_key}.json")
-            with open(cache_file, 'w') as f:
-                json.dump(result, f)
+            self.script_cache.put(cache_key, result)
         except Exception as e:
             print(f"  → Cache write error: {e}")
     
     def _get_fallback_script(self, location: str, theme: str) -> dict:
         """Get a context-aware fallback script when API fails."""
+        fallbacks_total.inc(component="script")
         
         fallback_scripts = {
             "heat": f"In {location}, rising temperatures challenge us every day. But together, through tree planting, cool roofs, and sustainable choices, we can protect our communities. Every action counts in building a cooler tomorrow.",
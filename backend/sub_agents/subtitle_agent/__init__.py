@@ -0,0 +1 @@
+# Subtitle Generation Agent
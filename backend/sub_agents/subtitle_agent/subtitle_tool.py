@@ -0,0 +1,78 @@
+from google.adk.tools.base_tool import BaseTool
+import os
+from datetime import datetime
+from services.workspace import atomic_output
+from sub_agents.subtitle_agent.vtt import format_vtt_timestamp
+
+class SubtitleGeneratorTool(BaseTool):
+    def __init__(self):
+        super().__init__(
+            name="generate_subtitles",
+            description="Builds WebVTT captions for the narration script"
+        )
+        
+        self.subtitles_dir = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'subtitles')
+        os.makedirs(self.subtitles_dir, exist_ok=True)
+        
+        # Approx 10 words per caption for readability, ~3 words per second speech rate
+        self.chunk_size = 10
+        self.words_per_second = 3
+    
+    def run(self, script: str) -> dict:
+        """
+        Build WebVTT captions for a script.
+        
+        Only needs the script, so it can run while images and voiceover are
+        still being generated. Use save() once the video filename is known.
+        
+        Args:
+            script: The script/narration text
+            
+        Returns:
+            Dictionary with the WebVTT content and cue count
+        """
+        words = script.split()
+        chunks = [' '.join(words[i:i + self.chunk_size]) for i in range(0, len(words), self.chunk_size)]
+        
+        vtt_content = "WEBVTT\n\n"
+        current_time = 0.0
+        
+        for idx, chunk in enumerate(chunks):
+            duration = len(chunk.split()) / self.words_per_second
+            start_time = current_time
+            end_time = current_time + duration
+            
+            vtt_content += f"{idx + 1}\n"
+            vtt_content += f"{format_vtt_timestamp(start_time)} --> {format_vtt_timestamp(end_time)}\n"
+            vtt_content += f"{chunk}\n\n"
+            
+            current_time = end_time
+        
+        print(f"  ✓ Built {len(chunks)} subtitle cues ({current_time:.1f}s)")
+        
+        return {
+            "vtt_content": vtt_content,
+            "cue_count": len(chunks),
+            "duration": current_time,
+            "timestamp": datetime.now().isoformat()
+        }
+    
+    def save(self, vtt_content: str, video_path: str) -> str:
+        """
+        Write captions next to the video's name in the subtitles directory.
+        
+        Args:
+            vtt_content: WebVTT content from run()
+            video_path: Path to the assembled video
+            
+        Returns:
+            Path to the subtitle file
+        """
+        subtitle_filename = os.path.basename(video_path).replace('.mp4', '.vtt')
+        subtitle_path = os.path.join(self.subtitles_dir, subtitle_filename)
+        
+        with atomic_output(subtitle_path) as partial_path:
+            with open(partial_path, 'w', encoding='utf-8') as f:
+                f.write(vtt_content)
+        
+        return subtitle_path
@@ -0,0 +1,13 @@
+"""
+WebVTT helpers shared by the subtitle tool, the API server and scripts.
+
+Kept free of agent SDK imports so the API server can use it at start-up.
+"""
+
+
+def format_vtt_timestamp(seconds: float) -> str:
+    """Format seconds as WebVTT timestamp (HH:MM:SS.mmm)"""
+    hours = int(seconds // 3600)
+    minutes = int((seconds % 3600) // 60)
+    secs = seconds % 60
+    return f"{hours:02d}:{minutes:02d}:{secs:06.3f}"
@@ -0,0 +1,163 @@
+"""
+Video assembly in a dedicated process pool.
+
+Frame decoding, MoviePy compositing and the ffmpeg encodes they drive are
+CPU-heavy; run inside the API process they contend with request handling
+for the GIL and the cores. AssemblyPool keeps the VideoAssemblerTool
+interface but runs each assembly in one of a few spawned worker processes
+(each builds its own VideoAssemblerTool once) with a lower CPU priority.
+
+The core budget (VIDEO_ASSEMBLY_CORES, default all cores but one, shared
+out between API server processes when WEB_CONCURRENCY > 1) is split
+between the workers (VIDEO_ASSEMBLY_WORKERS, default half the budget), and
+each worker's encoder gets ``budget // workers`` threads unless
+VIDEO_ENCODER_THREADS is set. Progress events emitted in a worker are
+forwarded to the calling job's reporter.
+"""
+import multiprocessing
+import os
+import queue
+import threading
+import uuid
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from services import tracing
+from services.progress import ProgressReporter, current_reporter, reporting
+from services.workspace import current_workspace, job_workspace
+
+
+def core_budget() -> int:
+    """Cores reserved for video assembly by this API process."""
+    cores = os.getenv('VIDEO_ASSEMBLY_CORES')
+    if cores:
+        return max(1, int(cores))
+    # Each API worker process runs its own pool
+    api_workers = max(1, int(os.getenv('WEB_CONCURRENCY') or 1))
+    return max(1, ((os.cpu_count() or 2) - 1) // api_workers)
+
+
+def worker_count() -> int:
+    """Assembly worker processes; 0 assembles inside the calling process."""
+    workers = os.getenv('VIDEO_ASSEMBLY_WORKERS')
+    if workers is not None and workers != '':
+        return max(0, int(workers))
+    return max(1, core_budget() // 2)
+
+
+# Worker-process state, set up once per process by _init_worker
+_assembler = None
+_events = None
+
+
+def _init_worker(events, threads: int, niceness: int):
+    global _assembler, _events
+    if niceness and hasattr(os, 'nice'):
+        # ffmpeg children inherit the priority, keeping the API responsive under load
+        os.nice(niceness)
+    os.environ.setdefault('VIDEO_ENCODER_THREADS', str(threads))
+
+    from .video_assembler_tool import VideoAssemblerTool
+    _assembler = VideoAssemblerTool()
+    _events = events
+
+
+def _assemble(task_id: str, kwargs: dict, workspace_dir: str = None) -> dict:
+    reporter = ProgressReporter(task_id)
+    reporter.add_listener(lambda event: _events.put((task_id, event)))
+    try:
+        # Temporary files go to the calling job's workspace (owned and removed by the caller)
+        with reporting(reporter), job_workspace(task_id, directory=workspace_dir):
+            return _assembler.run(**kwargs)
+    finally:
+        # Marks the end of this task's events
+        _events.put((task_id, None))
+
+
+class AssemblyPool:
+    """
+    Drop-in replacement for VideoAssemblerTool that assembles in worker processes.
+
+    Args:
+        workers: Worker processes (default VIDEO_ASSEMBLY_WORKERS)
+        cores: Core budget shared by the workers (default VIDEO_ASSEMBLY_CORES)
+    """
+
+    def __init__(self, workers: int = None, cores: int = None):
+        self.workers = workers or worker_count() or 1
+        self.cores = cores or core_budget()
+        self.threads = max(1, self.cores // self.workers)
+        self.niceness = int(os.getenv('VIDEO_ASSEMBLY_NICE', '5'))
+
+        # spawn: the API process runs threads and open SQLite connections, which must not be forked
+        self._context = multiprocessing.get_context("spawn")
+        self._events = self._context.Queue()
+        self._executor = None
+        self._lock = threading.Lock()
+        self._reporters = {}  # task_id -> (reporter, done event)
+        self._dispatcher = threading.Thread(target=self._dispatch_events, name="assembly-events", daemon=True)
+        self._dispatcher.start()
+        print(f"🎬 Video assembly pool: {self.workers} workers x {self.threads} encoder threads")
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=self._context,
+                    initializer=_init_worker,
+                    initargs=(self._events, self.threads, self.niceness)
+                )
+            return self._executor
+
+    def run(self, script: str, audio_path: str, theme: str, image_paths: list = None) -> dict:
+        """Assemble a video in a worker process (same arguments and result as VideoAssemblerTool.run)."""
+        kwargs = {"script": script, "audio_path": audio_path, "theme": theme, "image_paths": image_paths}
+        task_id = uuid.uuid4().hex
+        done = threading.Event()
+        reporter = current_reporter()
+        if reporter is not None:
+            self._reporters[task_id] = (reporter, done)
+
+        try:
+            workspace = current_workspace()
+            future = self._get_executor().submit(_assemble, task_id, kwargs, workspace.directory if workspace else None)
+            result = future.result()
+            # Let the progress events still in flight reach the job first
+            if reporter is not None:
+                done.wait(timeout=5)
+            # The reel was written by the worker, outside this process's trace
+            video_path = result.get("video_path")
+            if video_path and os.path.exists(video_path):
+                tracing.count("bytes_written", os.path.getsize(video_path))
+            return result
+        except BrokenProcessPool as e:
+            # A worker died (e.g. killed for memory); start a fresh pool for the next reel
+            with self._lock:
+                self._executor = None
+            print(f"  ❌ Video assembly worker crashed: {e}")
+            return {"error": f"Video assembly worker crashed: {e}", "video_path": None}
+        finally:
+            self._reporters.pop(task_id, None)
+
+    def _dispatch_events(self):
+        while True:
+            try:
+                task_id, event = self._events.get()
+            except (EOFError, OSError, queue.Empty):
+                return
+            entry = self._reporters.get(task_id)
+            if entry is None:
+                continue
+            reporter, done = entry
+            if event is None:
+                done.set()
+                continue
+            data = {key: value for key, value in event.items() if key not in ("id", "type", "time")}
+            reporter.emit(event["type"], **data)
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
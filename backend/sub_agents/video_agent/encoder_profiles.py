@@ -0,0 +1,97 @@
+"""
+Named H.264 encoder profiles for reel rendering.
+
+Reels are still images with gentle fades, so ``tune=stillimage`` and a
+CRF target give much smaller files than ``ultrafast`` defaults at the same
+visual quality. Profiles trade encode time for size:
+
+    draft    fastest encode, large files (previews, local development)
+    social   default; small files for streaming at a modest CPU cost
+    archive  near-transparent quality for masters, slowest
+
+Pick one with VIDEO_ENCODER_PROFILE; VIDEO_ENCODER_THREADS overrides the
+thread count (0 lets x264 choose). Compare them on this machine with
+``python -m benchmarks.encoder_benchmark``.
+"""
+import os
+
+DEFAULT_PROFILE = "social"
+
+ENCODER_PROFILES = {
+    "draft": {
+        "preset": "ultrafast",
+        "crf": 28,
+        "tune": "stillimage",
+        "threads": 0,
+        "keyint": 48
+    },
+    "social": {
+        "preset": "veryfast",
+        "crf": 23,
+        "tune": "stillimage",
+        "threads": 0,
+        "keyint": 48
+    },
+    "archive": {
+        "preset": "slow",
+        "crf": 18,
+        "tune": "stillimage",
+        "threads": 0,
+        "keyint": 240
+    }
+}
+
+
+def get_profile(name: str = None) -> dict:
+    """
+    Resolve an encoder profile.
+
+    Args:
+        name: Profile name (default VIDEO_ENCODER_PROFILE or "social")
+
+    Returns:
+        Profile dictionary including its name
+    """
+    name = (name or os.getenv('VIDEO_ENCODER_PROFILE') or DEFAULT_PROFILE).lower()
+    if name not in ENCODER_PROFILES:
+        raise ValueError(f"Unknown encoder profile '{name}'. Choose from: {', '.join(ENCODER_PROFILES)}")
+
+    profile = {"name": name, **ENCODER_PROFILES[name]}
+    threads = os.getenv('VIDEO_ENCODER_THREADS')
+    if threads:
+        profile["threads"] = int(threads)
+    return profile
+
+
+def x264_params(profile: dict) -> list:
+    """Encoder options shared by both render engines (everything but codec and preset)."""
+    params = ['-crf', str(profile["crf"])]
+    if profile.get("tune"):
+        params += ['-tune', profile["tune"]]
+    params += ['-g', str(profile["keyint"]), '-pix_fmt', 'yuv420p']
+    return params
+
+
+def ffmpeg_video_args(profile: dict, threads: bool = True) -> list:
+    """
+    ffmpeg output options encoding video with a profile.
+
+    Args:
+        profile: Encoder profile
+        threads: Include the thread count (left out of cache keys: it depends
+            on where the encode runs, not on what it produces)
+    """
+    args = ['-c:v', 'libx264', '-preset', profile["preset"], *x264_params(profile)]
+    if threads:
+        args += ['-threads', str(profile["threads"])]
+    return args
+
+
+def moviepy_write_args(profile: dict) -> dict:
+    """Keyword arguments for MoviePy's ``write_videofile`` encoding with a profile."""
+    return {
+        "codec": "libx264",
+        "preset": profile["preset"],
+        "threads": profile["threads"] or None,
+        "ffmpeg_params": x264_params(profile)
+    }
@@ -0,0 +1,227 @@
+"""
+Direct ffmpeg slideshow renderer.
+
+Builds a single ffmpeg filter graph (looped still images, fades, scale to
+1080x1920, audio trimmed to the reel length) so frames are composed and
+encoded natively instead of being rendered one by one in Python.
+
+Reels can also be assembled from per-image segments: each image's clip is
+encoded on its own (and cached, see segment_cache), then the segments are
+joined with a stream-copy concat and only the audio is encoded.
+"""
+import os
+import shutil
+import subprocess
+
+from services.workspace import temp_dir
+
+from .encoder_profiles import ffmpeg_video_args, get_profile
+from .frame_cache import ffmpeg_input_args
+
+
+def find_ffmpeg() -> str:
+    """Locate an ffmpeg binary (FFMPEG_BINARY, the imageio-ffmpeg bundle, then PATH)."""
+    binary = os.getenv('FFMPEG_BINARY')
+    if binary:
+        return binary
+    try:
+        # Ships with moviepy 1.x, so it is available wherever the MoviePy engine is
+        import imageio_ffmpeg
+        return imageio_ffmpeg.get_ffmpeg_exe()
+    except Exception:
+        pass
+    binary = shutil.which('ffmpeg')
+    if not binary:
+        raise RuntimeError("ffmpeg not found. Install ffmpeg or set FFMPEG_BINARY.")
+    return binary
+
+
+class FFmpegSlideshowRenderer:
+    def __init__(self, width: int = 1080, height: int = 1920, fps: int = 24, fade_duration: float = 0.3,
+                 profile: dict = None):
+        self.width = width
+        self.height = height
+        self.fps = fps
+        self.fade_duration = fade_duration
+        self.profile = profile or get_profile()
+
+    def build_command(self, image_paths: list, audio_path: str, output_path: str, duration: float) -> list:
+        """
+        Build the ffmpeg command line for a slideshow reel.
+
+        Each image is shown for an equal share of ``duration``; the first clip
+        fades in, the last fades out, and audio is trimmed to ``duration``.
+        """
+        num_images = len(image_paths)
+
+        cmd = [find_ffmpeg(), '-y', '-hide_banner', '-loglevel', 'error']
+        for img_path in image_paths:
+            cmd += self._image_input_args(img_path)
+        cmd += ['-i', audio_path]
+
+        # Each still is decoded and scaled once, then its frame is repeated
+        filters = []
+        frame_counts = self.frame_counts(num_images, duration)
+        for i in range(num_images):
+            chain = self._clip_filter(frame_counts[i], fade_in=(i == 0), fade_out=(i == num_images - 1))
+            filters.append(f"[{i}:v]{chain}[v{i}]")
+
+        filters.append(''.join(f"[v{i}]" for i in range(num_images)) + f"concat=n={num_images}:v=1:a=0[v]")
+        filters.append(f"[{num_images}:a]atrim=0:{duration},asetpts=PTS-STARTPTS[a]")
+
+        cmd += [
+            '-filter_complex', ';'.join(filters),
+            '-map', '[v]', '-map', '[a]',
+            *self.video_codec_args(),
+            '-r', str(self.fps),
+            '-c:a', 'aac',
+            '-t', f"{duration}",
+            '-movflags', '+faststart',
+            output_path
+        ]
+        return cmd
+
+    def build_segment_command(self, image_path: str, output_path: str, frames: int,
+                              fade_in: bool = False, fade_out: bool = False) -> list:
+        """Build the ffmpeg command that encodes one image's clip as a silent segment."""
+        return [
+            find_ffmpeg(), '-y', '-hide_banner', '-loglevel', 'error',
+            *self._image_input_args(image_path),
+            '-vf', self._clip_filter(frames, fade_in, fade_out),
+            *self.video_codec_args(),
+            '-r', str(self.fps),
+            '-an',
+            output_path
+        ]
+
+    def build_concat_command(self, list_path: str, audio_path: str, output_path: str, duration: float) -> list:
+        """Build the ffmpeg command that joins encoded segments (stream copy) and muxes the audio."""
+        return [
+            find_ffmpeg(), '-y', '-hide_banner', '-loglevel', 'error',
+            '-f', 'concat', '-safe', '0', '-i', list_path,
+            '-i', audio_path,
+            '-map', '0:v', '-map', '1:a',
+            '-c:v', 'copy',
+            '-af', f"atrim=0:{duration},asetpts=PTS-STARTPTS",
+            '-c:a', 'aac',
+            '-t', f"{duration}",
+            '-movflags', '+faststart',
+            output_path
+        ]
+
+    def video_codec_args(self, threads: bool = True) -> list:
+        """Encoder options from the profile; segments joined by stream copy must all share them."""
+        return ffmpeg_video_args(self.profile, threads=threads)
+
+    def _image_input_args(self, image_path: str) -> list:
+        # Pre-scaled frames from the frame cache are raw RGB .npy files
+        return ffmpeg_input_args(image_path) if image_path.endswith('.npy') else ['-i', image_path]
+
+    def _clip_filter(self, frames: int, fade_in: bool, fade_out: bool) -> str:
+        """Filter chain turning one still into ``frames`` video frames."""
+        chain = (
+            f"scale={self.width}:{self.height}:flags=lanczos,setsar=1,format=yuv420p,"
+            f"loop=loop={frames - 1}:size=1:start=0,settb=1/{self.fps},setpts=N"
+        )
+        if fade_in:
+            chain += f",fade=t=in:st=0:d={self.fade_duration}"
+        if fade_out:
+            clip_duration = frames / self.fps
+            chain += f",fade=t=out:st={max(0.0, clip_duration - self.fade_duration):.6f}:d={self.fade_duration}"
+        return chain
+
+    def frame_counts(self, num_images: int, duration: float) -> list:
+        """Split the reel's frames evenly across images, summing to exactly duration * fps."""
+        total_frames = int(round(duration * self.fps))
+        boundaries = [int(round(total_frames * i / num_images)) for i in range(num_images + 1)]
+        return [boundaries[i + 1] - boundaries[i] for i in range(num_images)]
+
+    def render(self, image_paths: list, audio_path: str, output_path: str, duration: float = 15.0,
+               progress_callback=None) -> str:
+        """
+        Render the slideshow reel.
+
+        Args:
+            image_paths: Still images (or cached .npy frames), shown in order
+            audio_path: Voiceover audio file
+            output_path: Destination MP4 path
+            duration: Exact reel length in seconds
+            progress_callback: Optional ``callback(percent)`` called as encoding advances
+
+        Returns:
+            Path to the rendered video
+        """
+        if not image_paths:
+            raise ValueError("No images provided for ffmpeg rendering")
+
+        cmd = self.build_command(image_paths, audio_path, output_path, duration)
+        run_ffmpeg(cmd, duration, progress_callback)
+        return output_path
+
+    def render_segmented(self, image_paths: list, audio_path: str, output_path: str, segment_cache,
+                         duration: float = 15.0, progress_callback=None) -> str:
+        """
+        Render the reel from per-image segments.
+
+        Segments come from ``segment_cache`` (encoded on a miss); the final
+        reel is a stream-copy concat of them plus the encoded audio, so a reel
+        whose visuals are all cached costs only an audio encode and a remux.
+
+        Returns:
+            Path to the rendered video
+        """
+        if not image_paths:
+            raise ValueError("No images provided for ffmpeg rendering")
+
+        num_images = len(image_paths)
+        frame_counts = self.frame_counts(num_images, duration)
+        # Segments and the concat list live in the job's workspace
+        with temp_dir("reel_concat_") as tmp_dir:
+            segments = []
+            for i, img_path in enumerate(image_paths):
+                segments.append(segment_cache.segment_path(
+                    self, img_path, frame_counts[i], fade_in=(i == 0), fade_out=(i == num_images - 1),
+                    dest_path=os.path.join(tmp_dir, f"segment_{i}.mp4")
+                ))
+                if progress_callback:
+                    progress_callback(int((i + 1) / (num_images + 1) * 100))
+
+            list_path = os.path.join(tmp_dir, "segments.txt")
+            with open(list_path, 'w') as f:
+                for segment in segments:
+                    escaped = os.path.abspath(segment).replace("'", "'\\''")
+                    f.write(f"file '{escaped}'\n")
+            run_ffmpeg(self.build_concat_command(list_path, audio_path, output_path, duration))
+
+        if progress_callback:
+            progress_callback(100)
+        return output_path
+
+
+def run_ffmpeg(cmd: list, duration: float = None, progress_callback=None):
+    """
+    Run an ffmpeg command, raising RuntimeError on failure.
+
+    With a progress_callback, ffmpeg's machine-readable progress output is
+    parsed and reported as a whole-number percentage of ``duration``.
+    """
+    if not progress_callback or not duration:
+        result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"ffmpeg failed ({result.returncode}): {result.stderr.strip()[-500:]}")
+        return
+
+    # -progress must precede the output file, which is always the last argument
+    cmd = cmd[:-1] + ['-progress', 'pipe:1', '-nostats', cmd[-1]]
+    process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    last_percent = -1
+    for line in process.stdout:
+        key, _, value = line.strip().partition('=')
+        if key == 'out_time_us' and value.isdigit():
+            percent = min(100, int(int(value) / 1e6 / duration * 100))
+            if percent > last_percent:
+                last_percent = percent
+                progress_callback(percent)
+    stderr = process.stderr.read()
+    if process.wait() != 0:
+        raise RuntimeError(f"ffmpeg failed ({process.returncode}): {stderr.strip()[-500:]}")
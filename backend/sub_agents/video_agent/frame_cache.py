@@ -0,0 +1,67 @@
+"""
+Cache of decoded, resized video frames.
+
+Source images are decoded and LANCZOS-resized to the reel geometry once,
+then kept as ``.npy`` arrays (uint8 RGB, height x width x 3) keyed by the
+source file's content hash and the target size. MoviePy memory-maps them
+straight into clips; ffmpeg reads the same files as raw video by skipping
+the .npy header (see ffmpeg_input_args).
+"""
+import io
+import os
+
+import numpy as np
+from PIL import Image
+
+from services.artifact_cache import ArtifactCache, get_cache
+from services.hashing import file_digest
+
+CACHE_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'video_assets', 'frames')
+
+
+class FrameCache:
+    def __init__(self, width: int = 1080, height: int = 1920):
+        self.width = width
+        self.height = height
+        self.cache = get_cache(
+            "frame",
+            os.getenv('FRAME_CACHE_DIR') or CACHE_DIR,
+            suffix=".npy",
+            max_bytes=1024 ** 3  # ~170 frames at 1080x1920, override with FRAME_CACHE_MAX_MB
+        )
+
+    def _key(self, image_path: str) -> str:
+        return ArtifactCache.make_key(
+            source=file_digest(image_path), width=self.width, height=self.height, resample="lanczos"
+        )
+
+    def frame_path(self, image_path: str) -> str:
+        """Path of the cached frame for an image, decoding and resizing it on a miss."""
+        key = self._key(image_path)
+        cached = self.cache.get(key)
+        if cached:
+            return cached
+
+        with Image.open(image_path) as img:
+            frame = np.asarray(img.convert("RGB").resize((self.width, self.height), Image.Resampling.LANCZOS))
+        buffer = io.BytesIO()
+        np.save(buffer, frame)
+        return self.cache.put(key, data=buffer.getvalue(), variant=0)
+
+    def load(self, image_path: str) -> np.ndarray:
+        """Read-only, memory-mapped frame for an image."""
+        return np.load(self.frame_path(image_path), mmap_mode='r')
+
+
+def ffmpeg_input_args(path: str) -> list:
+    """ffmpeg input options that read a cached .npy frame as one raw RGB video frame."""
+    with open(path, 'rb') as f:
+        version = np.lib.format.read_magic(f)
+        read_header = np.lib.format.read_array_header_1_0 if version == (1, 0) else np.lib.format.read_array_header_2_0
+        shape, _, _ = read_header(f)
+        data_offset = f.tell()
+    height, width = shape[:2]
+    return [
+        '-f', 'rawvideo', '-pixel_format', 'rgb24', '-video_size', f'{width}x{height}',
+        '-skip_initial_bytes', str(data_offset), '-i', path
+    ]
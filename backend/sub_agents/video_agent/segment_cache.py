@@ -0,0 +1,77 @@
+"""
+Cache of encoded per-image video segments.
+
+Reels built from the same theme prompts share images and differ mostly in
+their narration. Each image's clip (its frames plus any fade) is encoded
+once as a silent H.264 segment, keyed by the image's content hash, frame
+count, fade flags and the renderer's output settings; reels are then
+joined from segments by stream copy (see FFmpegSlideshowRenderer.render_segmented).
+
+Each reel concatenates its own hard links (or copies) of the segments, so
+another job evicting a segment cannot pull it out from under the concat.
+"""
+import os
+import shutil
+
+from services.artifact_cache import ArtifactCache, get_cache
+from services.hashing import file_digest
+
+from .ffmpeg_renderer import run_ffmpeg
+
+CACHE_DIR = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'video_assets', 'segments')
+
+
+class SegmentCache:
+    def __init__(self):
+        self.cache = get_cache(
+            "segment",
+            os.getenv('SEGMENT_CACHE_DIR') or CACHE_DIR,
+            suffix=".mp4",
+            max_bytes=2 * 1024 ** 3  # override with SEGMENT_CACHE_MAX_MB
+        )
+
+    def _key(self, renderer, image_path: str, frames: int, fade_in: bool, fade_out: bool) -> str:
+        return ArtifactCache.make_key(
+            source=file_digest(image_path),
+            frames=frames,
+            fade_in=fade_in,
+            fade_out=fade_out,
+            fade_duration=renderer.fade_duration if (fade_in or fade_out) else None,
+            width=renderer.width,
+            height=renderer.height,
+            fps=renderer.fps,
+            # In-process and assembly-pool encoders differ only in thread count
+            codec=renderer.video_codec_args(threads=False)
+        )
+
+    def segment_path(self, renderer, image_path: str, frames: int, fade_in: bool = False,
+                     fade_out: bool = False, dest_path: str = None) -> str:
+        """
+        Put the encoded segment for an image clip at ``dest_path``, encoding it on a miss.
+
+        Args:
+            dest_path: Where the reel's own link or copy goes (in its workspace)
+
+        Returns:
+            dest_path
+        """
+        key = self._key(renderer, image_path, frames, fade_in, fade_out)
+        cached = self.cache.get(key)
+        if cached:
+            try:
+                # A hard link shares the cached bytes; eviction only drops the cache's link
+                try:
+                    os.link(cached, dest_path)
+                except OSError:
+                    shutil.copyfile(cached, dest_path)
+                return dest_path
+            except OSError:
+                # Evicted between lookup and link: encode it again
+                pass
+
+        run_ffmpeg(renderer.build_segment_command(image_path, dest_path, frames, fade_in, fade_out))
+        try:
+            self.cache.put(key, source_path=dest_path, variant=0)
+        except OSError as e:
+            print(f"  ⚠️ Could not cache video segment: {e}")
+        return dest_path
@@ -1,10 +1,18 @@
 from google.adk.tools.base_tool import BaseTool
 import os
 from datetime import datetime
-from moviepy.editor import ImageClip, AudioFileClip, concatenate_videoclips, CompositeVideoClip
-from moviepy.video.fx.all import fadeout, fadein
+from proglog import ProgressBarLogger
 import numpy as np
 from PIL import Image
+from .encoder_profiles import get_profile, moviepy_write_args
+from .ffmpeg_renderer import FFmpegSlideshowRenderer
+from .frame_cache import FrameCache
+from .segment_cache import SegmentCache
+from services.progress import current_reporter, emit_progress
+from services.workspace import artifact_name, atomic_output, temp_dir
+
+# FIXED 15 SECOND REEL - audio is trimmed if longer
+TARGET_DURATION = 15.0
 
 class VideoAssemblerTool(BaseTool):
     def __init__(self):
@@ -15,6 +23,18 @@ class VideoAssemblerTool(BaseTool):
         
         self.assets_dir = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'video_assets')
         os.makedirs(self.assets_dir, exist_ok=True)
+        
+        # Rendering engine: "ffmpeg" (native filter graph) or "moviepy" (frame compositing)
+        self.renderer = os.getenv('VIDEO_RENDERER', 'ffmpeg').lower()
+        
+        # x264 settings (preset, CRF, tune, threads, keyframe interval) for both engines
+        self.encoder_profile = get_profile()
+        
+        # Decoded 1080x1920 frames, reused whenever a source image repeats
+        self.frame_cache = FrameCache(1080, 1920) if os.getenv('FRAME_CACHE_ENABLED', 'true').lower() == 'true' else None
+        
+        # Encoded per-image segments; reels with cached visuals are only remuxed with new audio
+        self.segment_cache = SegmentCache() if os.getenv('SEGMENT_CACHE_ENABLED', 'true').lower() == 'true' else None
     
     def run(self, script: str, audio_path: str, theme: str, image_paths: list = None) -> dict:
         """
@@ -42,6 +62,7 @@ class VideoAssemblerTool(BaseTool):
             
             return {
                 "video_path": video_path,
+                "duration": TARGET_DURATION,
                 "theme": theme,
                 "timestamp": datetime.now().isoformat()
             }
@@ -56,12 +77,88 @@ class VideoAssemblerTool(BaseTool):
     def _create_image_slideshow_video(self, script: str, audio_path: str, image_paths: list) -> str:
         """Create video with AI-generated images sliding through."""
         
+        # Export video
+        output_dir = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'videos')
+        os.makedirs(output_dir, exist_ok=True)
+        
+        video_filename = artifact_name("arogya_sathi", ".mp4")
+        video_path = os.path.join(output_dir, video_filename)
+        
+        # Render to a hidden file; the reel appears under its name only once complete
+        with atomic_output(video_path) as partial_path:
+            self._render(audio_path, image_paths, partial_path)
+        return video_path
+    
+    def _render(self, audio_path: str, image_paths: list, video_path: str) -> str:
+        if self.renderer == "ffmpeg":
+            try:
+                return self._render_with_ffmpeg(audio_path, image_paths, video_path)
+            except Exception as e:
+                print(f"    ⚠️  ffmpeg renderer failed, falling back to MoviePy: {e}")
+        
+        return self._render_with_moviepy(audio_path, image_paths, video_path)
+    
+    def _render_with_ffmpeg(self, audio_path: str, image_paths: list, video_path: str) -> str:
+        """Render the slideshow as a single native ffmpeg filter graph."""
+        
+        # Skip unreadable images, like the MoviePy engine does
+        valid_paths = [p for p in image_paths if os.path.isfile(p)]
+        if not valid_paths:
+            raise Exception("No valid image clips created")
+        
+        print(f"    Rendering {len(valid_paths)} images with ffmpeg ({TARGET_DURATION / len(valid_paths):.1f}s each = {TARGET_DURATION}s total)...")
+        renderer = FFmpegSlideshowRenderer(profile=self.encoder_profile)
+        frame_paths = [self._cached_frame_path(p) for p in valid_paths]
+        if self.segment_cache:
+            renderer.render_segmented(
+                frame_paths, audio_path, video_path, self.segment_cache,
+                duration=TARGET_DURATION,
+                progress_callback=self._encode_progress_callback()
+            )
+        else:
+            renderer.render(
+                frame_paths, audio_path, video_path,
+                duration=TARGET_DURATION,
+                progress_callback=self._encode_progress_callback()
+            )
+        return video_path
+    
+    def _cached_frame_path(self, image_path: str) -> str:
+        """Pre-scaled frame for an image, or the image itself if the frame cache is off or fails."""
+        if not self.frame_cache:
+            return image_path
+        try:
+            return self.frame_cache.frame_path(image_path)
+        except Exception as e:
+            print(f"    ⚠️  Frame cache unavailable for {os.path.basename(image_path)}: {e}")
+            return image_path
+    
+    def _encode_progress_callback(self):
+        """Callback emitting encode_progress events, or None when no job is listening."""
+        if current_reporter() is None:
+            return None
+        
+        last_percent = None
+        
+        def report(percent: int):
+            # Throttle to steps of 5% since the last event; renderers report uneven
+            # percentages (segment counts, ffmpeg output time), not multiples of 5
+            nonlocal last_percent
+            if last_percent is None or percent - last_percent >= 5 or (percent == 100 and last_percent != 100):
+                last_percent = percent
+                emit_progress("encode_progress", percent=percent)
+        
+        return report
+    
+    def _render_with_moviepy(self, audio_path: str, image_paths: list, video_path: str) -> str:
+        """Render the slideshow by compositing frames with MoviePy."""
+        # moviepy.editor takes ~0.5s to import; only this engine needs it
+        from moviepy.editor import ImageClip, AudioFileClip, concatenate_videoclips
+        from moviepy.video.fx.all import fadeout, fadein
+        
         # Load audio to get duration
         audio = AudioFileClip(audio_path)
         
-        # FIXED 15 SECOND REEL - trim audio if longer
-        TARGET_DURATION = 15.0  # Always 15 seconds
-        
         if audio.duration > TARGET_DURATION:
             print(f"    ⚠️  Audio is {audio.duration:.1f}s, trimming to {TARGET_DURATION}s")
             audio = audio.subclip(0, TARGET_DURATION)
@@ -76,12 +173,15 @@ class VideoAssemblerTool(BaseTool):
         clips = []
         for i, img_path in enumerate(image_paths):
             try:
-                # Load and resize image to 9:16 vertical format
-                img = Image.open(img_path)
-                img = img.resize((1080, 1920), Image.Resampling.LANCZOS)
-                
-                # Convert to numpy array
-                img_array = np.array(img)
+                # Load and resize image to 9:16 vertical format (cached across reels)
+                if self.frame_cache:
+                    img_array = self.frame_cache.load(img_path)
+                else:
+                    img = Image.open(img_path)
+                    img = img.resize((1080, 1920), Image.Resampling.LANCZOS)
+                    
+                    # Convert to numpy array
+                    img_array = np.array(img)
                 
                 # Create clip with calculated duration
                 clip = ImageClip(img_array, duration=duration_per_image)
@@ -114,29 +214,42 @@ class VideoAssemblerTool(BaseTool):
         # Add audio (already trimmed to 15s)
         final_video = final_video.set_audio(audio)
         
-        # Export video
-        output_dir = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'videos')
-        os.makedirs(output_dir, exist_ok=True)
-        
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        video_filename = f"arogya_sathi_{timestamp}.mp4"
-        video_path = os.path.join(output_dir, video_filename)
-        
         print(f"    Exporting video ({final_video.duration:.1f}s)...")
-        
-        final_video.write_videofile(
-            video_path,
-            fps=24,
-            codec='libx264',
-            audio_codec='aac',
-            temp_audiofile='temp-audio.m4a',
-            remove_temp=True,
-            logger=None,
-            preset='ultrafast'  # Faster encoding
-        )
+        progress = self._encode_progress_callback()
+        
+        # MoviePy muxes through a temporary audio file; keep it inside this job's workspace
+        with temp_dir("moviepy_") as tmp_dir:
+            final_video.write_videofile(
+                video_path,
+                fps=24,
+                audio_codec='aac',
+                temp_audiofile=os.path.join(tmp_dir, 'temp-audio.m4a'),
+                remove_temp=True,
+                logger=_MoviePyProgressLogger(progress) if progress else None,
+                **moviepy_write_args(self.encoder_profile)
+            )
         
         # Close clips
         final_video.close()
         audio.close()
         
         return video_path
+
+
+class _MoviePyProgressLogger(ProgressBarLogger):
+    """Translates MoviePy's frame progress bar into percentage callbacks."""
+    
+    def __init__(self, callback):
+        super().__init__()
+        # Not "callback": proglog calls self.callback(**state) on every log message
+        self.on_percent = callback
+        self.last_percent = -1
+    
+    def bars_callback(self, bar, attr, value, old_value=None):
+        total = self.bars.get(bar, {}).get('total')
+        if bar != 't' or attr != 'index' or not total:
+            return
+        percent = min(100, int(value / total * 100))
+        if percent > self.last_percent:
+            self.last_percent = percent
+            self.on_percent(percent)
@@ -1,15 +1,47 @@
 from google.adk.tools.base_tool import BaseTool
 from google.cloud import texttospeech
 import os
+import shutil
 from datetime import datetime
+from services.artifact_cache import ArtifactCache, get_cache
+from services.workspace import artifact_name, atomic_output
+from services.metrics import external_call, fallbacks_total
 
 class TextToSpeechTool(BaseTool):
+    # Voice settings; also part of the voiceover cache key
+    VOICE_PARAMS = {
+        "language_code": "en-US",
+        "name": "en-US-Neural2-F",  # Female voice, warm and empathetic
+        "ssml_gender": "FEMALE"
+    }
+    AUDIO_PARAMS = {
+        "audio_encoding": "MP3",
+        "speaking_rate": 0.9,  # Slightly slower for empathy
+        "pitch": 0.0,  # Neutral pitch
+        "effects_profile_id": ["small-bluetooth-speaker-class-device"]  # Optimize for mobile
+    }
+    GTTS_PARAMS = {"lang": "en", "slow": False}
+    
     def __init__(self):
         super().__init__(
             name="generate_voice",
             description="Converts script to natural AI voiceover using Google Text-to-Speech"
         )
         
+        self.output_dir = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'audio')
+        os.makedirs(self.output_dir, exist_ok=True)
+        
+        # Content-addressed voiceover cache: cached and template scripts skip TTS
+        if os.getenv('VOICE_CACHE_ENABLED', 'true').lower() == 'true':
+            self.voice_cache = get_cache(
+                "voice",
+                os.path.join(self.output_dir, 'cache'),
+                suffix=".mp3",
+                max_bytes=512 * 1024 ** 2  # 512 MB, override with VOICE_CACHE_MAX_MB
+            )
+        else:
+            self.voice_cache = None
+        
         # Initialize Google Cloud TTS client
         try:
             self.client = texttospeech.TextToSpeechClient()
@@ -35,44 +67,49 @@ class TextToSpeechTool(BaseTool):
         if self.use_fallback:
             return self._fallback_tts(script)
         
+        cache_key = self._cache_key(script, "google_tts", **self.VOICE_PARAMS, **self.AUDIO_PARAMS)
+        cached = self._from_cache(cache_key, script)
+        if cached:
+            return cached
+        
         try:
             # Set up the text input
             synthesis_input = texttospeech.SynthesisInput(text=script)
             
             # Select voice (US English, Neural2, Neutral tone)
             voice = texttospeech.VoiceSelectionParams(
-                language_code="en-US",
-                name="en-US-Neural2-F",  # Female voice, warm and empathetic
-                ssml_gender=texttospeech.SsmlVoiceGender.FEMALE
+                language_code=self.VOICE_PARAMS["language_code"],
+                name=self.VOICE_PARAMS["name"],
+                ssml_gender=texttospeech.SsmlVoiceGender[self.VOICE_PARAMS["ssml_gender"]]
             )
             
             # Configure audio output
             audio_config = texttospeech.AudioConfig(
-                audio_encoding=texttospeech.AudioEncoding.MP3,
-                speaking_rate=0.9,  # Slightly slower for empathy
-                pitch=0.0,  # Neutral pitch
-                effects_profile_id=["small-bluetooth-speaker-class-device"]  # Optimize for mobile
+                audio_encoding=texttospeech.AudioEncoding[self.AUDIO_PARAMS["audio_encoding"]],
+                speaking_rate=self.AUDIO_PARAMS["speaking_rate"],
+                pitch=self.AUDIO_PARAMS["pitch"],
+                effects_profile_id=self.AUDIO_PARAMS["effects_profile_id"]
             )
             
             print("  → Synthesizing AI voiceover...")
             
             # Generate speech
-            response = self.client.synthesize_speech(
-                input=synthesis_input,
-                voice=voice,
-                audio_config=audio_config
-            )
+            with external_call("tts"):
+                response = self.client.synthesize_speech(
+                    input=synthesis_input,
+                    voice=voice,
+                    audio_config=audio_config
+                )
             
             # Save audio file
-            output_dir = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'audio')
-            os.makedirs(output_dir, exist_ok=True)
-            
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            audio_filename = f"story_{timestamp}.mp3"
-            audio_path = os.path.join(output_dir, audio_filename)
+            audio_filename = artifact_name("story", ".mp3")
+            audio_path = os.path.join(self.output_dir, audio_filename)
             
-            with open(audio_path, 'wb') as out:
-                out.write(response.audio_content)
+            with atomic_output(audio_path) as partial_path:
+                with open(partial_path, 'wb') as out:
+                    out.write(response.audio_content)
+            if cache_key:
+                self._store_in_cache(cache_key, data=response.audio_content)
             
             print(f"  ✓ Voiceover generated: {audio_filename}")
             
@@ -90,19 +127,24 @@ class TextToSpeechTool(BaseTool):
     
     def _fallback_tts(self, script: str) -> dict:
         """Fallback TTS using gTTS (free, no credentials needed)."""
+        fallbacks_total.inc(component="voice")
+        cache_key = self._cache_key(script, "gtts", **self.GTTS_PARAMS)
+        cached = self._from_cache(cache_key, script, method="gtts_fallback")
+        if cached:
+            return cached
+        
         try:
             from gtts import gTTS
             
-            output_dir = os.path.join(os.path.dirname(__file__), '..', '..', 'data', 'audio')
-            os.makedirs(output_dir, exist_ok=True)
-            
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            audio_filename = f"story_{timestamp}.mp3"
-            audio_path = os.path.join(output_dir, audio_filename)
+            audio_filename = artifact_name("story", ".mp3")
+            audio_path = os.path.join(self.output_dir, audio_filename)
             
             # Generate speech using gTTS
-            tts = gTTS(text=script, lang='en', slow=False)
-            tts.save(audio_path)
+            tts = gTTS(text=script, **self.GTTS_PARAMS)
+            with atomic_output(audio_path) as partial_path, external_call("gtts"):
+                tts.save(partial_path)
+            if cache_key:
+                self._store_in_cache(cache_key, source_path=audio_path)
             
             print(f"  ✓ Voiceover generated (fallback): {audio_filename}")
             
@@ -130,3 +172,48 @@ class TextToSpeechTool(BaseTool):
                 "error": str(e),
                 "audio_path": None
             }
+    
+    def _cache_key(self, script: str, engine: str, **params) -> str:
+        """Cache key covering the text and every setting that shapes the audio (None when disabled)."""
+        if not self.voice_cache:
+            return None
+        return ArtifactCache.make_key(engine=engine, text=script, **params)
+    
+    def _store_in_cache(self, cache_key: str, **kwargs):
+        """Cache a synthesized voiceover; a failed write never costs the reel its audio."""
+        try:
+            self.voice_cache.put(cache_key, **kwargs)
+        except Exception as e:
+            print(f"  ⚠️ Could not cache voiceover: {e}")
+    
+    def _from_cache(self, cache_key: str, script: str, method: str = None) -> dict:
+        """Give this reel its own copy of a cached voiceover, or return None on a miss."""
+        cached_path = self.voice_cache.get(cache_key) if cache_key else None
+        if not cached_path:
+            return None
+        
+        audio_filename = artifact_name("story", ".mp3")
+        audio_path = os.path.join(self.output_dir, audio_filename)
+        try:
+            with atomic_output(audio_path) as partial_path:
+                # A hard link shares the cached bytes; eviction only drops the cache's link
+                try:
+                    os.link(cached_path, partial_path)
+                except OSError:
+                    shutil.copyfile(cached_path, partial_path)
+        except OSError as e:
+            # Evicted between lookup and copy: synthesize it instead
+            print(f"  ⚠️ Cached voiceover unavailable: {e}")
+            return None
+        
+        print(f"  ✓ Voiceover served from cache: {audio_filename}")
+        result = {
+            "audio_path": audio_path,
+            "filename": audio_filename,
+            "duration_estimate": len(script.split()) / 2.5,
+            "timestamp": datetime.now().isoformat(),
+            "cached": True
+        }
+        if method:
+            result["method"] = method
+        return result